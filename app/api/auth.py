@@ -3,37 +3,39 @@ from fastapi import (
     Depends,
     HTTPException,
     Path,
+    Query,
     Request,
     status,
     BackgroundTasks,
 )
-from fastapi.templating import Jinja2Templates
 from fastapi.security import OAuth2PasswordRequestForm
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.base import MessageResponse
 from app.exceptions.token_decode_exception import TokenDecodeException
 from app.exceptions.user_exists_exception import UserExistsException
-from app.schemas.auth import AuthResponse, TokenRefreshRequest
+from app.schemas.auth import AuthResponse, LogoutRequest, TokenRefreshRequest
 from app.entity.user import User
-from app.services.user import UserService
+from app.security.password_hasher import password_hasher
+from app.services.user import UserService, rehash_password
+from app.services.templates import templates
 from app.repository.user import UserRepository
 from app.database.db import get_db
+from app.middlewares.deadline import DeadlineRoute
+from app.security.rate_limiter import rate_limiter
 from app.schemas.user import (
     UserCreateRequest,
     UserModel,
     UserPasswordRestoreRequest,
     UserPasswordUpdateRequest,
+    UserAvailabilityResponse,
     UserResendVerificationEmailRequest,
     UserResponse,
 )
-from app.services.auth import auth_service, get_current_user
+from app.services.auth import auth_service, get_current_user, oauth2_scheme
 
 
-router = APIRouter(prefix="/auth", tags=["auth"])
-limiter = Limiter(key_func=get_remote_address)
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=DeadlineRoute)
 
 
 @router.post(
@@ -41,16 +43,14 @@ limiter = Limiter(key_func=get_remote_address)
     response_model=UserResponse,
     status_code=status.HTTP_201_CREATED,
     description="Register a new user",
+    dependencies=[Depends(rate_limiter.limit("5/minute"))],
 )
-@limiter.limit("5/minute")
 async def register(
-    request: Request,
-    background_tasks: BackgroundTasks,
     user_request: UserCreateRequest,
     db: AsyncSession = Depends(get_db),
 ):
     user_repository = UserRepository(db)
-    service = UserService(user_repository, background_tasks)
+    service = UserService(user_repository)
 
     try:
         user = await service.create_user(
@@ -72,15 +72,30 @@ async def register(
     return user
 
 
+@router.get(
+    "/availability",
+    response_model=UserAvailabilityResponse,
+    status_code=status.HTTP_200_OK,
+    description="Check if a username and email are free to register",
+    dependencies=[Depends(rate_limiter.limit("60/minute"))],
+)
+async def availability(
+    username: str | None = Query(default=None, min_length=3, max_length=255),
+    email: str | None = Query(default=None, min_length=1, max_length=255),
+    db: AsyncSession = Depends(get_db),
+):
+    service = UserService(UserRepository(db))
+    return await service.check_availability(username, email)
+
+
 @router.get(
     "/me",
     response_model=UserResponse,
     status_code=status.HTTP_200_OK,
     description="Get current user",
+    dependencies=[Depends(rate_limiter.limit("3/minute"))],
 )
-@limiter.limit("3/minute")
 async def get_me(
-    request: Request,
     current_user: User = Depends(get_current_user),
 ):
     return current_user
@@ -91,10 +106,10 @@ async def get_me(
     response_model=AuthResponse,
     status_code=status.HTTP_200_OK,
     description="Login a user",
+    dependencies=[Depends(rate_limiter.limit("5/minute"))],
 )
-@limiter.limit("5/minute")
 async def login(
-    request: Request,
+    background_tasks: BackgroundTasks,
     oauth2_request: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db),
 ):
@@ -109,7 +124,9 @@ async def login(
             detail="Invalid credentials",
         )
 
-    if not await auth_service.verify_password(oauth2_request.password, user.password):
+    if not await auth_service.verify_password(
+        user.username, oauth2_request.password, user.password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -121,9 +138,16 @@ async def login(
             detail="Email not verified",
         )
 
-    refresh_token = await auth_service.create_refresh_token(user)
+    if password_hasher.needs_update(user.password):
+        background_tasks.add_task(
+            rehash_password,
+            user.id,
+            user.username,
+            user.password,
+            oauth2_request.password,
+        )
 
-    await service.update_refresh_token(user, refresh_token)
+    refresh_token = await auth_service.create_refresh_token(user)
 
     return AuthResponse(
         access_token=await auth_service.create_access_token(user),
@@ -141,25 +165,40 @@ async def refresh_token(
     request: TokenRefreshRequest,
     db: AsyncSession = Depends(get_db),
 ):
-    user = await auth_service.verify_refresh_token(request.refresh_token, db)
+    user, refresh_token = await auth_service.rotate_refresh_token(
+        request.refresh_token, db
+    )
     return AuthResponse(
         access_token=await auth_service.create_access_token(user),
-        refresh_token=request.refresh_token,
+        refresh_token=refresh_token,
     )
 
 
+@router.post(
+    "/logout",
+    response_model=MessageResponse,
+    status_code=status.HTTP_200_OK,
+    description="Revoke the access token and, if given, the refresh token",
+)
+async def logout(
+    request: LogoutRequest | None = None,
+    token: str = Depends(oauth2_scheme),
+):
+    await auth_service.logout(token, request.refresh_token if request else None)
+    return MessageResponse(message="Logged out successfully")
+
+
 @router.get(
     "/confirmed_email/{token}",
     status_code=status.HTTP_200_OK,
     description="Confirm a user's email",
 )
 async def confirmed_email(
-    background_tasks: BackgroundTasks,
     token: str = Path(description="The token of the user"),
     db: AsyncSession = Depends(get_db),
 ):
     user_repository = UserRepository(db)
-    service = UserService(user_repository, background_tasks)
+    service = UserService(user_repository)
 
     try:
         await service.confirm_email(token)
@@ -173,16 +212,14 @@ async def confirmed_email(
     "/resend_verification_email",
     status_code=status.HTTP_200_OK,
     description="Resend a verification email",
+    dependencies=[Depends(rate_limiter.limit("3/minute"))],
 )
-@limiter.limit("3/minute")
 async def resend_verification_email(
-    request: Request,
-    background_tasks: BackgroundTasks,
     user_request: UserResendVerificationEmailRequest,
     db: AsyncSession = Depends(get_db),
 ):
     user_repository = UserRepository(db)
-    service = UserService(user_repository, background_tasks)
+    service = UserService(user_repository)
 
     user = await service.get_user_by_email(user_request.email)
 
@@ -199,16 +236,14 @@ async def resend_verification_email(
     "/request_password_reset",
     status_code=status.HTTP_200_OK,
     description="Request a password reset",
+    dependencies=[Depends(rate_limiter.limit("2/minute"))],
 )
-@limiter.limit("2/minute")
 async def request_password_reset(
-    request: Request,
-    background_tasks: BackgroundTasks,
     user_request: UserPasswordRestoreRequest,
     db: AsyncSession = Depends(get_db),
 ):
     user_repository = UserRepository(db)
-    service = UserService(user_repository, background_tasks)
+    service = UserService(user_repository)
 
     await service.request_password_reset(user_request.email)
 
@@ -219,16 +254,14 @@ async def request_password_reset(
     "/password_reset",
     status_code=status.HTTP_200_OK,
     description="Change a user's password",
+    dependencies=[Depends(rate_limiter.limit("2/minute"))],
 )
-@limiter.limit("2/minute")
 async def password_reset(
-    request: Request,
-    background_tasks: BackgroundTasks,
     user_request: UserPasswordUpdateRequest,
     db: AsyncSession = Depends(get_db),
 ):
     user_repository = UserRepository(db)
-    service = UserService(user_repository, background_tasks)
+    service = UserService(user_repository)
 
     user = await auth_service.verify_password_reset_token(
         user_request.password_reset_token, db
@@ -251,7 +284,7 @@ async def reset_password(
 ):
     user = await auth_service.verify_password_reset_token(token, db)
 
-    return Jinja2Templates(directory="templates").TemplateResponse(
+    return templates.TemplateResponse(
         "reset_password.html",
         {
             "request": request,
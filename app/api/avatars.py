@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException, Path, status
+from fastapi.responses import FileResponse
+
+from app.conf.config import settings
+from app.middlewares.deadline import DeadlineRoute
+from app.services.avatar_storage import LocalAvatarStorage
+from app.services.upload_file import avatar_storage
+
+router = APIRouter(prefix="/avatars", tags=["avatars"], route_class=DeadlineRoute)
+
+
+@router.get(
+    "/{file_name}",
+    response_class=FileResponse,
+    status_code=status.HTTP_200_OK,
+    description="Get an avatar stored locally",
+)
+async def get_avatar(file_name: str = Path(description="The file name of the avatar")):
+    path = (
+        avatar_storage.path(file_name)
+        if isinstance(avatar_storage, LocalAvatarStorage)
+        else None
+    )
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Avatar not found"
+        )
+
+    return FileResponse(
+        path,
+        headers={
+            "Cache-Control": (
+                f"public, max-age={settings.AVATAR_CACHE_MAX_AGE_SECONDS}, immutable"
+            )
+        },
+    )
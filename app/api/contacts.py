@@ -2,19 +2,22 @@ from typing import List
 from fastapi import APIRouter, Body, HTTPException, Depends, Path, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.entity.user import User
+from app.conf.config import settings
 from app.database.db import get_db
+from app.middlewares.deadline import DeadlineRoute
 from app.repository.contact import ContactRepository
 from app.schemas.contact import (
     ContactCreateRequest,
     ContactModel,
     ContactQuery,
     ContactResponse,
+    ContactStatsResponse,
 )
 from app.services.contact import ContactService
-from app.services.auth import get_current_user
+from app.schemas.auth import Principal
+from app.services.auth import get_current_principal
 
-router = APIRouter(prefix="/contacts", tags=["contacts"])
+router = APIRouter(prefix="/contacts", tags=["contacts"], route_class=DeadlineRoute)
 
 
 @router.get(
@@ -26,7 +29,7 @@ router = APIRouter(prefix="/contacts", tags=["contacts"])
 async def contacts(
     query: ContactQuery = Query(),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     contact_repository = ContactRepository(db)
     contact_service = ContactService(contact_repository)
@@ -43,7 +46,7 @@ async def contacts(
 async def create_contact(
     contact_request: ContactCreateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     contact_repository = ContactRepository(db)
     contact_service = ContactService(contact_repository)
@@ -63,7 +66,10 @@ async def create_contact(
     "/closest-birthday",
     response_model=List[ContactResponse],
     status_code=status.HTTP_200_OK,
-    description="Get contacts with closest birthday in the next 7 days",
+    description=(
+        "Get contacts with closest birthday in the next "
+        f"{settings.UPCOMING_BIRTHDAYS_DAYS} days"
+    ),
 )
 async def contacts_closest_birthday(
     limit: int = Query(
@@ -73,16 +79,31 @@ async def contacts_closest_birthday(
         default=0, ge=0, description="Offset the number of contacts to return"
     ),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     contact_repository = ContactRepository(db)
     contact_service = ContactService(contact_repository)
     contacts = await contact_service.get_closest_birthday(
-        7, limit, offset, current_user.id
+        settings.UPCOMING_BIRTHDAYS_DAYS, limit, offset, current_user.id
     )
     return contacts
 
 
+@router.get(
+    "/stats",
+    response_model=ContactStatsResponse,
+    status_code=status.HTTP_200_OK,
+    description="Get contact statistics",
+)
+async def contacts_stats(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    contact_repository = ContactRepository(db)
+    contact_service = ContactService(contact_repository)
+    return await contact_service.get_stats(current_user.id)
+
+
 @router.put(
     "/{id}",
     response_model=ContactResponse,
@@ -93,7 +114,7 @@ async def update_contact(
     contact_model: ContactModel,
     id: int = Path(ge=1, description="The ID of the contact"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     contact_repository = ContactRepository(db)
     contact_service = ContactService(contact_repository)
@@ -115,7 +136,7 @@ async def update_contact(
 async def get_contact(
     id: int = Path(ge=1, description="The ID of the contact"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     contact_repository = ContactRepository(db)
     contact_service = ContactService(contact_repository)
@@ -136,7 +157,7 @@ async def get_contact(
 async def delete_contact(
     id: int = Path(ge=1, description="The ID of the contact"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     contact_repository = ContactRepository(db)
     contact_service = ContactService(contact_repository)
@@ -1,10 +1,8 @@
 from typing import List
 from fastapi import (
     APIRouter,
-    BackgroundTasks,
     Depends,
-    File,
-    UploadFile,
+    Request,
     status,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,11 +11,13 @@ from app.entity.user import User
 from app.repository.user import UserRepository
 from app.schemas.user import UserResponse
 from app.database.db import get_db
+from app.middlewares.deadline import DeadlineRoute
 from app.services.user import UserService
+from app.services.upload_stream import StreamedUpload
 from app.services.auth import get_current_admin_user
 
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=DeadlineRoute)
 
 
 @router.patch(
@@ -25,13 +25,36 @@ router = APIRouter(prefix="/users", tags=["users"])
     response_model=UserResponse,
     status_code=status.HTTP_200_OK,
     description="Update avatar",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {
+                            "file": {
+                                "type": "string",
+                                "format": "binary",
+                                "description": "The avatar file",
+                            }
+                        },
+                    }
+                }
+            },
+        }
+    },
 )
 async def update_avatar(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(description="The avatar file"),
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_admin_user),
 ):
-    user_repository = UserRepository(db)
-    service = UserService(user_repository, background_tasks)
-    return await service.update_avatar(current_user, file)
+    upload = await StreamedUpload("file").receive(request)
+    try:
+        user_repository = UserRepository(db)
+        service = UserService(user_repository)
+        return await service.update_avatar(current_user, upload)
+    finally:
+        upload.close()
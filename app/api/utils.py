@@ -3,9 +3,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 from app.schemas.base import MessageResponse
+from app.schemas.metrics import MetricsResponse
+from app.security.login_admission import login_admission
+from app.security.password_hasher import password_hasher
+from app.services.mail_queue import mail_queue
 from app.database.db import get_db
+from app.middlewares.deadline import DeadlineRoute
 
-router = APIRouter(tags=["utils"])
+router = APIRouter(tags=["utils"], route_class=DeadlineRoute)
 
 
 @router.get("/healthchecker", description="Check if the database is running")
@@ -26,3 +31,16 @@ async def healthchecker(db: AsyncSession = Depends(get_db)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error connecting to the database",
         )
+
+
+@router.get(
+    "/metrics",
+    response_model=MetricsResponse,
+    description="Get the application metrics",
+)
+async def metrics():
+    return MetricsResponse(
+        password_hasher=password_hasher.metrics(),
+        login_admission=login_admission.metrics(),
+        mail_queue=mail_queue.metrics(),
+    )
@@ -7,10 +7,22 @@ class Settings(BaseSettings):
     DOMAIN: str
 
     DB_URL: str
+    DB_POOL_TIMEOUT_SECONDS: float = 5
+
+    REQUEST_DEADLINE_SECONDS: float = 10
+    REQUEST_DEADLINES: dict[str, float] = {}
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: dict[str, str] = {}
+    RATE_LIMIT_MODE: str = "redis"
+    RATE_LIMIT_LEASE_SHARE: float = 0.1
+    RATE_LIMIT_LEASE_MIN: int = 2
+    RATE_LIMIT_LEASE_SECONDS: float = 5
 
     REDIS_HOST: str
     REDIS_PORT: int
     REDIS_PASSWORD: str | None = None
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 1
 
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
@@ -22,15 +34,68 @@ class Settings(BaseSettings):
     MAIL_SSL_TLS: bool
     USE_CREDENTIALS: bool
     VALIDATE_CERTS: bool
+    MAIL_TIMEOUT_SECONDS: float = 30
+    MAIL_POOL_SIZE: int = 4
+    MAIL_POOL_HEALTH_CHECK_SECONDS: float = 30
+    MAIL_POOL_MAX_IDLE_SECONDS: float = 300
+    MAIL_POOL_MAX_MESSAGES: int = 100
+    MAIL_WORKER_CONCURRENCY: int = 8
+    MAIL_MAX_ATTEMPTS: int = 5
+    MAIL_RETRY_BACKOFF_SECONDS: float = 10
+    MAIL_RETRY_BACKOFF_MAX_SECONDS: float = 60 * 60
+    MAIL_CLAIM_IDLE_SECONDS: float = 60 * 5
+    MAIL_DEAD_LETTER_MAX_LENGTH: int = 10000
+    MAIL_COALESCE_SECONDS: int = 60
+
+    TEMPLATE_BYTECODE_CACHE_DIR: str | None = None
+    TEMPLATE_AUTO_RELOAD: bool = False
 
-    JWT_SECRET: str
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    PASSWORD_HASH_ROUNDS: int = 0
+    PASSWORD_HASH_TARGET_MS: float = 250
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64
+    LOGIN_VERIFY_MAX_IN_FLIGHT: int = 32
+    LOGIN_VERIFY_RESERVED: int = 8
+    LOGIN_RECENT_SECONDS: int = 60 * 60 * 24 * 30
+
+    JWT_SECRET: str | None = None
     JWT_ALGORITHM: str
+    JWT_KEY_ID: str | None = None
+    JWT_PRIVATE_KEY_FILE: str | None = None
+    JWT_PUBLIC_KEY_FILE: str | None = None
+    JWT_VERIFICATION_KEYS: dict[str, dict[str, str]] = {}
     JWT_EXPIRATION_SECONDS: int
     JWT_REFRESH_EXPIRATION_SECONDS: int
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 5
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = 100000
+    TOKEN_REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    USER_AVAILABILITY_BLOOM_CAPACITY: int = 1000000
+    USER_AVAILABILITY_BLOOM_ERROR_RATE: float = 0.01
+
+    AVATAR_STORAGE: str = "cloudinary"
+    AVATAR_LOCAL_DIR: str = "media/avatars"
+    AVATAR_CACHE_MAX_AGE_SECONDS: int = 60 * 60 * 24 * 365
+    CLOUDINARY_NAME: str | None = None
+    CLOUDINARY_API_KEY: str | None = None
+    CLOUDINARY_API_SECRET: str | None = None
+    UPLOAD_WORKERS: int = 4
+    UPLOAD_QUEUE_LIMIT: int = 16
+    UPLOAD_TIMEOUT_SECONDS: float = 30
+    UPLOAD_MAX_BYTES: int = 5 * 1024 * 1024
+    UPLOAD_SPOOL_MAX_MEMORY_BYTES: int = 256 * 1024
+    AVATAR_UPLOAD_CACHE_SECONDS: int = 60 * 60 * 24
+    AVATAR_SIZE: int = 250
+    AVATAR_FORMAT: str = "WEBP"
+    AVATAR_QUALITY: int = 85
+    AVATAR_MAX_PIXELS: int = 40_000_000
+    AVATAR_PROCESS_WORKERS: int = 2
 
-    CLOUDINARY_NAME: str
-    CLOUDINARY_API_KEY: str
-    CLOUDINARY_API_SECRET: str
+    UPCOMING_BIRTHDAYS_DAYS: int = 7
+    CONTACTS_PARTITIONS: int = 0
+    CONTACT_STATS_RECENT_DAYS: int = 30
+    CONTACT_STATS_CACHE_TTL_SECONDS: int = 60 * 5
 
     model_config = ConfigDict(
         extra="ignore", env_file=".env", env_file_encoding="utf-8", case_sensitive=True
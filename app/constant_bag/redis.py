@@ -1,2 +1,19 @@
 class RedisKey:
     AUTH_USER = "auth:user:{username}"
+    AUTH_TOKEN_VERSION = "auth:token_version:{user_id}"
+    UPCOMING_BIRTHDAYS_BUILT_ON = "contacts:upcoming_birthdays:built_on"
+    UPCOMING_BIRTHDAYS_REBUILD_LOCK = "contacts:upcoming_birthdays:rebuild_lock"
+    CONTACT_STATS = "contacts:stats:{user_id}"
+    AUTH_REFRESH_FAMILY = "auth:refresh_family:{family}"
+    AUTH_REFRESH_FAMILIES = "auth:refresh_families:{user_id}"
+    AUTH_REVOKED_TOKEN = "auth:revoked:{jti}"
+    AUTH_REVOKED_TOKENS = "auth:revoked_tokens"
+    AUTH_TAKEN_IDENTITIES = "auth:taken_identities"
+    AUTH_RECENT_LOGIN = "auth:recent_login:{username}"
+    RATE_LIMIT = "rate_limit:{route}:{client}"
+    MAIL_QUEUE = "mail:queue"
+    MAIL_RETRY = "mail:retry"
+    MAIL_DEAD_LETTER = "mail:dead_letter"
+    MAIL_WORKER_METRICS = "mail:worker_metrics"
+    MAIL_COALESCE = "mail:coalesce:{template}:{email}"
+    AVATAR_UPLOAD = "avatar:upload:{storage}:{format}:{size}:{quality}:{digest}"
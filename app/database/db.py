@@ -1,13 +1,43 @@
 import contextlib
 
+from sqlalchemy import event
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
 
 from app.conf.config import settings
+from app.middlewares.deadline import remaining_time
+
+
+class DeadlineSession(Session):
+    """
+    Session that bounds every transaction by the current request deadline
+    """
+
+
+@event.listens_for(DeadlineSession, "after_begin")
+def apply_statement_timeout(session, transaction, connection):
+    """
+    Set the statement timeout of a transaction to the remaining request time
+
+    Args:
+        session (Session): The session that began the transaction
+        transaction (SessionTransaction): The transaction
+        connection (Connection): The connection of the transaction
+
+    Returns:
+        None
+    """
+    timeout = remaining_time()
+    if timeout is None or connection.dialect.name != "postgresql":
+        return
+    connection.exec_driver_sql(
+        f"SET LOCAL statement_timeout = {max(1, int(timeout * 1000))}"
+    )
 
 
 class DatabaseSessionManager:
@@ -20,9 +50,14 @@ class DatabaseSessionManager:
     """
 
     def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url)
+        self._engine: AsyncEngine | None = create_async_engine(
+            url, pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS
+        )
         self._session_maker: async_sessionmaker = async_sessionmaker(
-            autoflush=False, autocommit=False, bind=self._engine
+            autoflush=False,
+            autocommit=False,
+            bind=self._engine,
+            sync_session_class=DeadlineSession,
         )
 
     @contextlib.asynccontextmanager
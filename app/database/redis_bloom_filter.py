@@ -0,0 +1,91 @@
+import logging
+from redis import Redis
+
+from app.security.bloom_filter import bloom_filter_dimensions, bloom_filter_positions
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+
+class RedisBloomFilter:
+    """
+    Bloom filter of strings kept in a Redis bitmap shared by all workers
+
+    Items can only be added, so the filter never reports an added item as
+    missing. It answers only once it has been seeded; until then, and when
+    Redis is unavailable, every item is reported as possibly present so
+    callers fall back to the source of truth.
+
+    Attributes:
+        redis (Redis): The Redis client
+        key (str): The key of the bitmap
+        ready_key (str): The key set once the filter has been seeded
+        size (int): The number of bits
+        hash_count (int): The number of bits set per item
+    """
+
+    def __init__(self, redis: Redis, key: str, capacity: int, error_rate: float):
+        self.redis = redis
+        self.key = key
+        self.ready_key = f"{key}:ready"
+        self.size, self.hash_count = bloom_filter_dimensions(capacity, error_rate)
+
+    def add(self, *items: str) -> None:
+        """
+        Add items
+
+        Args:
+            items (str): The items to add
+
+        Returns:
+            None
+        """
+        pipeline = self.redis.pipeline(transaction=False)
+        for item in items:
+            for position in bloom_filter_positions(item, self.size, self.hash_count):
+                pipeline.setbit(self.key, position, 1)
+        pipeline.execute()
+
+    def might_contain(self, item: str) -> bool:
+        """
+        Check if an item may have been added
+
+        Args:
+            item (str): The item to check
+
+        Returns:
+            bool: False if the item was never added, True otherwise
+        """
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.exists(self.ready_key)
+            for position in bloom_filter_positions(item, self.size, self.hash_count):
+                pipeline.getbit(self.key, position)
+            ready, *bits = pipeline.execute()
+        except Exception as e:
+            logging.error(f"Error checking Bloom filter {self.key}: {e}")
+            return True
+        return not ready or all(bits)
+
+    def is_seeded(self) -> bool:
+        """
+        Check if the filter has been seeded
+
+        Returns:
+            bool: True if the filter has been seeded
+        """
+        return bool(self.redis.exists(self.ready_key))
+
+    def mark_seeded(self) -> None:
+        """
+        Start answering from the filter once every existing item is added
+
+        Items added by other workers while seeding are kept, as both only
+        set bits.
+
+        Returns:
+            None
+        """
+        self.redis.set(self.ready_key, 1)
@@ -5,6 +5,7 @@ Import this file to ensure all models are registered with SQLAlchemy metadata.
 
 from app.entity.base import Base
 from app.entity.contact import Contact
+from app.entity.upcoming_birthday import UpcomingBirthday
 from app.entity.user import User
 
 
@@ -1,25 +1,76 @@
-from datetime import datetime
-from sqlalchemy import Column, Date, ForeignKey, Integer, String
+from datetime import date, datetime
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, String, event, text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.orm import relationship
 from typing import TYPE_CHECKING
 
+from app.conf.config import settings
 from app.entity.base import AllTimestamps, Base
 
 if TYPE_CHECKING:
     from app.entity.user import User
 
 
+def birthday_month_day_key(value: date) -> int:
+    """
+    Get the normalized month-day key of a date
+
+    The key is ``month * 100 + day`` and does not depend on the year, so
+    sorting by it orders birthdays by calendar date in leap and non-leap years.
+
+    Args:
+        value (date): The date to get the key for
+
+    Returns:
+        int: The month-day key, e.g. 1231 for December 31
+    """
+    return value.month * 100 + value.day
+
+
+def contacts_partitions_ddl(partitions: int, table: str = "contacts") -> list[str]:
+    """
+    Build the statements creating the hash partitions of a contacts table
+
+    Args:
+        partitions (int): The number of partitions
+        table (str): The name of the partitioned table
+
+    Returns:
+        list[str]: The CREATE TABLE statements, one per partition
+    """
+    return [
+        f"CREATE TABLE IF NOT EXISTS {table}_p{remainder} PARTITION OF {table} "
+        f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        for remainder in range(partitions)
+    ]
+
+
 class Contact(Base, AllTimestamps):
     """
     Contact model
     """
 
     __tablename__ = "contacts"
+    __table_args__ = (
+        Index(
+            "ix_contacts_user_id_birthday_month_day",
+            "user_id",
+            "birthday_month_day",
+            "id",
+        ),
+        (
+            {"postgresql_partition_by": "HASH (user_id)"}
+            if settings.CONTACTS_PARTITIONS
+            else {}
+        ),
+    )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("users.id"), nullable=False
+        Integer,
+        ForeignKey("users.id"),
+        nullable=False,
+        primary_key=bool(settings.CONTACTS_PARTITIONS),
     )
     user: Mapped["User"] = relationship(back_populates="contacts")
     first_name: Mapped[str] = mapped_column(String, nullable=False)
@@ -30,8 +81,15 @@ class Contact(Base, AllTimestamps):
     _birthday_of_the_year: Mapped[int] = mapped_column(
         Integer, nullable=True, name="birthday_of_the_year"
     )
+    _birthday_month_day: Mapped[int] = mapped_column(
+        Integer, nullable=True, name="birthday_month_day"
+    )
     additional_info: Mapped[str] = mapped_column(String, nullable=True)
 
+    @property
+    def birthday_month_day(self) -> int | None:
+        return self._birthday_month_day
+
     @property
     def birthday_of_the_year(self) -> int | None:
         return self._birthday_of_the_year
@@ -49,8 +107,21 @@ class Contact(Base, AllTimestamps):
         self._birthday = value
         if value:
             self._birthday_of_the_year = value.timetuple().tm_yday
+            self._birthday_month_day = birthday_month_day_key(value)
         else:
             self._birthday_of_the_year = None
+            self._birthday_month_day = None
 
     def __repr__(self):
         return f"Contact(id={self.id}, user_id={self.user_id}, first_name={self.first_name}, last_name={self.last_name}, email={self.email}, phone={self.phone}, birthday={self.birthday}, additional_info={self.additional_info})"
+
+
+@event.listens_for(Contact.__table__, "after_create")
+def create_contacts_partitions(target, connection, **kw):
+    """
+    Create the hash partitions after the partitioned contacts table
+    """
+    if connection.dialect.name != "postgresql" or not settings.CONTACTS_PARTITIONS:
+        return
+    for statement in contacts_partitions_ddl(settings.CONTACTS_PARTITIONS):
+        connection.execute(text(statement))
@@ -0,0 +1,32 @@
+from sqlalchemy import ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.entity.base import Base
+
+
+class UpcomingBirthday(Base):
+    """
+    Upcoming birthday projection model
+
+    One row per contact whose birthday falls into the upcoming birthdays
+    window of the day the projection was built for.
+    """
+
+    __tablename__ = "upcoming_birthdays"
+    __table_args__ = (
+        Index(
+            "ix_upcoming_birthdays_user_id_sort_key",
+            "user_id",
+            "sort_key",
+            "contact_id",
+        ),
+    )
+
+    contact_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id"), nullable=False
+    )
+    sort_key: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"UpcomingBirthday(contact_id={self.contact_id}, user_id={self.user_id}, sort_key={self.sort_key})"
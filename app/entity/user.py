@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Integer, String, Enum
+from sqlalchemy import Boolean, Integer, String, Enum, text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.orm import relationship
 from typing import TYPE_CHECKING
@@ -30,3 +30,6 @@ class User(Base, AllTimestamps):
         nullable=False,
         default=UserRole.USER,
     )
+    token_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
@@ -0,0 +1,8 @@
+class DeadlineExceededException(Exception):
+    """
+    Exception for when a request runs past its deadline
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,8 @@
+class InvalidImageException(Exception):
+    """
+    Exception for when an uploaded file is not a supported image
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,8 @@
+class PasswordHasherBusyException(Exception):
+    """
+    Exception for when the password hashing queue is full
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
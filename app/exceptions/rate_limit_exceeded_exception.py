@@ -0,0 +1,9 @@
+class RateLimitExceededException(Exception):
+    """
+    Exception for when a client made too many requests to a route
+    """
+
+    def __init__(self, message: str, retry_after: int):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
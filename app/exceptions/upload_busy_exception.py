@@ -0,0 +1,8 @@
+class UploadBusyException(Exception):
+    """
+    Exception for when the file upload queue is full
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
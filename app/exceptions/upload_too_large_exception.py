@@ -0,0 +1,8 @@
+class UploadTooLargeException(Exception):
+    """
+    Exception for when an uploaded file is larger than allowed
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
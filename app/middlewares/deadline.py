@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Callable, Coroutine
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy.exc import DBAPIError
+
+from app.conf.config import settings
+from app.exceptions.deadline_exceeded_exception import DeadlineExceededException
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+POSTGRES_QUERY_CANCELED = "57014"
+
+request_deadline: ContextVar[float | None] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+def route_deadline(name: str) -> float:
+    """
+    Get the deadline of a route in seconds
+
+    Args:
+        name (str): The name of the route
+
+    Returns:
+        float: The deadline from REQUEST_DEADLINES, or REQUEST_DEADLINE_SECONDS
+    """
+    return settings.REQUEST_DEADLINES.get(name, settings.REQUEST_DEADLINE_SECONDS)
+
+
+def remaining_time(default: float | None = None) -> float | None:
+    """
+    Get the time left until the current request deadline
+
+    Args:
+        default (float | None): The timeout to use outside of a request, or
+            the upper bound of the remaining time inside one
+
+    Returns:
+        float | None: The remaining time in seconds, or the default if there
+        is no request deadline
+
+    Raises:
+        DeadlineExceededException: If the deadline has already passed
+    """
+    deadline = request_deadline.get()
+    if deadline is None:
+        return default
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceededException("Request deadline exceeded")
+    return remaining if default is None else min(remaining, default)
+
+
+def is_statement_timeout(error: DBAPIError) -> bool:
+    """
+    Check if a database error was caused by statement_timeout
+
+    Args:
+        error (DBAPIError): The database error
+
+    Returns:
+        bool: True if the statement was cancelled by the timeout
+    """
+    return getattr(error.orig, "pgcode", None) == POSTGRES_QUERY_CANCELED
+
+
+class DeadlineRoute(APIRoute):
+    """
+    Route that cancels its handler once the route deadline has passed
+
+    The deadline is stored in a context variable, so the database session,
+    Redis and mail calls made by the handler can bound their own timeouts.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        handler = super().get_route_handler()
+
+        async def deadline_route_handler(request: Request) -> Response:
+            seconds = route_deadline(self.name)
+            token = request_deadline.set(time.monotonic() + seconds)
+            try:
+                return await asyncio.wait_for(handler(request), timeout=seconds)
+            except asyncio.TimeoutError:
+                logging.error(f"Route {self.name} exceeded its deadline of {seconds}s")
+                raise DeadlineExceededException("Request deadline exceeded")
+            except DBAPIError as e:
+                if is_statement_timeout(e):
+                    raise DeadlineExceededException("Request deadline exceeded") from e
+                raise
+            finally:
+                request_deadline.reset(token)
+
+        return deadline_route_handler
@@ -1,9 +1,9 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, Row, Select, case, func, select
 from app.schemas.contact import ContactModel, ContactQuery
-from app.entity.contact import Contact
+from app.entity.contact import Contact, birthday_month_day_key
 
 
 class ContactRepository:
@@ -21,6 +21,9 @@ class ContactRepository:
         """
         Get contact by ID
 
+        Passing the user ID lets PostgreSQL prune the contacts partitions
+        to the one holding the user's contacts.
+
         Args:
             id (int): The ID of the contact
             user_id (int | None): The ID of the user
@@ -170,22 +173,96 @@ class ContactRepository:
             )
 
         if query.birthday_in_next_days:
-            today = datetime.now().timetuple().tm_yday
-            if today + query.birthday_in_next_days > 365:
-                to_day = today + query.birthday_in_next_days - 365
-                stmt = stmt.where(
-                    (Contact._birthday_of_the_year >= today)
-                    | (Contact._birthday_of_the_year <= to_day)
-                )
-            else:
-                to_day = today + query.birthday_in_next_days
-                stmt = stmt.where(
-                    (Contact._birthday_of_the_year >= today)
-                    & (Contact._birthday_of_the_year <= to_day)
-                )
+            stmt = self._filter_birthday_in_next_days(
+                stmt, query.birthday_in_next_days
+            )
 
         if user_id:
             stmt = stmt.where(Contact.user_id == user_id)
 
         result = await self.db.execute(stmt)
         return result.scalars().all()
+
+    async def get_stats(self, user_id: int, recent_since: datetime) -> List[Row]:
+        """
+        Count contacts per birth month in a single grouped query
+
+        Args:
+            user_id (int): The ID of the user
+            recent_since (datetime): Contacts created since then count as recent
+
+        Returns:
+            List[Row]: Rows of birth month (None for contacts without birthday),
+            number of contacts and number of recently added contacts
+        """
+        month = (Contact._birthday_month_day // 100).label("month")
+        stmt = (
+            select(
+                month,
+                func.count(Contact.id).label("total"),
+                func.sum(case((Contact.created_at >= recent_since, 1), else_=0)).label(
+                    "recent"
+                ),
+            )
+            .where(Contact.user_id == user_id)
+            .group_by(month)
+        )
+        result = await self.db.execute(stmt)
+        return result.all()
+
+    @staticmethod
+    def birthday_in_next_days_window(
+        days: int, today: date | None = None
+    ) -> tuple[ColumnElement[bool], int, bool]:
+        """
+        Build the condition for contacts with birthday in the next days
+
+        The window is compared on the normalized month-day key, so it is not
+        shifted by leap years, and wraps across the year end.
+
+        Args:
+            days (int): The number of days in the future
+            today (date | None): The first day of the window, today by default
+
+        Returns:
+            tuple[ColumnElement[bool], int, bool]: The condition, the month-day
+            key of the first day and whether the window wraps across the year end
+        """
+        today = today or datetime.now().date()
+        last_day = today + timedelta(days=days)
+        from_key = birthday_month_day_key(today)
+        to_key = birthday_month_day_key(last_day)
+        month_day = Contact._birthday_month_day
+
+        if last_day.year == today.year:
+            return (month_day >= from_key) & (month_day <= to_key), from_key, False
+
+        if to_key < from_key:
+            return (month_day >= from_key) | (month_day <= to_key), from_key, True
+
+        return month_day.is_not(None), from_key, True
+
+    @classmethod
+    def _filter_birthday_in_next_days(cls, stmt: Select, days: int) -> Select:
+        """
+        Filter contacts with birthday in the next days, closest first
+
+        Contacts are ordered by the days until their next birthday, which for
+        a window inside one year is the ``(user_id, birthday_month_day, id)``
+        index order.
+
+        Args:
+            stmt (Select): The statement to filter
+            days (int): The number of days in the future
+
+        Returns:
+            Select: The filtered and ordered statement
+        """
+        condition, from_key, wraps = cls.birthday_in_next_days_window(days)
+        month_day = Contact._birthday_month_day
+        stmt = stmt.where(condition)
+
+        if not wraps:
+            return stmt.order_by(month_day, Contact.id)
+
+        return stmt.order_by(month_day < from_key, month_day, Contact.id)
@@ -0,0 +1,135 @@
+from datetime import date
+from typing import List
+from sqlalchemy import case, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.entity.contact import Contact
+from app.entity.upcoming_birthday import UpcomingBirthday
+from app.repository.contact import ContactRepository
+
+NEXT_YEAR_SORT_OFFSET = 10000
+
+
+class UpcomingBirthdayRepository:
+    """
+    Repository for managing the upcoming birthdays projection
+
+    Attributes:
+        db (AsyncSession): The database session
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.db = session
+
+    @staticmethod
+    def _projection_select(days: int, today: date):
+        """
+        Select the projection rows of contacts with birthday in the window
+
+        Args:
+            days (int): The number of days in the window
+            today (date): The first day of the window
+
+        Returns:
+            Select: The statement selecting contact ID, user ID and sort key
+        """
+        condition, from_key, _ = ContactRepository.birthday_in_next_days_window(
+            days, today
+        )
+        month_day = Contact._birthday_month_day
+        sort_key = case(
+            (month_day >= from_key, month_day),
+            else_=month_day + NEXT_YEAR_SORT_OFFSET,
+        )
+        return select(Contact.id, Contact.user_id, sort_key).where(condition)
+
+    async def rebuild(self, days: int, today: date) -> None:
+        """
+        Rebuild the whole projection in one set-based pass
+
+        Args:
+            days (int): The number of days in the window
+            today (date): The first day of the window
+
+        Returns:
+            None
+        """
+        await self.db.execute(delete(UpcomingBirthday))
+        await self.db.execute(
+            insert(UpcomingBirthday).from_select(
+                ["contact_id", "user_id", "sort_key"],
+                self._projection_select(days, today),
+            )
+        )
+        await self.db.commit()
+
+    async def refresh_contact(
+        self, contact_id: int, user_id: int, days: int, today: date
+    ) -> None:
+        """
+        Refresh the projection row of a single contact
+
+        Args:
+            contact_id (int): The ID of the contact
+            user_id (int): The ID of the user
+            days (int): The number of days in the window
+            today (date): The first day of the window
+
+        Returns:
+            None
+        """
+        await self.db.execute(
+            delete(UpcomingBirthday).where(UpcomingBirthday.contact_id == contact_id)
+        )
+        await self.db.execute(
+            insert(UpcomingBirthday).from_select(
+                ["contact_id", "user_id", "sort_key"],
+                self._projection_select(days, today).where(
+                    Contact.id == contact_id, Contact.user_id == user_id
+                ),
+            )
+        )
+        await self.db.commit()
+
+    async def delete_contact(self, contact_id: int, user_id: int) -> None:
+        """
+        Delete the projection row of a single contact
+
+        Args:
+            contact_id (int): The ID of the contact
+            user_id (int): The ID of the user
+
+        Returns:
+            None
+        """
+        await self.db.execute(
+            delete(UpcomingBirthday).where(
+                UpcomingBirthday.contact_id == contact_id,
+                UpcomingBirthday.user_id == user_id,
+            )
+        )
+        await self.db.commit()
+
+    async def get_closest(
+        self, user_id: int, limit: int = 10, offset: int = 0
+    ) -> List[Contact]:
+        """
+        Get contacts with upcoming birthday, closest first
+
+        Args:
+            user_id (int): The ID of the user
+            limit (int): The limit of contacts to return
+            offset (int): The offset of the contacts to return
+
+        Returns:
+            List[Contact]: The list of contacts
+        """
+        stmt = (
+            select(Contact)
+            .join(UpcomingBirthday, UpcomingBirthday.contact_id == Contact.id)
+            .where(UpcomingBirthday.user_id == user_id, Contact.user_id == user_id)
+            .order_by(UpcomingBirthday.sort_key, UpcomingBirthday.contact_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
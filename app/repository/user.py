@@ -1,6 +1,9 @@
-from sqlalchemy import select
+from typing import AsyncIterator, List
+from sqlalchemy import Row, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.entity.user import User
+from app.exceptions.user_exists_exception import UserExistsException
 from app.schemas.user import UserModel
 
 
@@ -57,6 +60,56 @@ class UserRepository:
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_taken_field(self, email: str, username: str) -> str | None:
+        """
+        Check in one indexed query if an email or username is taken
+
+        Args:
+            email (str): The email to check
+            username (str): The username to check
+
+        Returns:
+            str | None: "email" or "username" if taken, None otherwise
+        """
+        stmt = (
+            select(User.email)
+            .where(or_(User.email == email, User.username == username))
+            .order_by((User.email == email).desc())
+            .limit(1)
+        )
+        result = await self.db.execute(stmt)
+        taken_email = result.scalar_one_or_none()
+        if taken_email is None:
+            return None
+        return "email" if taken_email == email else "username"
+
+    async def iter_identities(self, batch_size: int = 10000) -> AsyncIterator[List[Row]]:
+        """
+        Iterate over the usernames and emails of all users in batches
+
+        Batches are read by ID ranges, so each one is a short indexed query.
+
+        Args:
+            batch_size (int): The number of users per batch
+
+        Returns:
+            AsyncIterator[List[Row]]: Batches of rows of ID, username and email
+        """
+        last_id = 0
+        while True:
+            stmt = (
+                select(User.id, User.username, User.email)
+                .where(User.id > last_id)
+                .order_by(User.id)
+                .limit(batch_size)
+            )
+            result = await self.db.execute(stmt)
+            rows = result.all()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1].id
+
     async def create(self, user: UserModel) -> User:
         """
         Create user
@@ -66,10 +119,17 @@ class UserRepository:
 
         Returns:
             User: The created user
+
+        Raises:
+            UserExistsException: If the email or username was taken meanwhile
         """
         new_user = User(**user.model_dump())
         self.db.add(new_user)
-        await self.db.commit()
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise UserExistsException("User with this email or username already exists")
         await self.db.refresh(new_user)
         return new_user
 
@@ -97,6 +157,61 @@ class UserRepository:
 
         return None
 
+    async def get_token_version(self, id: int) -> int | None:
+        """
+        Get the token version of a user
+
+        Args:
+            id (int): The ID of the user
+
+        Returns:
+            int | None: The token version if the user is found, None otherwise
+        """
+        stmt = select(User.token_version).where(User.id == id)
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def increment_token_version(self, id: int) -> None:
+        """
+        Increment the token version of a user, revoking the issued access tokens
+
+        Args:
+            id (int): The ID of the user
+
+        Returns:
+            None
+        """
+        stmt = (
+            update(User)
+            .where(User.id == id)
+            .values(token_version=User.token_version + 1)
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    async def replace_password(
+        self, id: int, hashed_password: str, new_hashed_password: str
+    ) -> bool:
+        """
+        Replace the password hash of a user if it was not changed meanwhile
+
+        Args:
+            id (int): The ID of the user
+            hashed_password (str): The current password hash
+            new_hashed_password (str): The new password hash
+
+        Returns:
+            bool: True if the password hash was replaced, False otherwise
+        """
+        stmt = (
+            update(User)
+            .where(User.id == id, User.password == hashed_password)
+            .values(password=new_hashed_password)
+        )
+        result = await self.db.execute(stmt)
+        await self.db.commit()
+        return result.rowcount > 0
+
     async def delete(self, id: int) -> None:
         """
         Delete user
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field, EmailStr
 
+from app.enum.user_role import UserRole
+
 
 class AuthResponse(BaseModel):
     """
@@ -21,5 +23,25 @@ class TokenRefreshRequest(BaseModel):
     """
 
     refresh_token: str = Field(
-        default="", min_length=1, max_length=255, description="Refresh token"
+        default="", min_length=1, max_length=2048, description="Refresh token"
+    )
+
+
+class Principal(BaseModel):
+    """
+    Authenticated user resolved from the access token claims
+    """
+
+    id: int
+    username: str
+    role: UserRole
+
+
+class LogoutRequest(BaseModel):
+    """
+    Logout request model
+    """
+
+    refresh_token: str | None = Field(
+        default=None, min_length=1, max_length=2048, description="Refresh token"
     )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field, EmailStr, model_validator
 
 
@@ -100,3 +100,15 @@ class ContactCreateRequest(BaseModel):
     additional_info: str | None = Field(
         default=None, min_length=1, max_length=255, description="Additional info"
     )
+
+
+class ContactStatsResponse(BaseModel):
+    """
+    Contact statistics response model
+    """
+
+    total: int
+    by_birth_month: Dict[int, int]
+    without_birthday: int
+    recently_added: int
+    recent_days: int
@@ -0,0 +1,53 @@
+from pydantic import BaseModel
+
+
+class PasswordHasherMetrics(BaseModel):
+    """
+    Password hashing pool metrics
+    """
+
+    workers: int
+    queue_limit: int
+    running: int
+    queued: int
+    completed: int
+    rejected: int
+
+
+class LoginAdmissionMetrics(BaseModel):
+    """
+    Login admission control metrics
+    """
+
+    max_in_flight: int
+    reserved: int
+    in_flight: int
+    admitted: int
+    prioritized: int
+    throttled: int
+    rejected: int
+
+
+class MailQueueMetrics(BaseModel):
+    """
+    Outbound mail queue metrics
+    """
+
+    queued: int
+    pending: int
+    scheduled: int
+    dead_letter: int
+    sent: int
+    failed: int
+    retried: int
+    dead_lettered: int
+
+
+class MetricsResponse(BaseModel):
+    """
+    Application metrics response model
+    """
+
+    password_hasher: PasswordHasherMetrics
+    login_admission: LoginAdmissionMetrics
+    mail_queue: MailQueueMetrics
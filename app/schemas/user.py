@@ -64,3 +64,16 @@ class UserPasswordUpdateRequest(BaseModel):
 
     password: str = Field(min_length=8, max_length=255)
     password_reset_token: str = Field(min_length=1, max_length=255)
+
+
+class UserAvailabilityResponse(BaseModel):
+    """
+    User availability response model
+    """
+
+    username_available: bool | None = Field(
+        default=None, description="Whether the username is free, if checked"
+    )
+    email_available: bool | None = Field(
+        default=None, description="Whether the email is free, if checked"
+    )
@@ -0,0 +1,82 @@
+import hashlib
+import math
+from typing import Iterator
+
+
+def bloom_filter_dimensions(capacity: int, error_rate: float) -> tuple[int, int]:
+    """
+    Size a Bloom filter for a capacity and false positive rate
+
+    Args:
+        capacity (int): The number of items the filter is sized for
+        error_rate (float): The target false positive rate
+
+    Returns:
+        tuple[int, int]: The number of bits and the number of bits set per item
+    """
+    size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+    return size, max(1, round(size / capacity * math.log(2)))
+
+
+def bloom_filter_positions(item: str, size: int, hash_count: int) -> Iterator[int]:
+    """
+    Get the bit positions of an item with double hashing
+
+    Args:
+        item (str): The item
+        size (int): The number of bits of the filter
+        hash_count (int): The number of bits set per item
+
+    Returns:
+        Iterator[int]: The bit positions
+    """
+    digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+    first = int.from_bytes(digest[:8], "little")
+    second = int.from_bytes(digest[8:], "little") | 1
+    return ((first + i * second) % size for i in range(hash_count))
+
+
+class BloomFilter:
+    """
+    In-process Bloom filter of strings
+
+    Membership checks have no false negatives and a false positive rate of
+    about ``error_rate`` while at most ``capacity`` items have been added.
+
+    Attributes:
+        capacity (int): The number of items the filter is sized for
+        error_rate (float): The target false positive rate
+        size (int): The number of bits
+        hash_count (int): The number of bits set per item
+        count (int): The number of added items
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size, self.hash_count = bloom_filter_dimensions(capacity, error_rate)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, item: str) -> None:
+        """
+        Add an item
+
+        Args:
+            item (str): The item to add
+
+        Returns:
+            None
+        """
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def _positions(self, item: str) -> Iterator[int]:
+        return bloom_filter_positions(item, self.size, self.hash_count)
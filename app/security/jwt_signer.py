@@ -0,0 +1,325 @@
+import base64
+import hashlib
+import hmac
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.asymmetric.utils import (
+    decode_dss_signature,
+    encode_dss_signature,
+)
+
+from app.exceptions.token_decode_exception import TokenDecodeException
+
+ES256_COORDINATE_SIZE = 32
+
+
+def base64url_encode(data: bytes) -> bytes:
+    """
+    Encode bytes as unpadded base64url
+
+    Args:
+        data (bytes): The bytes to encode
+
+    Returns:
+        bytes: The encoded bytes
+    """
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def base64url_decode(data: bytes) -> bytes:
+    """
+    Decode unpadded base64url bytes
+
+    Args:
+        data (bytes): The bytes to decode
+
+    Returns:
+        bytes: The decoded bytes
+    """
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class JwtSigner(ABC):
+    """
+    Signing backend of a single JWT key
+
+    Keys are parsed once when the signer is created. A signer without a
+    private key can only verify tokens.
+
+    Attributes:
+        algorithm (str): The JWS algorithm name
+        kid (str | None): The key ID written to the token header
+    """
+
+    algorithm: str
+
+    def __init__(self, kid: str | None = None):
+        self.kid = kid or None
+
+    @property
+    @abstractmethod
+    def can_sign(self) -> bool:
+        """
+        Whether the signer holds the key needed to sign tokens
+        """
+
+    @abstractmethod
+    def sign(self, message: bytes) -> bytes:
+        """
+        Sign a message
+
+        Args:
+            message (bytes): The JWS signing input
+
+        Returns:
+            bytes: The signature
+        """
+
+    @abstractmethod
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        """
+        Verify the signature of a message
+
+        Args:
+            message (bytes): The JWS signing input
+            signature (bytes): The signature
+
+        Returns:
+            bool: True if the signature is valid, False otherwise
+        """
+
+
+class HS256Signer(JwtSigner):
+    """
+    HMAC SHA-256 signer with a shared secret
+    """
+
+    algorithm = "HS256"
+
+    def __init__(self, secret: str, kid: str | None = None):
+        super().__init__(kid)
+        self._secret = secret.encode()
+
+    @property
+    def can_sign(self) -> bool:
+        return True
+
+    def sign(self, message: bytes) -> bytes:
+        return hmac.new(self._secret, message, hashlib.sha256).digest()
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        return hmac.compare_digest(self.sign(message), signature)
+
+
+class ES256Signer(JwtSigner):
+    """
+    ECDSA P-256 SHA-256 signer
+    """
+
+    algorithm = "ES256"
+
+    def __init__(
+        self,
+        private_key: ec.EllipticCurvePrivateKey | None = None,
+        public_key: ec.EllipticCurvePublicKey | None = None,
+        kid: str | None = None,
+    ):
+        super().__init__(kid)
+        self._private_key = private_key
+        self._public_key = public_key or private_key.public_key()
+
+    @property
+    def can_sign(self) -> bool:
+        return self._private_key is not None
+
+    def sign(self, message: bytes) -> bytes:
+        r, s = decode_dss_signature(
+            self._private_key.sign(message, ec.ECDSA(hashes.SHA256()))
+        )
+        return r.to_bytes(ES256_COORDINATE_SIZE, "big") + s.to_bytes(
+            ES256_COORDINATE_SIZE, "big"
+        )
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        if len(signature) != ES256_COORDINATE_SIZE * 2:
+            return False
+        r = int.from_bytes(signature[:ES256_COORDINATE_SIZE], "big")
+        s = int.from_bytes(signature[ES256_COORDINATE_SIZE:], "big")
+        try:
+            self._public_key.verify(
+                encode_dss_signature(r, s), message, ec.ECDSA(hashes.SHA256())
+            )
+        except InvalidSignature:
+            return False
+        return True
+
+
+class EdDSASigner(JwtSigner):
+    """
+    Ed25519 signer
+    """
+
+    algorithm = "EdDSA"
+
+    def __init__(
+        self,
+        private_key: ed25519.Ed25519PrivateKey | None = None,
+        public_key: ed25519.Ed25519PublicKey | None = None,
+        kid: str | None = None,
+    ):
+        super().__init__(kid)
+        self._private_key = private_key
+        self._public_key = public_key or private_key.public_key()
+
+    @property
+    def can_sign(self) -> bool:
+        return self._private_key is not None
+
+    def sign(self, message: bytes) -> bytes:
+        return self._private_key.sign(message)
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        try:
+            self._public_key.verify(signature, message)
+        except InvalidSignature:
+            return False
+        return True
+
+
+ASYMMETRIC_SIGNERS = {
+    ES256Signer.algorithm: (ES256Signer, ec.EllipticCurvePrivateKey),
+    EdDSASigner.algorithm: (EdDSASigner, ed25519.Ed25519PrivateKey),
+}
+
+
+def load_signer(
+    algorithm: str,
+    kid: str | None = None,
+    secret: str | None = None,
+    private_key_file: str | None = None,
+    public_key_file: str | None = None,
+) -> JwtSigner:
+    """
+    Create a signer, parsing its keys
+
+    Args:
+        algorithm (str): The JWS algorithm, HS256, ES256 or EdDSA
+        kid (str | None): The key ID
+        secret (str | None): The shared secret of HS256
+        private_key_file (str | None): The PEM private key of ES256 and EdDSA
+        public_key_file (str | None): The PEM public key of ES256 and EdDSA,
+            used when there is no private key to verify tokens only
+
+    Returns:
+        JwtSigner: The signer
+    """
+    if algorithm == HS256Signer.algorithm:
+        if not secret:
+            raise ValueError("HS256 requires a secret")
+        return HS256Signer(secret, kid)
+
+    if algorithm not in ASYMMETRIC_SIGNERS:
+        raise ValueError(f"Unsupported JWT algorithm: {algorithm}")
+
+    signer_class, key_class = ASYMMETRIC_SIGNERS[algorithm]
+    if private_key_file:
+        private_key = serialization.load_pem_private_key(
+            Path(private_key_file).read_bytes(), password=None
+        )
+        if not isinstance(private_key, key_class):
+            raise ValueError(f"Private key does not match algorithm {algorithm}")
+        return signer_class(private_key=private_key, kid=kid)
+
+    if public_key_file:
+        public_key = serialization.load_pem_public_key(
+            Path(public_key_file).read_bytes()
+        )
+        return signer_class(public_key=public_key, kid=kid)
+
+    raise ValueError(f"{algorithm} requires a private or public key file")
+
+
+class JwtKeyRing:
+    """
+    Signs tokens with the current key and verifies them with any known key
+
+    Tokens carry the ``kid`` of their key, so keys can be rotated by adding
+    the new key as the current one and keeping the old ones for verification
+    until the tokens they signed have expired.
+
+    Attributes:
+        signer (JwtSigner): The current signer
+        verifiers (dict[str | None, JwtSigner]): The signers by key ID
+    """
+
+    def __init__(self, signer: JwtSigner, verifiers: list[JwtSigner] | None = None):
+        self.signer = signer
+        self.verifiers = {verifier.kid: verifier for verifier in verifiers or []}
+        self.verifiers[signer.kid] = signer
+        self._header = base64url_encode(
+            json.dumps(
+                {"alg": signer.algorithm, "typ": "JWT"}
+                | ({"kid": signer.kid} if signer.kid else {}),
+                separators=(",", ":"),
+            ).encode()
+        )
+
+    def encode(self, claims: dict) -> str:
+        """
+        Encode and sign claims with the current key
+
+        Args:
+            claims (dict): The claims to encode
+
+        Returns:
+            str: The token
+        """
+        if not self.signer.can_sign:
+            raise ValueError("The current JWT key can only verify tokens")
+        payload = base64url_encode(
+            json.dumps(claims, separators=(",", ":")).encode()
+        )
+        signing_input = self._header + b"." + payload
+        return (
+            signing_input + b"." + base64url_encode(self.signer.sign(signing_input))
+        ).decode()
+
+    def decode(self, token: str) -> dict:
+        """
+        Verify a token and decode its claims
+
+        Expiration is not checked here.
+
+        Args:
+            token (str): The token to decode
+
+        Returns:
+            dict: The claims
+
+        Raises:
+            TokenDecodeException: If the token is malformed, signed with an
+            unknown key or the signature is invalid
+        """
+        try:
+            signing_input, signature = token.encode().rsplit(b".", 1)
+            header, payload = signing_input.split(b".")
+            header = json.loads(base64url_decode(header))
+            kid = header.get("kid")
+            if kid is not None and not isinstance(kid, str):
+                raise TokenDecodeException("Malformed token: kid is not a string")
+            verifier = self.verifiers.get(kid)
+            if verifier is None or header.get("alg") != verifier.algorithm:
+                raise TokenDecodeException("Unknown token key")
+            if not verifier.verify(signing_input, base64url_decode(signature)):
+                raise TokenDecodeException("Signature verification failed")
+            claims = json.loads(base64url_decode(payload))
+        except (ValueError, AttributeError, TypeError) as e:
+            raise TokenDecodeException(f"Malformed token: {e}")
+
+        if not isinstance(claims, dict):
+            raise TokenDecodeException("Malformed token: claims are not an object")
+        return claims
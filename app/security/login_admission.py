@@ -0,0 +1,152 @@
+import logging
+from redis import Redis
+
+from app.conf.config import settings
+from app.constant_bag.redis import RedisKey
+from app.database.redis import redis_client
+from app.exceptions.password_hasher_busy_exception import PasswordHasherBusyException
+from app.exceptions.rate_limit_exceeded_exception import RateLimitExceededException
+from app.security.password_hasher import PasswordHasher, password_hasher
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+
+class LoginAdmissionController:
+    """
+    Admission control of login password verifications
+
+    Each worker runs at most ``max_in_flight`` login verifications at once.
+    The last ``reserved`` of them are kept for users who logged in
+    successfully within ``recent_seconds``, so a credential stuffing flood
+    cannot starve them of hashing time. Other logins are rejected with 429
+    once only reserved slots are left, and every login is rejected with 503
+    once all slots are taken. Whether a user logged in recently is only
+    looked up in Redis when the reserved slots are reached.
+
+    Attributes:
+        hasher (PasswordHasher): The password hasher
+        redis (Redis): The Redis client
+        max_in_flight (int): The number of verifications run at once
+        reserved (int): The slots kept for users with recent logins
+        recent_seconds (int): How long a successful login gives priority
+    """
+
+    def __init__(
+        self,
+        hasher: PasswordHasher,
+        redis: Redis,
+        max_in_flight: int = settings.LOGIN_VERIFY_MAX_IN_FLIGHT,
+        reserved: int = settings.LOGIN_VERIFY_RESERVED,
+        recent_seconds: int = settings.LOGIN_RECENT_SECONDS,
+    ):
+        self.hasher = hasher
+        self.redis = redis
+        self.max_in_flight = max_in_flight
+        self.reserved = reserved
+        self.recent_seconds = recent_seconds
+        self._in_flight = 0
+        self._admitted = 0
+        self._prioritized = 0
+        self._throttled = 0
+        self._rejected = 0
+
+    async def verify(self, username: str, password: str, hashed_password: str) -> bool:
+        """
+        Verify the password of a login if it is admitted
+
+        Args:
+            username (str): The username of the login
+            password (str): The password to verify
+            hashed_password (str): The hashed password to verify
+
+        Returns:
+            bool: True if the password is valid, False otherwise
+
+        Raises:
+            RateLimitExceededException: If only reserved slots are left and
+            the user did not log in recently
+            PasswordHasherBusyException: If all slots are taken
+        """
+        if self._in_flight >= self.max_in_flight:
+            self._rejected += 1
+            raise PasswordHasherBusyException("Too many pending logins")
+
+        if self._in_flight >= self.max_in_flight - self.reserved:
+            if not self._is_recent(username):
+                self._throttled += 1
+                raise RateLimitExceededException("Too many pending logins", 1)
+            self._prioritized += 1
+
+        self._admitted += 1
+        self._in_flight += 1
+        try:
+            valid = await self.hasher.verify(password, hashed_password)
+        finally:
+            self._in_flight -= 1
+
+        if valid:
+            self._mark_recent(username)
+        return valid
+
+    def metrics(self) -> dict[str, int]:
+        """
+        Get the admission metrics
+
+        Returns:
+            dict[str, int]: The slots, reserved slots and running
+            verifications, and the number of admitted, prioritized, throttled
+            and rejected logins
+        """
+        return {
+            "max_in_flight": self.max_in_flight,
+            "reserved": self.reserved,
+            "in_flight": self._in_flight,
+            "admitted": self._admitted,
+            "prioritized": self._prioritized,
+            "throttled": self._throttled,
+            "rejected": self._rejected,
+        }
+
+    def _is_recent(self, username: str) -> bool:
+        """
+        Check if a user logged in successfully recently
+
+        Args:
+            username (str): The username
+
+        Returns:
+            bool: True if the user logged in recently, False otherwise or if
+            Redis is unavailable
+        """
+        try:
+            return bool(
+                self.redis.exists(RedisKey.AUTH_RECENT_LOGIN.format(username=username))
+            )
+        except Exception as e:
+            logging.error(f"Error checking recent login of {username}: {e}")
+            return False
+
+    def _mark_recent(self, username: str) -> None:
+        """
+        Record a successful login
+
+        Args:
+            username (str): The username
+
+        Returns:
+            None
+        """
+        try:
+            self.redis.set(
+                RedisKey.AUTH_RECENT_LOGIN.format(username=username),
+                1,
+                ex=self.recent_seconds,
+            )
+        except Exception as e:
+            logging.error(f"Error recording recent login of {username}: {e}")
+
+
+login_admission = LoginAdmissionController(password_hasher, redis_client)
@@ -1,16 +1,64 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
 from passlib.context import CryptContext
 
+from app.conf.config import settings
+from app.exceptions.password_hasher_busy_exception import PasswordHasherBusyException
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+ROUNDS_RANGE = {
+    "bcrypt": (10, 15),
+    "argon2": (1, 10),
+}
+
 
 class PasswordHasher:
     """
     Password hasher
 
+    The async methods run hashing on a dedicated thread pool, so bcrypt does
+    not block the event loop. The number of pending calls is bounded and new
+    calls are rejected once the queue is full.
+
+    Hashes of the other scheme, or with fewer rounds than the configured
+    ones, are still verified but reported by ``needs_update``. Hashes with
+    more rounds are kept, so workers calibrated to slightly different costs
+    only ever upgrade each other's hashes instead of rehashing them back and
+    forth.
+
     Attributes:
         pwd_context (CryptContext): The password hasher
+        scheme (str): The scheme of new hashes, bcrypt or argon2
+        rounds (int | None): The cost of new hashes, the scheme default if None
+        workers (int): The number of hashing threads
+        queue_limit (int): The number of calls allowed to wait for a thread
     """
 
-    def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    def __init__(
+        self,
+        scheme: str = settings.PASSWORD_HASH_SCHEME,
+        rounds: int | None = settings.PASSWORD_HASH_ROUNDS or None,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        queue_limit: int = settings.PASSWORD_HASH_QUEUE_LIMIT,
+    ):
+        if scheme not in ROUNDS_RANGE:
+            raise ValueError(f"Unsupported password hash scheme: {scheme}")
+        self.scheme = scheme
+        self.rounds = rounds
+        self.pwd_context = self._build_context(rounds)
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
 
     def hash_password(self, password: str) -> str:
         """
@@ -37,5 +85,164 @@ class PasswordHasher:
         """
         return self.pwd_context.verify(password, hashed_password)
 
+    def needs_update(self, hashed_password: str) -> bool:
+        """
+        Check if a hash should be replaced with one of the current scheme and cost
+
+        Args:
+            hashed_password (str): The hashed password to check
+
+        Returns:
+            bool: True if the password should be rehashed
+        """
+        return self.pwd_context.needs_update(hashed_password)
+
+    def calibrate(self, target_ms: float = settings.PASSWORD_HASH_TARGET_MS) -> int:
+        """
+        Pick the highest cost whose hash time stays within the target
+
+        Bcrypt time doubles with every round, argon2 time grows linearly with
+        them, so the cost is estimated from the measured time of a cheaper hash.
+
+        Args:
+            target_ms (float): The target hash time in milliseconds
+
+        Returns:
+            int: The chosen rounds
+        """
+        min_rounds, max_rounds = ROUNDS_RANGE[self.scheme]
+        rounds = min_rounds
+        elapsed_ms = self._time_hash(rounds)
+
+        if self.scheme == "bcrypt":
+            while rounds < max_rounds and elapsed_ms * 2 <= target_ms:
+                rounds += 1
+                elapsed_ms = self._time_hash(rounds)
+        else:
+            rounds = int(target_ms / elapsed_ms * min_rounds)
+            rounds = max(min_rounds, min(rounds, max_rounds))
+
+        self.rounds = rounds
+        self.pwd_context = self._build_context(rounds)
+        logging.info(
+            f"Password hasher calibrated to {self.scheme} with {rounds} rounds "
+            f"for a target of {target_ms}ms"
+        )
+        return rounds
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash password on the hashing thread pool
+
+        Args:
+            password (str): The password to hash
+
+        Returns:
+            str: The hashed password
+
+        Raises:
+            PasswordHasherBusyException: If the hashing queue is full
+        """
+        return await self._run(self.hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Verify password on the hashing thread pool
+
+        Args:
+            password (str): The password to verify
+            hashed_password (str): The hashed password to verify
+
+        Returns:
+            bool: True if the password is valid, False otherwise
+
+        Raises:
+            PasswordHasherBusyException: If the hashing queue is full
+        """
+        return await self._run(self.verify_password, password, hashed_password)
+
+    def metrics(self) -> dict[str, int]:
+        """
+        Get the hashing pool metrics
+
+        Returns:
+            dict[str, int]: The pool size, queue limit, running and queued
+            calls, and the number of completed and rejected calls
+        """
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "running": min(self._in_flight, self.workers),
+            "queued": max(self._in_flight - self.workers, 0),
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+    def _build_context(self, rounds: int | None) -> CryptContext:
+        """
+        Build the context hashing with the scheme and verifying both schemes
+
+        Args:
+            rounds (int | None): The cost of new hashes, the scheme default if None
+
+        Returns:
+            CryptContext: The password context
+        """
+        schemes = [self.scheme] + [
+            scheme for scheme in ROUNDS_RANGE if scheme != self.scheme
+        ]
+        options = {}
+        if rounds:
+            for option in ("default_rounds", "min_rounds"):
+                options[f"{self.scheme}__{option}"] = rounds
+        return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+    def _time_hash(self, rounds: int) -> float:
+        """
+        Measure the time of a single hash with the given rounds
+
+        Args:
+            rounds (int): The rounds to hash with
+
+        Returns:
+            float: The hash time in milliseconds
+        """
+        context = self._build_context(rounds)
+        start = time.perf_counter()
+        context.hash("calibration")
+        return (time.perf_counter() - start) * 1000
+
+    async def _run(self, fn: Callable, *args):
+        """
+        Run a hashing function on the thread pool with backpressure
+
+        Args:
+            fn (Callable): The function to run
+            *args: The arguments to pass to the function
+
+        Returns:
+            Any: The result of the function
+
+        Raises:
+            PasswordHasherBusyException: If the hashing queue is full
+        """
+        if self._in_flight >= self.workers + self.queue_limit:
+            self._rejected += 1
+            raise PasswordHasherBusyException("Too many pending password hashes")
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hasher"
+            )
+
+        self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, fn, *args
+            )
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+
 
 password_hasher = PasswordHasher()
@@ -0,0 +1,240 @@
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Coroutine
+from fastapi import Request
+from redis import Redis
+
+from app.conf.config import settings
+from app.constant_bag.redis import RedisKey
+from app.database.redis import redis_client
+from app.exceptions.rate_limit_exceeded_exception import RateLimitExceededException
+from app.exceptions.token_decode_exception import TokenDecodeException
+from app.security.constant_bag.token_types import TokenTypes
+from app.security.token_encoder import token_encoder
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+RATE_PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 60 * 60,
+    "day": 60 * 60 * 24,
+}
+
+# Sliding window counter: the hits of the previous window are weighted by
+# the part of it still inside the sliding window. Counts are kept in a hash
+# by window number, so the script touches only the key it is given. Up to
+# ARGV[3] hits are granted at once and it returns the granted hits and the
+# seconds to wait when none could be granted.
+SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local current = math.floor(now / window)
+local elapsed = now / window - current
+local counts = redis.call('HMGET', KEYS[1], tostring(current), tostring(current - 1))
+local hits = (tonumber(counts[1]) or 0) + (tonumber(counts[2]) or 0) * (1 - elapsed)
+local available = math.floor(limit - hits)
+if available < 1 then
+    return {0, math.max(1, math.ceil((1 - elapsed) * window))}
+end
+local granted = math.min(requested, available)
+redis.call('HINCRBY', KEYS[1], tostring(current), granted)
+redis.call('HDEL', KEYS[1], tostring(current - 2))
+redis.call('EXPIRE', KEYS[1], window * 2)
+return {granted, 0}
+"""
+
+
+@lru_cache
+def parse_rate(rate: str) -> tuple[int, int]:
+    """
+    Parse a rate like "5/minute"
+
+    Args:
+        rate (str): The number of requests per second, minute, hour or day
+
+    Returns:
+        tuple[int, int]: The number of requests and the window in seconds
+    """
+    limit, period = rate.split("/")
+    if period not in RATE_PERIODS:
+        raise ValueError(f"Unsupported rate period: {period}")
+    return int(limit), RATE_PERIODS[period]
+
+
+@dataclass
+class Lease:
+    """
+    Requests a worker may let through without asking Redis
+
+    Attributes:
+        tokens (int): The requests left
+        expires_at (float): The monotonic time the lease ends
+    """
+
+    tokens: int
+    expires_at: float
+
+
+class RateLimiter:
+    """
+    Rate limiter shared by all workers through Redis
+
+    Requests are counted in a sliding window per route and client, by user
+    for requests with a valid access token and by IP address otherwise.
+
+    In the "redis" mode, checking and counting a request is one atomic
+    script call, so each request costs exactly one Redis round trip.
+
+    In the "lease" mode, a worker takes a batch of up to RATE_LIMIT_LEASE_SHARE
+    of the limit, and at least RATE_LIMIT_LEASE_MIN requests, from the same
+    window at once and lets requests through from it in memory until it is
+    used up or RATE_LIMIT_LEASE_SECONDS pass. A limit at or below
+    RATE_LIMIT_LEASE_MIN is leased whole, and a limit of 1 still costs one
+    Redis round trip per request. Leased
+    requests are counted in Redis when they are taken, so the cluster never
+    exceeds the limit; clients may be rejected early by at most the
+    requests left in other workers' leases, for at most RATE_LIMIT_LEASE_SECONDS.
+
+    Requests are let through when Redis is unavailable.
+
+    Attributes:
+        redis (Redis): The Redis client
+        lease_cache_size (int): The number of leases kept per worker
+    """
+
+    def __init__(self, redis: Redis, lease_cache_size: int = 10000):
+        self.redis = redis
+        self.lease_cache_size = lease_cache_size
+        self._acquire = redis.register_script(SLIDING_WINDOW_SCRIPT)
+        self._leases: OrderedDict[str, Lease] = OrderedDict()
+
+    def limit(self, rate: str) -> Callable[[Request], Coroutine]:
+        """
+        Create a route dependency limiting the requests to the route
+
+        Args:
+            rate (str): The default rate of the route, overridden by the
+                RATE_LIMITS setting by route name
+
+        Returns:
+            Callable[[Request], Coroutine]: The dependency
+        """
+
+        async def check_rate_limit(request: Request) -> None:
+            if not settings.RATE_LIMIT_ENABLED:
+                return
+            name = request.scope["endpoint"].__name__
+            limit, window = parse_rate(settings.RATE_LIMITS.get(name, rate))
+            key = RedisKey.RATE_LIMIT.format(
+                route=name, client=await self._client_key(request)
+            )
+            retry_after = self.hit(key, limit, window)
+            if retry_after:
+                raise RateLimitExceededException("Rate limit exceeded", retry_after)
+
+        return check_rate_limit
+
+    def hit(self, key: str, limit: int, window: int) -> int:
+        """
+        Count a request if it is within the limit
+
+        Args:
+            key (str): The key of the route and client
+            limit (int): The number of requests allowed per window
+            window (int): The window in seconds
+
+        Returns:
+            int: 0 if the request is allowed, otherwise the seconds to wait
+        """
+        if settings.RATE_LIMIT_MODE != "lease":
+            _, retry_after = self.acquire(key, limit, window, 1)
+            return retry_after
+
+        now = time.monotonic()
+        lease = self._leases.get(key)
+        if lease and lease.tokens > 0 and lease.expires_at > now:
+            lease.tokens -= 1
+            self._leases.move_to_end(key)
+            return 0
+
+        share = int(limit * settings.RATE_LIMIT_LEASE_SHARE)
+        batch = min(limit, max(settings.RATE_LIMIT_LEASE_MIN, share))
+        granted, retry_after = self.acquire(key, limit, window, batch)
+        if not granted:
+            self._leases.pop(key, None)
+            return retry_after
+
+        self._leases[key] = Lease(
+            granted - 1, now + min(window, settings.RATE_LIMIT_LEASE_SECONDS)
+        )
+        self._leases.move_to_end(key)
+        while len(self._leases) > self.lease_cache_size:
+            self._leases.popitem(last=False)
+        return 0
+
+    def acquire(self, key: str, limit: int, window: int, count: int) -> tuple[int, int]:
+        """
+        Count up to a number of requests that are within the limit
+
+        Args:
+            key (str): The key of the route and client
+            limit (int): The number of requests allowed per window
+            window (int): The window in seconds
+            count (int): The number of requests to count
+
+        Returns:
+            tuple[int, int]: The number of counted requests, and the seconds
+            to wait if none were counted
+        """
+        try:
+            granted, retry_after = self._acquire(keys=[key], args=[limit, window, count])
+            return int(granted), int(retry_after)
+        except Exception as e:
+            logging.error(f"Error checking rate limit {key}: {e}")
+            return count, 0
+
+    def reset(self) -> None:
+        """
+        Forget all counted requests
+
+        Returns:
+            None
+        """
+        self._leases.clear()
+        keys = list(self.redis.scan_iter(RedisKey.RATE_LIMIT.format(route="*", client="*")))
+        if keys:
+            self.redis.delete(*keys)
+
+    @staticmethod
+    async def _client_key(request: Request) -> str:
+        """
+        Get the client a request is counted for
+
+        Args:
+            request (Request): The request
+
+        Returns:
+            str: The username of a valid bearer token, or the IP address
+        """
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                payload = await token_encoder.decode_token(token)
+                if payload.get("type") == TokenTypes.ACCESS and payload.get("sub"):
+                    return f"user:{payload['sub']}"
+            except TokenDecodeException:
+                pass
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+rate_limiter = RateLimiter(redis_client)
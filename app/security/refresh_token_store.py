@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import uuid
+from redis import Redis
+
+from app.conf.config import settings
+from app.constant_bag.redis import RedisKey
+from app.database.redis import redis_client
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+ROTATE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'current')
+if not current then
+    return 0
+end
+if current ~= ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    redis.call('SREM', KEYS[2], ARGV[4])
+    return -1
+end
+redis.call('HSET', KEYS[1], 'current', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return 1
+"""
+
+
+class RefreshTokenStore:
+    """
+    Store of refresh token families in Redis
+
+    Every login starts a family, which holds the hash of the only refresh
+    token of the family that can still be used. Using it rotates the family
+    to a new token; presenting an already rotated token means it was stolen
+    and revokes the whole family.
+
+    Attributes:
+        redis (Redis): The Redis client
+        ttl (int): The lifetime of a family since its last rotation in seconds
+    """
+
+    ROTATED = 1
+    UNKNOWN = 0
+    REUSED = -1
+
+    def __init__(
+        self, redis: Redis, ttl: int = settings.JWT_REFRESH_EXPIRATION_SECONDS
+    ):
+        self.redis = redis
+        self.ttl = ttl
+        self._rotate = redis.register_script(ROTATE_SCRIPT)
+
+    @staticmethod
+    def new_family() -> str:
+        """
+        Generate a new family ID
+
+        Returns:
+            str: The family ID
+        """
+        return uuid.uuid4().hex
+
+    def start(self, family: str, user_id: int, refresh_token: str) -> None:
+        """
+        Start a family with its first refresh token
+
+        Args:
+            family (str): The family ID
+            user_id (int): The ID of the user
+            refresh_token (str): The refresh token
+
+        Returns:
+            None
+        """
+        family_key = RedisKey.AUTH_REFRESH_FAMILY.format(family=family)
+        families_key = RedisKey.AUTH_REFRESH_FAMILIES.format(user_id=user_id)
+        pipeline = self.redis.pipeline()
+        pipeline.hset(
+            family_key,
+            mapping={"user_id": user_id, "current": self._hash(refresh_token)},
+        )
+        pipeline.expire(family_key, self.ttl)
+        pipeline.sadd(families_key, family)
+        pipeline.expire(families_key, self.ttl)
+        pipeline.execute()
+
+    def rotate(
+        self, family: str, user_id: int, refresh_token: str, new_refresh_token: str
+    ) -> int:
+        """
+        Replace the current refresh token of a family, atomically
+
+        Args:
+            family (str): The family ID
+            user_id (int): The ID of the user
+            refresh_token (str): The presented refresh token
+            new_refresh_token (str): The refresh token replacing it
+
+        Returns:
+            int: ROTATED on success, UNKNOWN if the family is revoked or
+            expired, REUSED if the token was already rotated and the family
+            has been revoked
+        """
+        result = int(
+            self._rotate(
+                keys=[
+                    RedisKey.AUTH_REFRESH_FAMILY.format(family=family),
+                    RedisKey.AUTH_REFRESH_FAMILIES.format(user_id=user_id),
+                ],
+                args=[
+                    self._hash(refresh_token),
+                    self._hash(new_refresh_token),
+                    self.ttl,
+                    family,
+                ],
+            )
+        )
+        if result == self.REUSED:
+            logging.warning(
+                f"Refresh token reuse detected, revoked family {family} of user {user_id}"
+            )
+        return result
+
+    def revoke(self, family: str, user_id: int) -> None:
+        """
+        Revoke a family
+
+        Args:
+            family (str): The family ID
+            user_id (int): The ID of the user
+
+        Returns:
+            None
+        """
+        pipeline = self.redis.pipeline()
+        pipeline.delete(RedisKey.AUTH_REFRESH_FAMILY.format(family=family))
+        pipeline.srem(RedisKey.AUTH_REFRESH_FAMILIES.format(user_id=user_id), family)
+        pipeline.execute()
+
+    def revoke_user(self, user_id: int) -> None:
+        """
+        Revoke all families of a user
+
+        Args:
+            user_id (int): The ID of the user
+
+        Returns:
+            None
+        """
+        families_key = RedisKey.AUTH_REFRESH_FAMILIES.format(user_id=user_id)
+        families = self.redis.smembers(families_key)
+        pipeline = self.redis.pipeline()
+        for family in families:
+            pipeline.delete(RedisKey.AUTH_REFRESH_FAMILY.format(family=family.decode()))
+        pipeline.delete(families_key)
+        pipeline.execute()
+
+    @staticmethod
+    def _hash(refresh_token: str) -> str:
+        """
+        Hash a refresh token, so the store never holds usable tokens
+
+        Args:
+            refresh_token (str): The refresh token
+
+        Returns:
+            str: The SHA-256 hex digest of the token
+        """
+        return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+refresh_token_store = RefreshTokenStore(redis_client)
@@ -1,13 +1,18 @@
+import hashlib
 import logging
+from collections import OrderedDict
 from typing import Optional
-from jose import jwt
 from datetime import datetime, timedelta, timezone
 
 UTC = timezone.utc  
 
 from app.exceptions.token_decode_exception import TokenDecodeException
-from app.exceptions.token_expired_exception import TokenExpiredException
 from app.conf.config import settings
+from app.security.jwt_signer import JwtKeyRing, load_signer
+from app.security.token_revocation_list import (
+    TokenRevocationList,
+    token_revocation_list,
+)
 
 logging.basicConfig(
     format="%(asctime)s %(message)s",
@@ -19,16 +24,30 @@ class TokenEncoder:
     """
     Token encoder
 
+    Verified tokens are kept in a bounded LRU cache keyed by their SHA-256
+    digest, so a token sent again skips signature verification until it
+    expires or is evicted. Tokens with a revoked ``jti`` are rejected, cached
+    or not.
+
     Attributes:
-        secret_key (str): The secret key for the token
-        algorithm (str): The algorithm for the token
+        key_ring (JwtKeyRing): The keys signing and verifying the tokens
         default_expires_delta (int): The default expiration time for the token
+        cache_size (int): The maximum number of cached tokens, 0 disables the cache
+        revocation_list (TokenRevocationList | None): The revoked tokens
     """
 
-    def __init__(self, secret_key: str, algorithm: str, default_expires_delta: int):
-        self.secret_key = secret_key
-        self.algorithm = algorithm
+    def __init__(
+        self,
+        key_ring: JwtKeyRing,
+        default_expires_delta: int,
+        cache_size: int = settings.TOKEN_CACHE_SIZE,
+        revocation_list: TokenRevocationList | None = None,
+    ):
+        self.key_ring = key_ring
         self.default_expires_delta = default_expires_delta
+        self.cache_size = cache_size
+        self.revocation_list = revocation_list
+        self._cache: OrderedDict[bytes, dict] = OrderedDict()
 
     async def create_token(self, data: dict, expires_delta: Optional[int] = None):
         """
@@ -46,9 +65,8 @@ class TokenEncoder:
             expire = datetime.now(UTC) + timedelta(seconds=expires_delta)
         else:
             expire = datetime.now(UTC) + timedelta(seconds=self.default_expires_delta)
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
-        return encoded_jwt
+        to_encode.update({"exp": int(expire.timestamp())})
+        return self.key_ring.encode(to_encode)
 
     async def decode_token(self, token: str) -> dict:
         """
@@ -60,21 +78,130 @@ class TokenEncoder:
         Returns:
             dict: The decoded token
         """
-        try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            if not payload:
+        digest = self._digest(token)
+        payload = self._cache.get(digest)
+        if payload is not None:
+            if payload["exp"] < datetime.now(UTC).timestamp():
+                del self._cache[digest]
+                logging.error("Token is invalid: Signature has expired.")
                 raise TokenDecodeException("Token is invalid")
-            if payload.get("exp") < datetime.now(UTC).timestamp():
-                raise TokenExpiredException("Token has expired")
+            self._cache.move_to_end(digest)
+            self._check_revoked(payload)
+            return dict(payload)
+
+        try:
+            payload = self.key_ring.decode(token)
+            exp = payload.get("exp")
+            if not isinstance(exp, (int, float)):
+                raise TokenDecodeException("Token has no expiration")
+            if exp < datetime.now(UTC).timestamp():
+                raise TokenDecodeException("Signature has expired.")
             logging.info(f"Token decoded successfully: {payload}")
-            return payload
-        except jwt.JWTError as e:
-            logging.error(f"Token is invalid: {e}")
+        except TokenDecodeException as e:
+            logging.error(f"Token is invalid: {e.message}")
+            raise TokenDecodeException("Token is invalid")
+
+        self._check_revoked(payload)
+        if self.cache_size:
+            self._cache[digest] = dict(payload)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return payload
+
+    async def revoke_token(self, token: str) -> dict:
+        """
+        Revoke a token until it expires
+
+        Args:
+            token (str): The token to revoke
+
+        Returns:
+            dict: The decoded token
+
+        Raises:
+            TokenDecodeException: If the token is invalid or has no ID
+        """
+        payload = await self.decode_token(token)
+        if self.revocation_list is None or payload.get("jti") is None:
+            raise TokenDecodeException("Token cannot be revoked")
+        self.revocation_list.revoke(payload["jti"], payload["exp"])
+        self.evict(token)
+        return payload
+
+    def _check_revoked(self, payload: dict) -> None:
+        """
+        Reject a revoked token
+
+        Args:
+            payload (dict): The decoded token
+
+        Returns:
+            None
+
+        Raises:
+            TokenDecodeException: If the token is revoked
+        """
+        jti = payload.get("jti")
+        if self.revocation_list and jti and self.revocation_list.is_revoked(jti):
+            logging.error(f"Token is invalid: Token {jti} has been revoked")
             raise TokenDecodeException("Token is invalid")
 
+    def evict(self, token: str) -> None:
+        """
+        Remove a token from the verified tokens cache
+
+        Must be called when a token is revoked before it expires.
+
+        Args:
+            token (str): The token to evict
+
+        Returns:
+            None
+        """
+        self._cache.pop(self._digest(token), None)
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        """
+        Get the cache key of a token
+
+        Args:
+            token (str): The token
+
+        Returns:
+            bytes: The SHA-256 digest of the token
+        """
+        return hashlib.sha256(token.encode()).digest()
+
+
+def load_key_ring() -> JwtKeyRing:
+    """
+    Load the JWT keys from the settings
+
+    Returns:
+        JwtKeyRing: The current key and the keys kept for verification
+    """
+    signer = load_signer(
+        settings.JWT_ALGORITHM,
+        kid=settings.JWT_KEY_ID,
+        secret=settings.JWT_SECRET,
+        private_key_file=settings.JWT_PRIVATE_KEY_FILE,
+        public_key_file=settings.JWT_PUBLIC_KEY_FILE,
+    )
+    verifiers = [
+        load_signer(
+            key["algorithm"],
+            kid=kid,
+            secret=key.get("secret"),
+            public_key_file=key.get("public_key_file"),
+        )
+        for kid, key in settings.JWT_VERIFICATION_KEYS.items()
+    ]
+    return JwtKeyRing(signer, verifiers)
+
 
 token_encoder = TokenEncoder(
-    secret_key=settings.JWT_SECRET,
-    algorithm=settings.JWT_ALGORITHM,
+    key_ring=load_key_ring(),
     default_expires_delta=settings.JWT_EXPIRATION_SECONDS,
+    revocation_list=token_revocation_list,
 )
@@ -0,0 +1,142 @@
+import logging
+import time
+from redis import Redis
+
+from app.conf.config import settings
+from app.constant_bag.redis import RedisKey
+from app.database.redis import redis_client
+from app.security.bloom_filter import BloomFilter
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+SYNC_OVERLAP_SECONDS = 2
+REBUILD_SECONDS = 60 * 60
+
+
+class TokenRevocationList:
+    """
+    Revoked token IDs in Redis, fronted by an in-process Bloom filter
+
+    A revoked ``jti`` is stored under its own key expiring with the token,
+    and in a sorted set scored by revocation time that workers read to sync
+    their filter. Tokens missing from the filter, which is almost every
+    token, are accepted without a Redis call; only possible hits are checked
+    in Redis. Revocations made by other workers are seen after at most
+    ``sync_interval`` seconds.
+
+    Attributes:
+        redis (Redis): The Redis client
+        sync_interval (float): The seconds between filter syncs
+        max_lifetime (int): The lifetime of the longest-lived token in seconds
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        sync_interval: float = settings.TOKEN_REVOCATION_SYNC_SECONDS,
+        capacity: int = settings.TOKEN_REVOCATION_BLOOM_CAPACITY,
+        error_rate: float = settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE,
+        max_lifetime: int = max(
+            settings.JWT_EXPIRATION_SECONDS, settings.JWT_REFRESH_EXPIRATION_SECONDS
+        ),
+    ):
+        self.redis = redis
+        self.sync_interval = sync_interval
+        self.max_lifetime = max_lifetime
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        self._attempted_at: float | None = None
+        self._synced_at: float | None = None
+        self._rebuilt_at: float | None = None
+
+    def revoke(self, jti: str, exp: float) -> None:
+        """
+        Revoke a token until it expires
+
+        Args:
+            jti (str): The ID of the token
+            exp (float): The expiration timestamp of the token
+
+        Returns:
+            None
+        """
+        now = time.time()
+        ttl = int(exp - now) + 1
+        if ttl <= 0:
+            return
+        pipeline = self.redis.pipeline()
+        pipeline.set(RedisKey.AUTH_REVOKED_TOKEN.format(jti=jti), 1, ex=ttl)
+        pipeline.zadd(RedisKey.AUTH_REVOKED_TOKENS, {jti: now})
+        pipeline.zremrangebyscore(
+            RedisKey.AUTH_REVOKED_TOKENS, "-inf", now - self.max_lifetime
+        )
+        pipeline.execute()
+        self._filter.add(jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Check if a token is revoked
+
+        Args:
+            jti (str): The ID of the token
+
+        Returns:
+            bool: True if the token is revoked
+        """
+        self._sync()
+        if jti not in self._filter:
+            return False
+        try:
+            return bool(self.redis.exists(RedisKey.AUTH_REVOKED_TOKEN.format(jti=jti)))
+        except Exception as e:
+            logging.error(f"Error checking revoked token {jti}: {e}")
+            return False
+
+    def _sync(self) -> None:
+        """
+        Add the tokens revoked since the last sync to the filter
+
+        The filter is rebuilt from scratch every ``REBUILD_SECONDS`` to drop
+        the tokens that have expired since.
+
+        Returns:
+            None
+        """
+        now = time.time()
+        if (
+            self._attempted_at is not None
+            and now - self._attempted_at < self.sync_interval
+        ):
+            return
+        self._attempted_at = now
+        try:
+            if (
+                self._synced_at is None
+                or self._rebuilt_at is None
+                or now - self._rebuilt_at >= REBUILD_SECONDS
+            ):
+                revoked = self.redis.zrangebyscore(
+                    RedisKey.AUTH_REVOKED_TOKENS, now - self.max_lifetime, "+inf"
+                )
+                self._filter = BloomFilter(
+                    max(self._capacity, len(revoked) * 2), self._error_rate
+                )
+                self._rebuilt_at = now
+            else:
+                revoked = self.redis.zrangebyscore(
+                    RedisKey.AUTH_REVOKED_TOKENS,
+                    self._synced_at - SYNC_OVERLAP_SECONDS,
+                    "+inf",
+                )
+            for jti in revoked:
+                self._filter.add(jti.decode())
+            self._synced_at = now
+        except Exception as e:
+            logging.error(f"Error syncing revoked tokens: {e}")
+
+
+token_revocation_list = TokenRevocationList(redis_client)
@@ -1,4 +1,5 @@
 import logging
+import uuid
 from typing import TYPE_CHECKING
 from fastapi import Depends, HTTPException, status
 from jose import JWTError
@@ -11,12 +12,14 @@ from sqlalchemy.orm import Session
 
 from app.constant_bag.redis import RedisKey
 from app.exceptions.token_decode_exception import TokenDecodeException
-from app.security.password_hasher import password_hasher
+from app.security.login_admission import login_admission
 from app.entity.user import User
 from app.enum.user_role import UserRole
 from app.security.constant_bag.token_types import TokenTypes
 from app.repository.user import UserRepository
+from app.schemas.auth import Principal
 from app.database.db import get_db
+from app.security.refresh_token_store import refresh_token_store
 from app.security.token_encoder import token_encoder
 from app.conf.config import settings
 from app.database.redis import cache
@@ -51,15 +54,22 @@ class AuthService:
         payload = {
             "sub": user.username,
             "type": TokenTypes.ACCESS,
+            "uid": user.id,
+            "role": user.role.value if user.role else None,
+            "ver": user.token_version,
+            "jti": uuid.uuid4().hex,
         }
         return await token_encoder.create_token(payload)
 
-    async def create_refresh_token(self, user: User) -> str:
+    async def create_refresh_token(self, user: User, family: str | None = None) -> str:
         """
         Create a refresh token
 
+        Without a family a new one is started, which is a new session of the user.
+
         Args:
             user (User): The user to create a refresh token for
+            family (str | None): The family the token is rotated into
 
         Returns:
             str: The refresh token
@@ -67,11 +77,17 @@ class AuthService:
         payload = {
             "sub": user.username,
             "type": TokenTypes.REFRESH,
+            "uid": user.id,
+            "fam": family or refresh_token_store.new_family(),
+            "jti": uuid.uuid4().hex,
         }
-        return await token_encoder.create_token(
+        refresh_token = await token_encoder.create_token(
             payload,
             expires_delta=settings.JWT_REFRESH_EXPIRATION_SECONDS,
         )
+        if family is None:
+            refresh_token_store.start(payload["fam"], user.id, refresh_token)
+        return refresh_token
 
     async def create_password_reset_token(self, user: User) -> str:
         """
@@ -116,48 +132,118 @@ class AuthService:
 
         return user
 
-    async def verify_refresh_token(self, refresh_token: str, db: Session) -> User:
+    async def rotate_refresh_token(
+        self, refresh_token: str, db: Session
+    ) -> tuple[User, str]:
         """
-        Verify a refresh token
+        Verify a refresh token and replace it with a new one of the same family
+
+        A refresh token can be used once. Using it again revokes its family.
 
         Args:
             refresh_token (str): The refresh token
             db (Session): The database session
 
         Returns:
-            User: The user if the token is valid
+            tuple[User, str]: The user and the new refresh token
         """
         payload = await token_encoder.decode_token(refresh_token)
         username = payload.get("sub")
-        if payload.get("type") != TokenTypes.REFRESH or username is None:
+        user_id = payload.get("uid")
+        family = payload.get("fam")
+        if (
+            payload.get("type") != TokenTypes.REFRESH
+            or username is None
+            or user_id is None
+            or family is None
+        ):
             raise TokenDecodeException(
                 "Invalid refresh token",
             )
         user_repository = UserRepository(db)
-        user = await user_repository.get_by_username(username)
-        if not user:
+        user = await cache(
+            user_repository.get_by_username,
+            key=RedisKey.AUTH_USER.format(username=username),
+            args=[username],
+        )
+        if not user or user.id != user_id:
             raise TokenDecodeException(
                 "User not found",
             )
-        if user.refresh_token != refresh_token:
+
+        new_refresh_token = await self.create_refresh_token(user, family)
+        rotated = refresh_token_store.rotate(
+            family, user_id, refresh_token, new_refresh_token
+        )
+        token_encoder.evict(refresh_token)
+        if rotated != refresh_token_store.ROTATED:
             raise TokenDecodeException(
                 "Invalid refresh token",
             )
 
-        return user
+        return user, new_refresh_token
 
-    async def verify_password(self, password: str, hashed_password: str) -> bool:
+    async def logout(self, access_token: str, refresh_token: str | None = None) -> None:
         """
-        Verify a password
+        Revoke the tokens of a session
+
+        Both tokens are validated before any of them is revoked, so a refresh
+        token of another user is rejected without revoking anything.
 
         Args:
+            access_token (str): The access token
+            refresh_token (str | None): The refresh token, whose family is revoked too
+
+        Returns:
+            None
+        """
+        payload = await token_encoder.decode_token(access_token)
+        if payload.get("type") != TokenTypes.ACCESS:
+            raise TokenDecodeException("Invalid access token")
+
+        if refresh_token is not None:
+            refresh_payload = await token_encoder.decode_token(refresh_token)
+            if (
+                refresh_payload.get("type") != TokenTypes.REFRESH
+                or refresh_payload.get("fam") is None
+                or refresh_payload.get("uid") != payload.get("uid")
+            ):
+                raise TokenDecodeException("Invalid refresh token")
+
+        await token_encoder.revoke_token(access_token)
+        if refresh_token is not None:
+            await token_encoder.revoke_token(refresh_token)
+            refresh_token_store.revoke(refresh_payload["fam"], refresh_payload["uid"])
+
+    async def verify_password(
+        self, username: str, password: str, hashed_password: str
+    ) -> bool:
+        """
+        Verify the password of a login, if admitted by the login admission control
+
+        Args:
+            username (str): The username of the login
             password (str): The password to verify
             hashed_password (str): The hashed password
 
         Returns:
             bool: True if the password is valid, False otherwise
         """
-        return password_hasher.verify_password(password, hashed_password)
+        return await login_admission.verify(username, password, hashed_password)
+
+
+def _credentials_exception() -> HTTPException:
+    """
+    Build the exception for a token that cannot be validated
+
+    Returns:
+        HTTPException: The 401 exception
+    """
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
 
 async def get_current_user(
@@ -175,11 +261,7 @@ async def get_current_user(
         User: The current user
     """
     logging.info(f"Getting current user with token: {token}")
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    credentials_exception = _credentials_exception()
 
     try:
        
@@ -204,10 +286,58 @@ async def get_current_user(
         logging.error(f"User not found: {username}")
         raise credentials_exception
 
+    version = payload.get("ver")
+    if version is not None and version != user.token_version:
+        logging.error(f"Token of user {username} has been revoked")
+        raise credentials_exception
+
     logging.info(f"AuthService: User authenticated: {user.username}")
     return user
 
 
+async def get_current_principal(
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> Principal:
+    """
+    Get the current principal from the token claims
+
+    Unlike ``get_current_user`` the user is not loaded, only its token
+    version is looked up to reject revoked tokens. Tokens issued without the
+    claims fall back to loading the user.
+
+    Args:
+        token (HTTPAuthorizationCredentials): The token to get the principal from
+        db (Session): The database session
+
+    Returns:
+        Principal: The current principal
+    """
+    payload = await token_encoder.decode_token(token)
+    username = payload.get("sub")
+    if username is None or payload.get("type") != TokenTypes.ACCESS:
+        raise _credentials_exception()
+
+    user_id = payload.get("uid")
+    role = payload.get("role")
+    version = payload.get("ver")
+    if user_id is None or role is None or version is None:
+        user = await get_current_user(token, db)
+        return Principal(id=user.id, username=user.username, role=user.role)
+
+    user_repository = UserRepository(db)
+    current_version = await cache(
+        user_repository.get_token_version,
+        key=RedisKey.AUTH_TOKEN_VERSION.format(user_id=user_id),
+        args=[user_id],
+    )
+    if current_version != version:
+        logging.error(f"Token of user {username} has been revoked")
+        raise _credentials_exception()
+
+    return Principal(id=user_id, username=username, role=role)
+
+
 def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
     """
     Get the current admin user
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import BinaryIO
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.conf.config import settings
+from app.exceptions.invalid_image_exception import InvalidImageException
+
+ALLOWED_FORMATS = ("JPEG", "PNG", "WEBP", "GIF")
+
+OUTPUT_FORMATS = {
+    "WEBP": ("image/webp", "webp"),
+    "JPEG": ("image/jpeg", "jpg"),
+}
+
+
+@dataclass(frozen=True)
+class ProcessedImage:
+    """
+    Avatar image ready to be stored
+
+    Attributes:
+        content (bytes): The encoded image
+        content_type (str): The MIME type of the image
+        extension (str): The file extension of the image
+        digest (str): The SHA-256 hex digest of the content
+    """
+
+    content: bytes
+    content_type: str
+    extension: str
+    digest: str
+
+
+class AvatarProcessor:
+    """
+    Local processing of uploaded avatars
+
+    Uploads are validated as images of an allowed format, rotated by their
+    EXIF orientation, cropped to fill a ``size`` square and re-encoded without
+    their metadata. The work runs on a dedicated thread pool, as Pillow
+    releases the GIL while decoding, resizing and encoding.
+
+    Attributes:
+        size (int): The width and height of the avatars
+        output_format (str): The encoding of the avatars, WEBP or JPEG
+        quality (int): The encoding quality of the avatars
+        max_pixels (int): The largest accepted upload in pixels
+        workers (int): The number of processing threads
+    """
+
+    def __init__(
+        self,
+        size: int = settings.AVATAR_SIZE,
+        output_format: str = settings.AVATAR_FORMAT,
+        quality: int = settings.AVATAR_QUALITY,
+        max_pixels: int = settings.AVATAR_MAX_PIXELS,
+        workers: int = settings.AVATAR_PROCESS_WORKERS,
+    ):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported avatar format: {output_format}")
+        self.size = size
+        self.output_format = output_format
+        self.quality = quality
+        self.max_pixels = max_pixels
+        self.workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+
+    def process_image(self, data: bytes | BinaryIO) -> ProcessedImage:
+        """
+        Validate, crop and re-encode an image
+
+        Args:
+            data (bytes | BinaryIO): The uploaded image, or a file holding it
+
+        Returns:
+            ProcessedImage: The avatar image
+
+        Raises:
+            InvalidImageException: If the data is not an image of an allowed
+            format or is too large
+        """
+        try:
+            source = BytesIO(data) if isinstance(data, bytes) else data
+            with Image.open(source, formats=ALLOWED_FORMATS) as image:
+                width, height = image.size
+                if width * height > self.max_pixels:
+                    raise InvalidImageException("Image is too large")
+                image = ImageOps.exif_transpose(image)
+                image = image.convert(
+                    "RGBA"
+                    if self.output_format == "WEBP" and image.has_transparency_data
+                    else "RGB"
+                )
+                avatar = ImageOps.fit(
+                    image, (self.size, self.size), Image.Resampling.LANCZOS
+                )
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            raise InvalidImageException("File is not a supported image")
+
+        buffer = BytesIO()
+        avatar.save(buffer, format=self.output_format, quality=self.quality)
+        content = buffer.getvalue()
+        content_type, extension = OUTPUT_FORMATS[self.output_format]
+        return ProcessedImage(
+            content=content,
+            content_type=content_type,
+            extension=extension,
+            digest=hashlib.sha256(content).hexdigest(),
+        )
+
+    async def process(self, data: bytes | BinaryIO) -> ProcessedImage:
+        """
+        Validate, crop and re-encode an image on the processing thread pool
+
+        Args:
+            data (bytes | BinaryIO): The uploaded image, or a file holding it
+
+        Returns:
+            ProcessedImage: The avatar image
+
+        Raises:
+            InvalidImageException: If the data is not an image of an allowed
+            format or is too large
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="avatar-processor"
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.process_image, data
+        )
+
+
+avatar_processor = AvatarProcessor()
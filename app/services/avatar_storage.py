@@ -0,0 +1,150 @@
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+import cloudinary
+import cloudinary.uploader
+
+from app.services.avatar_processor import ProcessedImage
+
+AVATAR_FILE_NAME = re.compile(r"[0-9a-f]{64}\.(webp|jpg)")
+
+
+class AvatarStorage(ABC):
+    """
+    Storage backend of processed avatars
+
+    Avatars are stored under the digest of their content, so an avatar
+    already stored is not stored again and its URL never changes.
+    """
+
+    @abstractmethod
+    def save(self, image: ProcessedImage, timeout: float | None = None) -> str:
+        """
+        Store an avatar unless it is already stored
+
+        Blocking, to be run off the event loop.
+
+        Args:
+            image (ProcessedImage): The avatar image
+            timeout (float | None): The timeout of the storage request
+
+        Returns:
+            str: The URL of the avatar
+        """
+
+
+class CloudinaryAvatarStorage(AvatarStorage):
+    """
+    Avatars stored on Cloudinary
+
+    Attributes:
+        cloud_name (str): The name of the cloud
+        api_key (str): The API key for Cloudinary
+        api_secret (str): The API secret for Cloudinary
+    """
+
+    def __init__(self, cloud_name: str, api_key: str, api_secret: str):
+        self.cloud_name = cloud_name
+        self.api_key = api_key
+        self.api_secret = api_secret
+        cloudinary.config(
+            cloud_name=self.cloud_name,
+            api_key=self.api_key,
+            api_secret=self.api_secret,
+            secure=True,
+        )
+
+    def save(self, image: ProcessedImage, timeout: float | None = None) -> str:
+        public_id = f"RestApp/avatars/{image.digest}"
+        r = cloudinary.uploader.upload(
+            (f"{image.digest}.{image.extension}", image.content),
+            public_id=public_id,
+            overwrite=False,
+            timeout=timeout,
+        )
+        return cloudinary.CloudinaryImage(public_id).build_url(version=r.get("version"))
+
+
+class LocalAvatarStorage(AvatarStorage):
+    """
+    Avatars stored as files in a local directory
+
+    Files are written to a temporary file and renamed, so a concurrent
+    request never serves a partial avatar.
+
+    Attributes:
+        directory (Path): The directory of the avatar files
+        base_url (str): The URL the directory is served at
+    """
+
+    def __init__(self, directory: str | Path, base_url: str):
+        self.directory = Path(directory)
+        self.base_url = base_url.rstrip("/")
+
+    def save(self, image: ProcessedImage, timeout: float | None = None) -> str:
+        file_name = f"{image.digest}.{image.extension}"
+        path = self.directory / file_name
+        if not path.exists():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    file.write(image.content)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        return f"{self.base_url}/{file_name}"
+
+    def path(self, file_name: str) -> Path | None:
+        """
+        Get the path of a stored avatar
+
+        Args:
+            file_name (str): The file name of the avatar
+
+        Returns:
+            Path | None: The path, None if the name is not an avatar file name
+            or the avatar is not stored
+        """
+        if not AVATAR_FILE_NAME.fullmatch(file_name):
+            return None
+        path = self.directory / file_name
+        return path if path.is_file() else None
+
+
+def load_avatar_storage(
+    backend: str,
+    cloud_name: str | None = None,
+    api_key: str | None = None,
+    api_secret: str | None = None,
+    directory: str | None = None,
+    base_url: str | None = None,
+) -> AvatarStorage:
+    """
+    Create an avatar storage backend
+
+    Args:
+        backend (str): The backend, cloudinary or local
+        cloud_name (str | None): The name of the Cloudinary cloud
+        api_key (str | None): The API key for Cloudinary
+        api_secret (str | None): The API secret for Cloudinary
+        directory (str | None): The directory of the local avatar files
+        base_url (str | None): The URL the local avatar files are served at
+
+    Returns:
+        AvatarStorage: The storage backend
+    """
+    if backend == "cloudinary":
+        if not (cloud_name and api_key and api_secret):
+            raise ValueError("Cloudinary storage requires a cloud name and API key")
+        return CloudinaryAvatarStorage(cloud_name, api_key, api_secret)
+
+    if backend == "local":
+        if not (directory and base_url):
+            raise ValueError("Local storage requires a directory and base URL")
+        return LocalAvatarStorage(directory, base_url)
+
+    raise ValueError(f"Unsupported avatar storage: {backend}")
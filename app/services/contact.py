@@ -1,10 +1,15 @@
 from datetime import datetime, timedelta
 from http.client import HTTPException
 from typing import List
+from app.conf.config import settings
+from app.constant_bag.redis import RedisKey
+from app.database.redis import cache, invalidate
 from app.exceptions.contact_exists_exception import ContactExistsException
 from app.entity.contact import Contact
-from app.schemas.contact import ContactModel, ContactQuery
+from app.schemas.contact import ContactModel, ContactQuery, ContactStatsResponse
 from app.repository.contact import ContactRepository
+from app.repository.upcoming_birthday import UpcomingBirthdayRepository
+from app.services.upcoming_birthday import UpcomingBirthdayService
 
 
 class ContactService:
@@ -13,10 +18,19 @@ class ContactService:
 
     Attributes:
         repository (ContactRepository): The repository for managing contacts
+        upcoming_birthday_service (UpcomingBirthdayService): The service for the upcoming birthdays projection
     """
 
-    def __init__(self, repository: ContactRepository):
+    def __init__(
+        self,
+        repository: ContactRepository,
+        upcoming_birthday_service: UpcomingBirthdayService | None = None,
+    ):
         self.repository = repository
+        self.upcoming_birthday_service = (
+            upcoming_birthday_service
+            or UpcomingBirthdayService(UpcomingBirthdayRepository(repository.db))
+        )
 
     async def get_by_id(self, id: int, user_id: int | None = None) -> Contact | None:
         """
@@ -52,6 +66,9 @@ class ContactService:
         """
         Get contacts with closest birthday in the next n days
 
+        The upcoming birthdays projection is read when it covers the requested
+        window, otherwise contacts are queried directly.
+
         Args:
             days_in (int): The number of days in the future to get contacts with closest birthday
             limit (int): The limit of contacts to return
@@ -61,6 +78,13 @@ class ContactService:
         Returns:
             List[Contact]: The list of contacts with closest birthday
         """
+        if user_id and days_in == self.upcoming_birthday_service.days:
+            contacts = await self.upcoming_birthday_service.get_closest(
+                user_id, limit, offset
+            )
+            if contacts is not None:
+                return contacts
+
         contacts = await self.query(
             ContactQuery(
                 limit=limit,
@@ -71,6 +95,67 @@ class ContactService:
         )
         return contacts
 
+    async def get_stats(self, user_id: int) -> ContactStatsResponse:
+        """
+        Get contact statistics of a user, cached until the next contact write
+
+        Args:
+            user_id (int): The ID of the user
+
+        Returns:
+            ContactStatsResponse: The contact statistics
+        """
+        return await cache(
+            self._compute_stats,
+            key=RedisKey.CONTACT_STATS.format(user_id=user_id),
+            ttl=settings.CONTACT_STATS_CACHE_TTL_SECONDS,
+            args=[user_id],
+        )
+
+    async def _compute_stats(self, user_id: int) -> ContactStatsResponse:
+        """
+        Compute contact statistics of a user
+
+        Args:
+            user_id (int): The ID of the user
+
+        Returns:
+            ContactStatsResponse: The contact statistics
+        """
+        recent_days = settings.CONTACT_STATS_RECENT_DAYS
+        rows = await self.repository.get_stats(
+            user_id, datetime.now() - timedelta(days=recent_days)
+        )
+        by_birth_month = {month: 0 for month in range(1, 13)}
+        without_birthday = 0
+        for row in rows:
+            if row.month is None:
+                without_birthday = row.total
+            else:
+                by_birth_month[int(row.month)] = row.total
+
+        return ContactStatsResponse(
+            total=sum(row.total for row in rows),
+            by_birth_month=by_birth_month,
+            without_birthday=without_birthday,
+            recently_added=sum(row.recent or 0 for row in rows),
+            recent_days=recent_days,
+        )
+
+    @staticmethod
+    async def invalidate_stats(user_id: int | None) -> None:
+        """
+        Invalidate the cached contact statistics of a user
+
+        Args:
+            user_id (int | None): The ID of the user
+
+        Returns:
+            None
+        """
+        if user_id:
+            await invalidate(RedisKey.CONTACT_STATS.format(user_id=user_id))
+
     async def create(
         self, contact: ContactModel, user_id: int | None = None
     ) -> Contact:
@@ -86,7 +171,10 @@ class ContactService:
         """
         if await self.repository.get_by_email(contact.email, user_id):
             raise ContactExistsException("Contact with this email already exists")
-        return await self.repository.create(contact, user_id)
+        new_contact = await self.repository.create(contact, user_id)
+        await self.upcoming_birthday_service.refresh_contact(new_contact)
+        await self.invalidate_stats(user_id)
+        return new_contact
 
     async def update(
         self, id: int, contact: ContactModel, user_id: int | None = None
@@ -102,7 +190,11 @@ class ContactService:
         Returns:
             Contact | None: The updated contact if found, None otherwise
         """
-        return await self.repository.update(id, contact, user_id)
+        updated_contact = await self.repository.update(id, contact, user_id)
+        await self.upcoming_birthday_service.refresh_contact(updated_contact)
+        if updated_contact:
+            await self.invalidate_stats(user_id)
+        return updated_contact
 
     async def delete(self, id: int, user_id: int | None = None) -> None:
         """
@@ -116,3 +208,6 @@ class ContactService:
             None
         """
         await self.repository.delete(id, user_id)
+        if user_id:
+            await self.upcoming_birthday_service.delete_contact(id, user_id)
+        await self.invalidate_stats(user_id)
@@ -1,35 +1,76 @@
+import asyncio
 import logging
-from pathlib import Path
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
-from fastapi_mail.errors import ConnectionErrors
+from email.message import EmailMessage
+from email.utils import formataddr, formatdate, make_msgid
+from aiosmtplib import SMTPException
+from jinja2 import Environment
 from app.conf.config import settings
+from app.middlewares.deadline import remaining_time
 from app.schemas.mail import MailModel
+from app.services.smtp_pool import SmtpConnectionPool
+from app.services.templates import template_environment
 
 logging.basicConfig(
     format="%(asctime)s %(message)s",
     level=logging.INFO,
 )
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=settings.USE_CREDENTIALS,
-    VALIDATE_CERTS=settings.VALIDATE_CERTS,
-    TEMPLATE_FOLDER=Path(__file__).parent.parent.parent / "templates" / "email",
+smtp_pool = SmtpConnectionPool(
+    hostname=settings.MAIL_SERVER,
+    port=settings.MAIL_PORT,
+    username=settings.MAIL_USERNAME if settings.USE_CREDENTIALS else None,
+    password=settings.MAIL_PASSWORD,
+    use_tls=settings.MAIL_SSL_TLS,
+    start_tls=settings.MAIL_STARTTLS,
+    validate_certs=settings.VALIDATE_CERTS,
+    timeout=settings.MAIL_TIMEOUT_SECONDS,
+    size=settings.MAIL_POOL_SIZE,
+    health_check_seconds=settings.MAIL_POOL_HEALTH_CHECK_SECONDS,
+    max_idle_seconds=settings.MAIL_POOL_MAX_IDLE_SECONDS,
+    max_messages=settings.MAIL_POOL_MAX_MESSAGES,
 )
 
 
 class MailService:
     """
-    Service for sending emails
+    Service for sending emails over pooled SMTP connections
+
+    Email bodies are rendered from the templates of the ``email`` directory
+    of the shared, precompiled Jinja environment.
+
+    Attributes:
+        pool (SmtpConnectionPool): The SMTP connection pool
+        environment (Environment): The Jinja environment of the templates
     """
 
+    def __init__(
+        self, pool: SmtpConnectionPool, environment: Environment = template_environment
+    ):
+        self.pool = pool
+        self.environment = environment
+
+    def build_message(self, mail: MailModel) -> EmailMessage:
+        """
+        Render an email into an HTML message
+
+        Args:
+            mail (MailModel): The email to send
+
+        Returns:
+            EmailMessage: The message
+        """
+        body = self.environment.get_template(f"email/{mail.template}").render(
+            mail.data
+        )
+        message = EmailMessage()
+        message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+        message["To"] = ", ".join(mail.to)
+        message["Subject"] = mail.subject
+        message["Date"] = formatdate(localtime=True)
+        message["Message-ID"] = make_msgid()
+        message.set_content(body, subtype="html")
+        return message
+
     async def send_email(self, mail: MailModel) -> bool:
         """
         Send an email
@@ -43,17 +84,15 @@ class MailService:
 
         try:
             logging.info(f"Sending email to {mail.to}")
-            message = MessageSchema(
-                subject=mail.subject,
-                recipients=mail.to,
-                template_body=mail.data,
-                subtype=MessageType.html,
+            await asyncio.wait_for(
+                self.pool.send(self.build_message(mail)),
+                timeout=remaining_time(settings.MAIL_TIMEOUT_SECONDS),
             )
-
-            fm = FastMail(conf)
-            await fm.send_message(message, template_name=mail.template)
             logging.info(f"Email sent to {mail.to}")
-        except ConnectionErrors as err:
+        except asyncio.TimeoutError:
+            logging.error(f"Timed out sending email to {mail.to}")
+            return False
+        except (SMTPException, OSError) as err:
             logging.error(f"Error sending email: {err}")
             return False
         except Exception as err:
@@ -63,4 +102,4 @@ class MailService:
         return True
 
 
-mail_service = MailService()
+mail_service = MailService(smtp_pool)
@@ -0,0 +1,91 @@
+import logging
+from redis import Redis
+
+from app.conf.config import settings
+from app.constant_bag.redis import RedisKey
+from app.database.redis import redis_client
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+
+class MailCoalescer:
+    """
+    Coalescing windows of repeated emails in Redis
+
+    The first email of a template to a recipient opens a window of
+    ``window_seconds``. Requests for the same email within the window are
+    covered by the pending one and generate no new email, token or database
+    write. If Redis is unavailable every email is sent.
+
+    Attributes:
+        redis (Redis): The Redis client
+        window_seconds (int): The length of a coalescing window
+    """
+
+    def __init__(
+        self, redis: Redis, window_seconds: int = settings.MAIL_COALESCE_SECONDS
+    ):
+        self.redis = redis
+        self.window_seconds = window_seconds
+
+    def claim(self, template: str, email: str) -> bool:
+        """
+        Open the coalescing window of an email if none is open
+
+        Args:
+            template (str): The template of the email
+            email (str): The recipient
+
+        Returns:
+            bool: True if the email should be sent, False if a pending one
+            covers it
+        """
+        if self.window_seconds <= 0:
+            return True
+        try:
+            return bool(
+                self.redis.set(
+                    RedisKey.MAIL_COALESCE.format(template=template, email=email),
+                    1,
+                    nx=True,
+                    ex=self.window_seconds,
+                )
+            )
+        except Exception as e:
+            logging.error(f"Error coalescing {template} email to {email}: {e}")
+            return True
+
+    def release(self, template: str, email: str) -> None:
+        """
+        Close the coalescing window of an email once the pending one is used
+
+        Args:
+            template (str): The template of the email
+            email (str): The recipient
+
+        Returns:
+            None
+        """
+        try:
+            self.redis.delete(RedisKey.MAIL_COALESCE.format(template=template, email=email))
+        except Exception as e:
+            logging.error(f"Error releasing {template} email to {email}: {e}")
+
+    def reset(self) -> None:
+        """
+        Close all coalescing windows
+
+        Returns:
+            None
+        """
+        keys = list(
+            self.redis.scan_iter(RedisKey.MAIL_COALESCE.format(template="*", email="*"))
+        )
+        if keys:
+            self.redis.delete(*keys)
+
+
+mail_coalescer = MailCoalescer(redis_client)
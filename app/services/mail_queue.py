@@ -0,0 +1,95 @@
+import logging
+from redis import Redis
+from redis.exceptions import ResponseError
+
+from app.constant_bag.redis import RedisKey
+from app.database.redis import redis_client
+from app.schemas.mail import MailModel
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+MAIL_QUEUE_GROUP = "mail_workers"
+
+MAIL_WORKER_COUNTERS = ("sent", "failed", "retried", "dead_lettered")
+
+
+class MailQueue:
+    """
+    Durable queue of outbound emails in a Redis stream
+
+    Emails are appended to the stream and survive API restarts until a mail
+    worker, reading them through a consumer group, sends and acknowledges
+    them. Failed emails wait in a sorted set until their retry is due and
+    are moved to a dead letter stream after the last attempt.
+
+    Attributes:
+        redis (Redis): The Redis client
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    def enqueue(self, mail: MailModel) -> str | None:
+        """
+        Add an email to the queue
+
+        Args:
+            mail (MailModel): The email to send
+
+        Returns:
+            str | None: The ID of the stream entry, None if Redis is unavailable
+        """
+        try:
+            entry_id = self.redis.xadd(
+                RedisKey.MAIL_QUEUE, {"mail": mail.model_dump_json(), "attempts": 0}
+            )
+        except Exception as e:
+            logging.error(f"Error queueing email to {mail.to}: {e}")
+            return None
+        logging.info(f"Email to {mail.to} queued")
+        return entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+
+    def metrics(self) -> dict[str, int]:
+        """
+        Get the queue metrics
+
+        Returns:
+            dict[str, int]: The queued, pending, scheduled for retry and dead
+            lettered emails, and the counters of the mail workers, all zero if
+            Redis is unavailable
+        """
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.xlen(RedisKey.MAIL_QUEUE)
+            pipeline.zcard(RedisKey.MAIL_RETRY)
+            pipeline.xlen(RedisKey.MAIL_DEAD_LETTER)
+            pipeline.hgetall(RedisKey.MAIL_WORKER_METRICS)
+            queued, scheduled, dead_letter, counters = pipeline.execute()
+        except Exception as e:
+            logging.error(f"Error reading mail queue metrics: {e}")
+            queued, scheduled, dead_letter, counters = 0, 0, 0, {}
+
+        try:
+            pending = self.redis.xpending(RedisKey.MAIL_QUEUE, MAIL_QUEUE_GROUP)[
+                "pending"
+            ]
+        except ResponseError:
+            pending = 0
+        except Exception as e:
+            logging.error(f"Error reading pending emails: {e}")
+            pending = 0
+
+        counters = {key.decode(): int(value) for key, value in counters.items()}
+        return {
+            "queued": queued - pending,
+            "pending": pending,
+            "scheduled": scheduled,
+            "dead_letter": dead_letter,
+            **{counter: counters.get(counter, 0) for counter in MAIL_WORKER_COUNTERS},
+        }
+
+
+mail_queue = MailQueue(redis_client)
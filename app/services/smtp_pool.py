@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from email.message import Message
+from aiosmtplib import SMTP, SMTPServerDisconnected
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+
+@dataclass
+class PooledConnection:
+    """
+    SMTP connection kept open between messages
+
+    Attributes:
+        smtp (SMTP): The connected, authenticated client
+        messages (int): The number of messages sent through the connection
+        last_used_at (float): The monotonic time the connection was last used
+    """
+
+    smtp: SMTP
+    messages: int = 0
+    last_used_at: float = field(default_factory=time.monotonic)
+
+
+class SmtpConnectionPool:
+    """
+    Pool of long-lived authenticated SMTP connections
+
+    Messages are sent one after another over connections kept open between
+    them, so the TLS handshake and login are paid once per connection rather
+    than once per message. Connections idle for ``health_check_seconds`` are
+    checked with NOOP before reuse, connections idle for ``max_idle_seconds``
+    or that sent ``max_messages`` are closed, and a message whose connection
+    was dropped is retried once on a new connection.
+
+    Attributes:
+        hostname (str): The SMTP server host
+        port (int): The SMTP server port
+        username (str | None): The login username, None to skip login
+        password (str | None): The login password
+        use_tls (bool): Whether to connect with implicit TLS
+        start_tls (bool): Whether to upgrade the connection with STARTTLS
+        validate_certs (bool): Whether to validate the server certificate
+        timeout (float): The timeout of each SMTP command in seconds
+        size (int): The maximum number of open connections
+        health_check_seconds (float): The idle time after which a connection
+            is checked before reuse
+        max_idle_seconds (float): The idle time after which a connection is closed
+        max_messages (int): The number of messages after which a connection
+            is closed
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = False,
+        start_tls: bool = False,
+        validate_certs: bool = True,
+        timeout: float = 30,
+        size: int = 4,
+        health_check_seconds: float = 30,
+        max_idle_seconds: float = 300,
+        max_messages: int = 100,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.validate_certs = validate_certs
+        self.timeout = timeout
+        self.size = size
+        self.health_check_seconds = health_check_seconds
+        self.max_idle_seconds = max_idle_seconds
+        self.max_messages = max_messages
+        self._idle: list[PooledConnection] = []
+        self._slots: asyncio.Semaphore | None = None
+
+    async def send(self, message: Message) -> None:
+        """
+        Send a message over a pooled connection
+
+        Args:
+            message (Message): The message to send
+
+        Returns:
+            None
+        """
+        for attempt in range(2):
+            connection = await self._acquire()
+            try:
+                await connection.smtp.send_message(message)
+            except (SMTPServerDisconnected, ConnectionError) as e:
+                await self._discard(connection)
+                if attempt:
+                    raise
+                logging.info(f"SMTP connection dropped, reconnecting: {e}")
+                continue
+            except BaseException:
+                await self._discard(connection)
+                raise
+            await self._release(connection)
+            return
+
+    async def close(self) -> None:
+        """
+        Close the idle connections
+
+        Returns:
+            None
+        """
+        while self._idle:
+            await self._close(self._idle.pop())
+
+    async def _acquire(self) -> PooledConnection:
+        """
+        Take an idle healthy connection, or open one if none is left
+
+        Returns:
+            PooledConnection: The connection
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                connection = self._idle.pop()
+                if await self._is_healthy(connection):
+                    return connection
+                await self._close(connection)
+            return await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def _release(self, connection: PooledConnection) -> None:
+        """
+        Return a connection to the pool after a sent message
+
+        Args:
+            connection (PooledConnection): The connection
+
+        Returns:
+            None
+        """
+        connection.messages += 1
+        connection.last_used_at = time.monotonic()
+        if connection.messages >= self.max_messages:
+            await self._close(connection)
+        else:
+            self._idle.append(connection)
+        self._slots.release()
+
+    async def _discard(self, connection: PooledConnection) -> None:
+        """
+        Close a connection that failed
+
+        Args:
+            connection (PooledConnection): The connection
+
+        Returns:
+            None
+        """
+        connection.smtp.close()
+        self._slots.release()
+
+    async def _connect(self) -> PooledConnection:
+        """
+        Open and authenticate a connection
+
+        Returns:
+            PooledConnection: The connection
+        """
+        smtp = SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            validate_certs=self.validate_certs,
+            timeout=self.timeout,
+        )
+        await smtp.connect()
+        try:
+            if self.username:
+                await smtp.login(self.username, self.password)
+        except BaseException:
+            smtp.close()
+            raise
+        logging.info(f"SMTP connection opened to {self.hostname}:{self.port}")
+        return PooledConnection(smtp)
+
+    async def _is_healthy(self, connection: PooledConnection) -> bool:
+        """
+        Check if an idle connection can be reused
+
+        Args:
+            connection (PooledConnection): The connection
+
+        Returns:
+            bool: True if the connection is open and answers NOOP when it
+            was idle for long
+        """
+        idle = time.monotonic() - connection.last_used_at
+        if not connection.smtp.is_connected or idle >= self.max_idle_seconds:
+            return False
+        if idle < self.health_check_seconds:
+            return True
+        try:
+            await connection.smtp.noop()
+        except Exception:
+            return False
+        return True
+
+    async def _close(self, connection: PooledConnection) -> None:
+        """
+        Close a connection politely
+
+        Args:
+            connection (PooledConnection): The connection
+
+        Returns:
+            None
+        """
+        try:
+            if connection.smtp.is_connected:
+                await connection.smtp.quit()
+        except Exception:
+            connection.smtp.close()
@@ -0,0 +1,64 @@
+import logging
+from pathlib import Path
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from app.conf.config import settings
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+TEMPLATES_DIR = Path(__file__).parent.parent.parent / "templates"
+
+
+def create_environment(
+    directory: Path = TEMPLATES_DIR,
+    bytecode_cache_dir: str | None = settings.TEMPLATE_BYTECODE_CACHE_DIR,
+    auto_reload: bool = settings.TEMPLATE_AUTO_RELOAD,
+) -> Environment:
+    """
+    Create a Jinja environment caching the compiled templates
+
+    Compiled templates are kept in memory and their bytecode on disk, so a
+    template is compiled once per deployment rather than once per render,
+    and a restarted worker loads the bytecode instead of compiling again.
+    Templates are not checked for changes on disk unless ``auto_reload``.
+
+    Args:
+        directory (Path): The templates directory
+        bytecode_cache_dir (str | None): The bytecode cache directory, None
+            for the system temp directory
+        auto_reload (bool): Whether to recompile templates changed on disk
+
+    Returns:
+        Environment: The Jinja environment
+    """
+    return Environment(
+        loader=FileSystemLoader(directory),
+        bytecode_cache=FileSystemBytecodeCache(bytecode_cache_dir or None),
+        auto_reload=auto_reload,
+        autoescape=True,
+    )
+
+
+def precompile_templates(environment: Environment) -> int:
+    """
+    Compile every template of an environment ahead of the first render
+
+    Args:
+        environment (Environment): The Jinja environment
+
+    Returns:
+        int: The number of compiled templates
+    """
+    names = environment.list_templates(extensions=["html"])
+    for name in names:
+        environment.get_template(name)
+    logging.info(f"{len(names)} templates precompiled")
+    return len(names)
+
+
+template_environment = create_environment()
+templates = Jinja2Templates(env=template_environment)
@@ -0,0 +1,225 @@
+import asyncio
+import contextvars
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import List
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.conf.config import settings
+from app.constant_bag.redis import RedisKey
+from app.database.db import sessionmanager
+from app.database.redis import invalidate, redis_client
+from app.entity.contact import Contact
+from app.repository.upcoming_birthday import UpcomingBirthdayRepository
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+
+class UpcomingBirthdayService:
+    """
+    Service for maintaining the upcoming birthdays projection
+
+    The projection is rebuilt once a day and kept up to date incrementally
+    from contact writes. The day it was built for is stored in Redis, so a
+    stale or missing projection is detected on the next read and rebuilt in
+    the background, while reads fall back to querying contacts directly.
+
+    Attributes:
+        repository (UpcomingBirthdayRepository): The projection repository
+        days (int): The number of days in the upcoming birthdays window
+    """
+
+    def __init__(
+        self,
+        repository: UpcomingBirthdayRepository,
+        days: int = settings.UPCOMING_BIRTHDAYS_DAYS,
+    ):
+        self.repository = repository
+        self.days = days
+
+    async def rebuild(self, today: date | None = None) -> None:
+        """
+        Rebuild the projection and mark it as built for the day
+
+        Args:
+            today (date | None): The day to build the projection for, today by default
+
+        Returns:
+            None
+        """
+        today = today or datetime.now().date()
+        await self.repository.rebuild(self.days, today)
+        try:
+            redis_client.set(
+                RedisKey.UPCOMING_BIRTHDAYS_BUILT_ON,
+                today.isoformat(),
+                ex=60 * 60 * 48,
+            )
+        except Exception as e:
+            logging.error(f"Error marking upcoming birthdays as built: {e}")
+        logging.info(f"Upcoming birthdays rebuilt for {today.isoformat()}")
+
+    async def ensure_fresh(self) -> bool:
+        """
+        Check the projection is built for today, and start rebuilding it if not
+
+        Returns:
+            bool: True if the projection can be read, False if the caller
+            should fall back to querying contacts directly
+        """
+        today = datetime.now().date()
+        try:
+            built_on = redis_client.get(RedisKey.UPCOMING_BIRTHDAYS_BUILT_ON)
+            if built_on and built_on.decode() == today.isoformat():
+                return True
+        except Exception as e:
+            logging.error(f"Error checking upcoming birthdays: {e}")
+            return False
+
+        start_rebuild(today)
+        return False
+
+    async def get_closest(
+        self, user_id: int, limit: int = 10, offset: int = 0
+    ) -> List[Contact] | None:
+        """
+        Get contacts with upcoming birthday from the projection
+
+        Args:
+            user_id (int): The ID of the user
+            limit (int): The limit of contacts to return
+            offset (int): The offset of the contacts to return
+
+        Returns:
+            List[Contact] | None: The contacts, or None if the projection
+            is not available
+        """
+        if not await self.ensure_fresh():
+            return None
+        return await self.repository.get_closest(user_id, limit, offset)
+
+    async def refresh_contact(self, contact: Contact | None) -> None:
+        """
+        Refresh the projection after a contact was created or updated
+
+        Args:
+            contact (Contact | None): The contact to refresh
+
+        Returns:
+            None
+        """
+        if contact is None:
+            return
+        try:
+            await self.repository.refresh_contact(
+                contact.id, contact.user_id, self.days, datetime.now().date()
+            )
+        except SQLAlchemyError as e:
+            await self._mark_stale(e)
+        await self.repository.db.refresh(contact)
+
+    async def delete_contact(self, contact_id: int, user_id: int) -> None:
+        """
+        Remove a deleted contact from the projection
+
+        Args:
+            contact_id (int): The ID of the contact
+            user_id (int): The ID of the user
+
+        Returns:
+            None
+        """
+        try:
+            await self.repository.delete_contact(contact_id, user_id)
+        except SQLAlchemyError as e:
+            await self._mark_stale(e)
+
+    async def _mark_stale(self, error: Exception) -> None:
+        """
+        Mark the projection as stale so it is rebuilt on the next read
+
+        Args:
+            error (Exception): The error that left the projection out of date
+
+        Returns:
+            None
+        """
+        logging.error(f"Error updating upcoming birthdays: {error}")
+        await self.repository.db.rollback()
+        await invalidate(RedisKey.UPCOMING_BIRTHDAYS_BUILT_ON)
+
+
+# Background rebuilds, referenced until they finish so they are not collected
+_rebuilds: set[asyncio.Task] = set()
+
+
+async def rebuild_upcoming_birthdays(today: date) -> None:
+    """
+    Rebuild the upcoming birthdays projection in a session of its own
+
+    Releases the rebuild lock once done, whether the rebuild succeeded or not.
+
+    Args:
+        today (date): The day to build the projection for
+
+    Returns:
+        None
+    """
+    try:
+        async with sessionmanager.session() as session:
+            service = UpcomingBirthdayService(UpcomingBirthdayRepository(session))
+            await service.rebuild(today)
+    except Exception as e:
+        logging.error(f"Error rebuilding upcoming birthdays: {e}")
+    finally:
+        await invalidate(RedisKey.UPCOMING_BIRTHDAYS_REBUILD_LOCK)
+
+
+def start_rebuild(today: date) -> asyncio.Task | None:
+    """
+    Start rebuilding the upcoming birthdays projection in the background
+
+    Only the worker holding the rebuild lock rebuilds the projection. The
+    rebuild runs outside of the context of the current request, so it is
+    not bound by its deadline.
+
+    Args:
+        today (date): The day to build the projection for
+
+    Returns:
+        asyncio.Task | None: The rebuild, None if another one is running
+    """
+    try:
+        if not redis_client.set(
+            RedisKey.UPCOMING_BIRTHDAYS_REBUILD_LOCK, 1, nx=True, ex=60 * 10
+        ):
+            return None
+    except Exception as e:
+        logging.error(f"Error locking upcoming birthdays rebuild: {e}")
+        return None
+
+    task = asyncio.create_task(
+        rebuild_upcoming_birthdays(today), context=contextvars.Context()
+    )
+    _rebuilds.add(task)
+    task.add_done_callback(_rebuilds.discard)
+    return task
+
+
+async def rebuild_upcoming_birthdays_daily():
+    """
+    Rebuild the upcoming birthdays projection at every local midnight
+
+    Returns:
+        None
+    """
+    while True:
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), time.min)
+        await asyncio.sleep((midnight - now).total_seconds())
+        task = start_rebuild(datetime.now().date())
+        if task is not None:
+            await task
@@ -1,51 +1,116 @@
-import cloudinary
-import cloudinary.uploader
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from app.conf.config import settings
+from app.exceptions.deadline_exceeded_exception import DeadlineExceededException
+from app.exceptions.upload_busy_exception import UploadBusyException
+from app.middlewares.deadline import remaining_time
+from app.services.avatar_processor import ProcessedImage
+from app.services.avatar_storage import AvatarStorage, load_avatar_storage
 
 
 class UploadFileService:
     """
-    Service for uploading files to Cloudinary
+    Service for uploading avatars to their storage backend
+
+    The async ``upload`` runs the blocking storage backend on a dedicated
+    thread pool, so an upload does not stall the event loop. The number of
+    pending uploads is bounded, new uploads are rejected once the queue is
+    full, and every upload is timed out. A timed out upload keeps counting
+    against the queue until its thread is done with it.
 
     Attributes:
-        cloud_name (str): The name of the cloud
-        api_key (str): The API key for Cloudinary
-        api_secret (str): The API secret for Cloudinary
+        storage (AvatarStorage): The storage backend of the avatars
+        workers (int): The number of upload threads
+        queue_limit (int): The number of uploads allowed to wait for a thread
+        timeout_seconds (float): The timeout of an upload
     """
 
-    def __init__(self, cloud_name, api_key, api_secret):
-        self.cloud_name = cloud_name
-        self.api_key = api_key
-        self.api_secret = api_secret
-        cloudinary.config(
-            cloud_name=self.cloud_name,
-            api_key=self.api_key,
-            api_secret=self.api_secret,
-            secure=True,
-        )
-
-    @staticmethod
-    def upload_file(file, username: str) -> str:
+    def __init__(
+        self,
+        storage: AvatarStorage,
+        workers: int = settings.UPLOAD_WORKERS,
+        queue_limit: int = settings.UPLOAD_QUEUE_LIMIT,
+        timeout_seconds: float = settings.UPLOAD_TIMEOUT_SECONDS,
+    ):
+        self.storage = storage
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout_seconds = timeout_seconds
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    def upload_file(self, image: ProcessedImage, timeout: float | None = None) -> str:
+        """
+        Store an avatar image under its content digest
+
+        Args:
+            image (ProcessedImage): The avatar image
+            timeout (float | None): The timeout of the storage request
+
+        Returns:
+            str: The URL of the uploaded file
+        """
+        return self.storage.save(image, timeout)
+
+    async def upload(self, image: ProcessedImage) -> str:
         """
-        Upload a file to Cloudinary
+        Upload an avatar image on the upload thread pool
 
         Args:
-            file (UploadFile): The file to upload
-            username (str): The username of the user
+            image (ProcessedImage): The avatar image
 
         Returns:
             str: The URL of the uploaded file
+
+        Raises:
+            UploadBusyException: If the upload queue is full
+            DeadlineExceededException: If the upload timed out
         """
-        public_id = f"RestApp/{username}"
-        r = cloudinary.uploader.upload(file.file, public_id=public_id, overwrite=True)
-        src_url = cloudinary.CloudinaryImage(public_id).build_url(
-            width=250, height=250, crop="fill", version=r.get("version")
-        )
-        return src_url
-
-
-upload_file_service = UploadFileService(
-    settings.CLOUDINARY_NAME,
-    settings.CLOUDINARY_API_KEY,
-    settings.CLOUDINARY_API_SECRET,
+        if self._in_flight >= self.workers + self.queue_limit:
+            raise UploadBusyException("Too many pending uploads")
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="file-upload"
+            )
+
+        timeout = remaining_time(self.timeout_seconds)
+        with self._in_flight_lock:
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(self.upload_file, image, timeout)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceededException("Upload timed out")
+
+    def _release(self, future: Future | None = None) -> None:
+        """
+        Stop counting an upload once its thread is done with it
+
+        Args:
+            future (Future | None): The finished upload
+
+        Returns:
+            None
+        """
+        with self._in_flight_lock:
+            self._in_flight -= 1
+
+
+avatar_storage = load_avatar_storage(
+    settings.AVATAR_STORAGE,
+    cloud_name=settings.CLOUDINARY_NAME,
+    api_key=settings.CLOUDINARY_API_KEY,
+    api_secret=settings.CLOUDINARY_API_SECRET,
+    directory=settings.AVATAR_LOCAL_DIR,
+    base_url=f"{settings.DOMAIN}/api/avatars",
 )
+
+upload_file_service = UploadFileService(avatar_storage)
@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+from tempfile import SpooledTemporaryFile
+from fastapi import HTTPException, Request, status
+from python_multipart import MultipartParser
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import parse_options_header
+
+from app.conf.config import settings
+from app.exceptions.upload_too_large_exception import UploadTooLargeException
+
+# Room left in the request body for the multipart boundaries, the part
+# headers and other small fields on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+
+class StreamedUpload:
+    """
+    File field of a multipart request, received as the body is streamed
+
+    The file is written to a temporary file kept in memory up to
+    ``spool_max_memory`` bytes and rolled over to disk above it, and hashed
+    while its bytes arrive. Bodies announcing more than ``max_bytes`` in
+    their Content-Length are rejected before they are read, and bodies
+    without one once more than ``max_bytes`` of the file were received.
+
+    Attributes:
+        field (str): The name of the file field
+        max_bytes (int): The largest accepted file
+        file (SpooledTemporaryFile): The received file, rewound once received
+        filename (str | None): The client file name
+        content_type (str | None): The client content type
+        size (int): The number of received bytes of the file
+        spool_max_memory (int): The largest file kept in memory
+    """
+
+    def __init__(
+        self,
+        field: str = "file",
+        max_bytes: int = settings.UPLOAD_MAX_BYTES,
+        spool_max_memory: int = settings.UPLOAD_SPOOL_MAX_MEMORY_BYTES,
+    ):
+        self.field = field
+        self.max_bytes = max_bytes
+        self.spool_max_memory = spool_max_memory
+        self.file = SpooledTemporaryFile(max_size=spool_max_memory)
+        self.filename: str | None = None
+        self.content_type: str | None = None
+        self.size = 0
+        self._written = 0
+        self._hash = hashlib.sha256()
+        self._found = False
+        self._in_field = False
+        self._headers: dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._chunks: list[bytes] = []
+
+    @property
+    def digest(self) -> str:
+        """
+        The SHA-256 hex digest of the received file
+        """
+        return self._hash.hexdigest()
+
+    @property
+    def on_disk(self) -> bool:
+        """
+        Whether the file rolled over from memory to disk
+        """
+        return self._written > self.spool_max_memory
+
+    async def receive(self, request: Request) -> "StreamedUpload":
+        """
+        Stream the request body into the upload
+
+        Args:
+            request (Request): The multipart request
+
+        Returns:
+            StreamedUpload: The upload, its file rewound
+
+        Raises:
+            UploadTooLargeException: If the body or the file is too large
+            HTTPException: If the body is not multipart or has no file field
+        """
+        content_length = request.headers.get("content-length")
+        body_max_bytes = self.max_bytes + MULTIPART_OVERHEAD_BYTES
+        if content_length and content_length.isdigit():
+            if int(content_length) > body_max_bytes:
+                raise UploadTooLargeException("File is too large")
+
+        content_type, options = parse_options_header(
+            request.headers.get("content-type", "")
+        )
+        if content_type != b"multipart/form-data" or b"boundary" not in options:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Multipart form data required",
+            )
+
+        parser = MultipartParser(
+            options[b"boundary"],
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+            },
+        )
+        received = 0
+        try:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > body_max_bytes:
+                    raise UploadTooLargeException("File is too large")
+                parser.write(chunk)
+                await self._write_chunks()
+            parser.finalize()
+        except MultipartParseError:
+            self.file.close()
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Invalid multipart form data",
+            )
+        except BaseException:
+            self.file.close()
+            raise
+
+        if not self._found:
+            self.file.close()
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Missing {self.field} field",
+            )
+        self.file.seek(0)
+        return self
+
+    def close(self) -> None:
+        """
+        Delete the received file
+
+        Returns:
+            None
+        """
+        self.file.close()
+
+    async def _write_chunks(self) -> None:
+        """
+        Write the file chunks parsed from the last body chunk
+
+        Chunks are written on a thread once the file rolled over to disk.
+
+        Returns:
+            None
+        """
+        for chunk in self._chunks:
+            if self.on_disk:
+                await asyncio.to_thread(self.file.write, chunk)
+            else:
+                self.file.write(chunk)
+            self._written += len(chunk)
+        self._chunks.clear()
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+        self._in_field = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if self._found or options.get(b"name") != self.field.encode():
+            return
+        self._found = True
+        self._in_field = True
+        if b"filename" in options:
+            self.filename = options[b"filename"].decode("latin-1")
+        if b"content-type" in self._headers:
+            self.content_type = self._headers[b"content-type"].decode("latin-1")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._in_field:
+            return
+        chunk = data[start:end]
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadTooLargeException("File is too large")
+        self._hash.update(chunk)
+        self._chunks.append(chunk)
@@ -1,21 +1,26 @@
 import logging
 from typing import TYPE_CHECKING
 from libgravatar import Gravatar
-from fastapi import BackgroundTasks, File
 
 from app.constant_bag.redis import RedisKey
 from app.exceptions.token_decode_exception import TokenDecodeException
 from app.security.token_encoder import token_encoder
 from app.conf.config import settings
 from app.security.password_hasher import password_hasher
+from app.security.refresh_token_store import refresh_token_store
 from app.entity.user import User
 from app.exceptions.user_exists_exception import UserExistsException
 from app.repository.user import UserRepository
-from app.schemas.user import UserModel
+from app.schemas.user import UserAvailabilityResponse, UserModel
 from app.schemas.mail import MailModel
-from app.services.mail import mail_service
+from app.services.avatar_processor import avatar_processor
+from app.services.mail_coalescer import mail_coalescer
+from app.services.mail_queue import mail_queue
 from app.services.upload_file import upload_file_service
-from app.database.redis import invalidate, invalidate_cache
+from app.services.upload_stream import StreamedUpload
+from app.database.db import sessionmanager
+from app.database.redis import invalidate, invalidate_cache, redis_client
+from app.database.redis_bloom_filter import RedisBloomFilter
 from app.services.auth import auth_service
 
 
@@ -24,6 +29,13 @@ logging.basicConfig(
     level=logging.INFO,
 )
 
+taken_identities = RedisBloomFilter(
+    redis_client,
+    RedisKey.AUTH_TAKEN_IDENTITIES,
+    settings.USER_AVAILABILITY_BLOOM_CAPACITY,
+    settings.USER_AVAILABILITY_BLOOM_ERROR_RATE,
+)
+
 
 class UserService:
     """
@@ -31,16 +43,10 @@ class UserService:
 
     Attributes:
         user_repository (UserRepository): The repository for managing users
-        background_tasks (BackgroundTasks): The background tasks for the user service
     """
 
-    def __init__(
-        self,
-        user_repository: UserRepository,
-        background_tasks: BackgroundTasks = BackgroundTasks(),
-    ):
+    def __init__(self, user_repository: UserRepository):
         self.user_repository = user_repository
-        self.background_tasks = background_tasks
 
     @staticmethod
     async def invalidate_user_cache(user: User | None):
@@ -52,6 +58,7 @@ class UserService:
         """
         if user:
             await invalidate(RedisKey.AUTH_USER.format(username=user.username))
+            await invalidate(RedisKey.AUTH_TOKEN_VERSION.format(user_id=user.id))
 
     async def get_user_by_email(self, email: str) -> User | None:
         """
@@ -82,57 +89,107 @@ class UserService:
         """
         Create a user
 
+        Duplicates are rejected by a single query before the password is
+        hashed, and registrations racing for the same email or username are
+        rejected by the unique constraints.
+
         Args:
             user (UserModel): The user to create
 
         Returns:
             User: The created user
         """
+        taken_field = await self.user_repository.get_taken_field(
+            user.email, user.username
+        )
+        if taken_field:
+            raise UserExistsException(f"User with this {taken_field} already exists")
 
-        user.password = password_hasher.hash_password(user.password)
+        user.password = await password_hasher.hash(user.password)
 
         if not user.avatar:
             g = Gravatar(user.email)
             user.avatar = g.get_image()
 
-        if await self.get_user_by_email(user.email):
-            raise UserExistsException("User with this email already exists")
-
-        if await self.get_user_by_username(user.username):
-            raise UserExistsException("User with this username already exists")
-
         user = await self.user_repository.create(user)
+        try:
+            taken_identities.add(f"username:{user.username}", f"email:{user.email}")
+        except Exception as e:
+            logging.error(f"Error marking user {user.username} as taken: {e}")
+            await invalidate(taken_identities.ready_key)
 
         await self.send_verification_email(user)
 
         return user
 
+    async def check_availability(
+        self, username: str | None = None, email: str | None = None
+    ) -> UserAvailabilityResponse:
+        """
+        Check if a username and email are free to register
+
+        Values missing from the availability filter are free without a
+        database query; only possibly taken ones are looked up.
+
+        Args:
+            username (str | None): The username to check
+            email (str | None): The email to check
+
+        Returns:
+            UserAvailabilityResponse: The availability of the checked values
+        """
+        availability = UserAvailabilityResponse()
+        if username is not None:
+            availability.username_available = not (
+                taken_identities.might_contain(f"username:{username}")
+                and await self.user_repository.get_by_username(username)
+            )
+        if email is not None:
+            availability.email_available = not (
+                taken_identities.might_contain(f"email:{email}")
+                and await self.user_repository.get_by_email(email)
+            )
+        return availability
+
     async def send_verification_email(self, user: User) -> bool:
         """
         Send a verification email to a user
 
+        No new email is queued while one sent within the coalescing window
+        is pending. The window is closed again if the email is not queued.
+
         Args:
             user (User): The user to send the verification email to
 
         Returns:
-            bool: True if the verification email was sent, False otherwise
+            bool: True if a verification email was sent or is pending, False
+            if the email is already verified
         """
-        if not user.email_verified:
-            self.background_tasks.add_task(
-                mail_service.send_email,
-                MailModel(
-                    to=[user.email],
-                    subject="Confirm your email",
-                    data={
-                        "host": settings.DOMAIN,
-                        "username": user.username,
-                        "token": await token_encoder.create_token({"sub": user.email}),
-                    },
-                    template="verify_email.html",
-                ),
-            )
-            return True
-        return False
+        if user.email_verified:
+            return False
+        if mail_coalescer.claim("verify_email.html", user.email):
+            entry_id = None
+            try:
+                entry_id = mail_queue.enqueue(
+                    MailModel(
+                        to=[user.email],
+                        subject="Confirm your email",
+                        data={
+                            "host": settings.DOMAIN,
+                            "username": user.username,
+                            "token": await token_encoder.create_token(
+                                {"sub": user.email}
+                            ),
+                        },
+                        template="verify_email.html",
+                    ),
+                )
+            finally:
+                if entry_id is None:
+                    mail_coalescer.release("verify_email.html", user.email)
+        else:
+            logging.info(f"Verification email to {user.email} coalesced")
+        return True
 
     async def send_password_reset_email(self, user: User) -> bool:
         """
@@ -145,8 +202,7 @@ class UserService:
             bool: True if the verification email was sent, False otherwise
         """
         if user.email_verified:
-            self.background_tasks.add_task(
-                mail_service.send_email,
+            entry_id = mail_queue.enqueue(
                 MailModel(
                     to=[user.email],
                     subject="Password reset",
@@ -158,7 +214,7 @@ class UserService:
                     template="reset_password.html",
                 ),
             )
-            return True
+            return entry_id is not None
         return False
 
     @invalidate_cache(invalidator_function=invalidate_user_cache)
@@ -189,41 +245,64 @@ class UserService:
         return user
 
     @invalidate_cache(invalidator_function=invalidate_user_cache)
-    async def update_avatar(self, user: User, file: File) -> User | None:
+    async def update_avatar(self, user: User, upload: StreamedUpload) -> User | None:
         """
         Update a user's avatar
 
-        Args:
-            user (User): The user to update the avatar for
-            file (File): The file to update the avatar with
-
-        Returns:
-            User | None: The updated user if found, None otherwise
-        """
-        avatar_url = upload_file_service.upload_file(file, user.username)
-        return await self.user_repository.update(user.id, UserModel(avatar=avatar_url))
-
-    @invalidate_cache(invalidator_function=invalidate_user_cache)
-    async def update_refresh_token(self, user: User, refresh_token: str) -> User | None:
-        """
-        Update a user's refresh token
+        The file is processed into a square avatar locally, and not uploaded
+        again if it is the same image as the current avatar. A file identical
+        to one uploaded recently with the same avatar settings and storage
+        backend reuses its avatar without being processed.
 
         Args:
-            user (User): The user to update the refresh token for
-            refresh_token (str): The refresh token to update
+            user (User): The user to update the avatar for
+            upload (StreamedUpload): The uploaded file
 
         Returns:
             User | None: The updated user if found, None otherwise
         """
-        return await self.user_repository.update(
-            user.id, UserModel(refresh_token=refresh_token)
+        cache_key = RedisKey.AVATAR_UPLOAD.format(
+            storage=settings.AVATAR_STORAGE,
+            format=avatar_processor.output_format,
+            size=avatar_processor.size,
+            quality=avatar_processor.quality,
+            digest=upload.digest,
         )
+        try:
+            avatar_url = redis_client.get(cache_key)
+        except Exception as e:
+            logging.error(f"Error reading uploaded avatar {upload.digest}: {e}")
+            avatar_url = None
+
+        if avatar_url:
+            avatar_url = avatar_url.decode()
+        else:
+            image = await avatar_processor.process(upload.file)
+            if user.avatar and image.digest in user.avatar:
+                avatar_url = user.avatar
+            else:
+                avatar_url = await upload_file_service.upload(image)
+            try:
+                redis_client.set(
+                    cache_key, avatar_url, ex=settings.AVATAR_UPLOAD_CACHE_SECONDS
+                )
+            except Exception as e:
+                logging.error(f"Error caching uploaded avatar {upload.digest}: {e}")
+
+        if avatar_url == user.avatar:
+            logging.info(f"Avatar of user {user.username} unchanged")
+            return user
+        return await self.user_repository.update(user.id, UserModel(avatar=avatar_url))
 
     @invalidate_cache(invalidator_function=invalidate_user_cache)
     async def request_password_reset(self, email: str) -> User | None:
         """
         Request a password reset
 
+        Requests within the coalescing window of a pending reset email reuse
+        its token, without writing a new one or sending another email. The
+        window is closed again if the email is not sent.
+
         Args:
             email (str): The email of the user to request a password reset for
 
@@ -231,22 +310,58 @@ class UserService:
             bool: True if the password reset was requested, False otherwise
         """
         user = await self.user_repository.get_by_email(email)
-        if user:
-            password_reset_token = await auth_service.create_password_reset_token(user)
-            user = await self.user_repository.update(
-                user.id, UserModel(password_reset_token=password_reset_token)
-            )
-            await self.send_password_reset_email(user)
-            logging.info(f"Password reset email sent to {email}")
+        claimed = bool(user) and mail_coalescer.claim("reset_password.html", email)
+        if user and not claimed and user.password_reset_token:
+            logging.info(f"Password reset email to {email} coalesced")
+        elif user:
+            sent = False
+            try:
+                password_reset_token = await auth_service.create_password_reset_token(
+                    user
+                )
+                user = await self.user_repository.update(
+                    user.id, UserModel(password_reset_token=password_reset_token)
+                )
+                sent = await self.send_password_reset_email(user)
+            finally:
+                if claimed and not sent:
+                    mail_coalescer.release("reset_password.html", email)
+            if sent:
+                logging.info(f"Password reset email sent to {email}")
+            else:
+                logging.info(f"Password reset email not sent to {email}")
         else:
             logging.info(f"Password reset email not sent to {email}")
 
         return user
 
+    async def rehash_password(
+        self, user_id: int, username: str, hashed_password: str, password: str
+    ) -> bool:
+        """
+        Replace a password hash with one of the current scheme and cost
+
+        Args:
+            user_id (int): The ID of the user
+            username (str): The username of the user
+            hashed_password (str): The password hash the password was verified against
+            password (str): The verified password
+
+        Returns:
+            bool: True if the password was rehashed, False if it changed meanwhile
+        """
+        new_hashed_password = await password_hasher.hash(password)
+        replaced = await self.user_repository.replace_password(
+            user_id, hashed_password, new_hashed_password
+        )
+        if replaced:
+            await invalidate(RedisKey.AUTH_USER.format(username=username))
+        return replaced
+
     @invalidate_cache(invalidator_function=invalidate_user_cache)
     async def reset_password(self, user: User, password: str) -> User | None:
         """
-        Update a user's password
+        Update a user's password and revoke the issued access and refresh tokens
 
         Args:
             user (User): The user to reset the password for
@@ -255,10 +370,61 @@ class UserService:
         Returns:
             User | None: The updated user if found, None otherwise
         """
+        await self.user_repository.increment_token_version(user.id)
+        refresh_token_store.revoke_user(user.id)
+        mail_coalescer.release("reset_password.html", user.email)
         return await self.user_repository.update(
             user.id,
             UserModel(
-                password=password_hasher.hash_password(password),
+                password=await password_hasher.hash(password),
                 password_reset_token=None,
             ),
         )
+
+
+async def rehash_password(
+    user_id: int, username: str, hashed_password: str, password: str
+) -> None:
+    """
+    Rehash a password after login, outside of the login request
+
+    Args:
+        user_id (int): The ID of the user
+        username (str): The username of the user
+        hashed_password (str): The password hash the password was verified against
+        password (str): The verified password
+
+    Returns:
+        None
+    """
+    try:
+        async with sessionmanager.session() as session:
+            service = UserService(UserRepository(session))
+            if await service.rehash_password(
+                user_id, username, hashed_password, password
+            ):
+                logging.info(f"Password of user {username} rehashed")
+    except Exception as e:
+        logging.error(f"Error rehashing password of user {username}: {e}")
+
+
+async def seed_taken_identities() -> None:
+    """
+    Seed the availability filter with the registered users once
+
+    Returns:
+        None
+    """
+    try:
+        if taken_identities.is_seeded():
+            return
+        async with sessionmanager.session() as session:
+            async for rows in UserRepository(session).iter_identities():
+                taken_identities.add(
+                    *(f"username:{row.username}" for row in rows),
+                    *(f"email:{row.email}" for row in rows),
+                )
+        taken_identities.mark_seeded()
+        logging.info("Availability filter seeded")
+    except Exception as e:
+        logging.error(f"Error seeding availability filter: {e}")
@@ -0,0 +1,287 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import time
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, ResponseError
+
+from app.conf.config import settings
+from app.constant_bag.redis import RedisKey
+from app.schemas.mail import MailModel
+from app.services.mail import MailService, mail_service, smtp_pool
+from app.services.mail_queue import MAIL_QUEUE_GROUP
+from app.services.templates import precompile_templates, template_environment
+
+logging.basicConfig(
+    format="%(asctime)s %(message)s",
+    level=logging.INFO,
+)
+
+THROUGHPUT_LOG_SECONDS = 60
+
+# Delay before polling again after a Redis error, doubled on every further
+# error in a row up to the maximum
+REDIS_ERROR_BACKOFF_SECONDS = 1
+REDIS_ERROR_BACKOFF_MAX_SECONDS = 30
+
+# Moves the retries that are due back to the queue, atomically so that two
+# workers never requeue the same email.
+PROMOTE_RETRIES_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, member in ipairs(due) do
+    local retry = cjson.decode(member)
+    redis.call('XADD', KEYS[2], '*', 'mail', retry['mail'], 'attempts', retry['attempts'])
+    redis.call('ZREM', KEYS[1], member)
+end
+return #due
+"""
+
+
+class MailWorker:
+    """
+    Worker sending the emails of the mail queue
+
+    Up to ``concurrency`` emails are sent at once. A failed email is retried
+    with exponential backoff and moved to the dead letter stream after
+    ``max_attempts``. Emails read by a worker that died are claimed by
+    another one once they were pending for ``claim_idle_seconds``.
+
+    Attributes:
+        redis (Redis): The async Redis client
+        mail_service (MailService): The service sending the emails
+        consumer (str): The consumer name of the worker in the group
+        concurrency (int): The number of emails sent at once
+        max_attempts (int): The number of attempts before dead lettering
+        backoff_seconds (float): The delay before the first retry, doubled
+            on every further one
+        backoff_max_seconds (float): The maximum delay before a retry
+        claim_idle_seconds (float): The time after which a pending email of
+            another worker is claimed
+        block_seconds (float): The time to wait for new emails per read
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        mail_service: MailService,
+        consumer: str,
+        concurrency: int = settings.MAIL_WORKER_CONCURRENCY,
+        max_attempts: int = settings.MAIL_MAX_ATTEMPTS,
+        backoff_seconds: float = settings.MAIL_RETRY_BACKOFF_SECONDS,
+        backoff_max_seconds: float = settings.MAIL_RETRY_BACKOFF_MAX_SECONDS,
+        claim_idle_seconds: float = settings.MAIL_CLAIM_IDLE_SECONDS,
+        block_seconds: float = 1,
+    ):
+        self.redis = redis
+        self.mail_service = mail_service
+        self.consumer = consumer
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.claim_idle_seconds = claim_idle_seconds
+        self.block_seconds = block_seconds
+        self._promote_retries = redis.register_script(PROMOTE_RETRIES_SCRIPT)
+        self._tasks: set[asyncio.Task] = set()
+        self._sent = 0
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """
+        Send queued emails until stopped, then wait for the emails being sent
+
+        Redis errors are logged and polling is retried with backoff, creating
+        the consumer group again in case Redis lost it.
+
+        Args:
+            stop (asyncio.Event): The event stopping the worker
+
+        Returns:
+            None
+        """
+        logged_at, logged_sent = time.monotonic(), 0
+        errors, group_ready = 0, False
+        while not stop.is_set():
+            try:
+                if not group_ready:
+                    await self.ensure_group()
+                    group_ready = True
+                entries = await self.poll()
+            except RedisError as e:
+                delay = min(
+                    REDIS_ERROR_BACKOFF_SECONDS * 2**errors,
+                    REDIS_ERROR_BACKOFF_MAX_SECONDS,
+                )
+                errors, group_ready = errors + 1, False
+                logging.error(f"Mail worker {self.consumer} Redis error: {e}")
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            errors = 0
+
+            for entry_id, fields in entries:
+                task = asyncio.create_task(self.process(entry_id, fields))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+            now = time.monotonic()
+            if now - logged_at >= THROUGHPUT_LOG_SECONDS:
+                logging.info(
+                    f"Mail worker {self.consumer} sent {self._sent - logged_sent} "
+                    f"emails at {(self._sent - logged_sent) / (now - logged_at):.2f}/s"
+                )
+                logged_at, logged_sent = now, self._sent
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def ensure_group(self) -> None:
+        """
+        Create the stream and its consumer group if they do not exist
+
+        Returns:
+            None
+        """
+        try:
+            await self.redis.xgroup_create(
+                RedisKey.MAIL_QUEUE, MAIL_QUEUE_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def poll(self) -> list[tuple[str, dict]]:
+        """
+        Requeue due retries and take as many emails as there are free slots
+
+        Emails pending on dead workers are taken first, then new ones.
+
+        Returns:
+            list[tuple[str, dict]]: The entry IDs and fields of the emails
+        """
+        free = self.concurrency - len(self._tasks)
+        if free <= 0:
+            await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+            return []
+
+        await self._promote_retries(
+            keys=[RedisKey.MAIL_RETRY, RedisKey.MAIL_QUEUE], args=[time.time(), free]
+        )
+
+        _, claimed, *_ = await self.redis.xautoclaim(
+            RedisKey.MAIL_QUEUE,
+            MAIL_QUEUE_GROUP,
+            self.consumer,
+            min_idle_time=int(self.claim_idle_seconds * 1000),
+            count=free,
+        )
+        entries = [(entry_id, fields) for entry_id, fields in claimed if fields]
+        if entries:
+            return entries
+
+        response = await self.redis.xreadgroup(
+            MAIL_QUEUE_GROUP,
+            self.consumer,
+            {RedisKey.MAIL_QUEUE: ">"},
+            count=free,
+            block=int(self.block_seconds * 1000),
+        )
+        return [entry for _, stream_entries in response for entry in stream_entries]
+
+    async def process(self, entry_id: str, fields: dict) -> bool:
+        """
+        Send an email and acknowledge it, scheduling a retry if it failed
+
+        Args:
+            entry_id (str): The ID of the stream entry
+            fields (dict): The fields of the stream entry
+
+        Returns:
+            bool: True if the email was sent, False otherwise
+        """
+        attempts = int(fields.get("attempts", 0)) + 1
+        try:
+            sent = await self.mail_service.send_email(
+                MailModel.model_validate_json(fields["mail"])
+            )
+        except Exception as e:
+            logging.error(f"Error sending queued email {entry_id}: {e}")
+            sent = False
+
+        pipeline = self.redis.pipeline(transaction=True)
+        if sent:
+            pipeline.hincrby(RedisKey.MAIL_WORKER_METRICS, "sent", 1)
+        elif attempts >= self.max_attempts:
+            logging.error(f"Email {entry_id} dead lettered after {attempts} attempts")
+            pipeline.xadd(
+                RedisKey.MAIL_DEAD_LETTER,
+                {"mail": fields["mail"], "attempts": attempts, "entry_id": entry_id},
+                maxlen=settings.MAIL_DEAD_LETTER_MAX_LENGTH,
+                approximate=True,
+            )
+            pipeline.hincrby(RedisKey.MAIL_WORKER_METRICS, "failed", 1)
+            pipeline.hincrby(RedisKey.MAIL_WORKER_METRICS, "dead_lettered", 1)
+        else:
+            retry = json.dumps(
+                {"entry_id": entry_id, "mail": fields["mail"], "attempts": attempts}
+            )
+            pipeline.zadd(RedisKey.MAIL_RETRY, {retry: time.time() + self.backoff(attempts)})
+            pipeline.hincrby(RedisKey.MAIL_WORKER_METRICS, "failed", 1)
+            pipeline.hincrby(RedisKey.MAIL_WORKER_METRICS, "retried", 1)
+        pipeline.xack(RedisKey.MAIL_QUEUE, MAIL_QUEUE_GROUP, entry_id)
+        pipeline.xdel(RedisKey.MAIL_QUEUE, entry_id)
+        await pipeline.execute()
+
+        if sent:
+            self._sent += 1
+        return sent
+
+    def backoff(self, attempts: int) -> float:
+        """
+        Get the delay before the retry following a failed attempt
+
+        Args:
+            attempts (int): The number of failed attempts
+
+        Returns:
+            float: The delay in seconds
+        """
+        return min(self.backoff_seconds * 2 ** (attempts - 1), self.backoff_max_seconds)
+
+
+async def main() -> None:
+    """
+    Run a mail worker until SIGINT or SIGTERM
+    """
+    redis = Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        decode_responses=True,
+    )
+    precompile_templates(template_environment)
+    worker = MailWorker(
+        redis, mail_service, consumer=f"{socket.gethostname()}-{os.getpid()}"
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logging.info(f"Mail worker {worker.consumer} started")
+    try:
+        await worker.run(stop)
+    finally:
+        await smtp_pool.close()
+        await redis.aclose()
+        logging.info(f"Mail worker {worker.consumer} stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
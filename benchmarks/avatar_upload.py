@@ -0,0 +1,109 @@
+"""
+Benchmark of avatar upload throughput with the local storage backend
+
+Processes and stores distinct generated images through the avatar
+processor and the upload service, as PATCH /api/users/avatar does, then
+stores them again to measure uploads skipped by content-addressed dedup.
+
+Run from the project root:
+
+    python -m benchmarks.avatar_upload [--iterations N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from io import BytesIO
+from PIL import Image
+
+from app.services.avatar_processor import AvatarProcessor
+from app.services.avatar_storage import LocalAvatarStorage
+from app.services.upload_file import UploadFileService
+
+
+def make_images(count: int, size: tuple[int, int]) -> list[bytes]:
+    """
+    Generate distinct JPEG images
+
+    Args:
+        count (int): The number of images
+        size (tuple[int, int]): The width and height of the images
+
+    Returns:
+        list[bytes]: The encoded images
+    """
+    images = []
+    for i in range(count):
+        buffer = BytesIO()
+        Image.new("RGB", size, (i % 256, i // 256 % 256, 128)).save(
+            buffer, format="JPEG", quality=90
+        )
+        images.append(buffer.getvalue())
+    return images
+
+
+async def measure(
+    images: list[bytes],
+    processor: AvatarProcessor,
+    service: UploadFileService,
+    concurrency: int,
+) -> float:
+    """
+    Measure the throughput of processing and storing images
+
+    Args:
+        images (list[bytes]): The uploaded images
+        processor (AvatarProcessor): The avatar processor
+        service (UploadFileService): The upload service
+        concurrency (int): The number of uploads at once
+
+    Returns:
+        float: The uploads per second
+    """
+    slots = asyncio.Semaphore(concurrency)
+
+    async def upload(data: bytes) -> str:
+        async with slots:
+            return await service.upload(await processor.process(data))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(upload(data) for data in images))
+    return len(images) / (time.perf_counter() - start)
+
+
+async def run(iterations: int, concurrency: int, width: int, height: int) -> None:
+    """
+    Upload the generated images twice and print the throughputs
+
+    Args:
+        iterations (int): The number of images
+        concurrency (int): The number of uploads at once
+        width (int): The width of the images
+        height (int): The height of the images
+    """
+    images = make_images(iterations, (width, height))
+    processor = AvatarProcessor()
+    with tempfile.TemporaryDirectory() as directory:
+        service = UploadFileService(
+            LocalAvatarStorage(directory, "http://localhost:8000/api/avatars"),
+            queue_limit=iterations,
+        )
+        print(f"{'run':<10} {'uploads/s':>12}")
+        for name in ("new", "stored"):
+            rate = await measure(images, processor, service, concurrency)
+            print(f"{name:<10} {rate:>12,.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=1200)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.iterations, args.concurrency, args.width, args.height))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Micro-benchmark of the per-render cost of the HTML page and email templates
+
+Compares a new Jinja environment per render, as fastapi-mail's template
+loader and a new Jinja2Templates per request used to do, with the shared
+precompiled environment, with and without a warm bytecode cache.
+
+Run from the project root:
+
+    python -m benchmarks.template_render [--iterations N]
+"""
+import argparse
+import tempfile
+import time
+from typing import Callable
+from jinja2 import Environment, FileSystemLoader
+
+from app.services.templates import TEMPLATES_DIR, create_environment, precompile_templates
+
+CONTEXTS = {
+    "reset_password.html": {"token": "benchmark_token", "username": "benchmark_user"},
+    "email/verify_email.html": {
+        "host": "http://localhost:8000/",
+        "username": "benchmark_user",
+        "token": "benchmark_token",
+    },
+    "email/reset_password.html": {
+        "host": "http://localhost:8000/",
+        "username": "benchmark_user",
+        "token": "benchmark_token",
+    },
+}
+
+
+def measure(fn: Callable[[], object], iterations: int) -> float:
+    """
+    Measure the mean duration of a function
+
+    Args:
+        fn (Callable[[], object]): The function to call
+        iterations (int): The number of calls
+
+    Returns:
+        float: The microseconds per call
+    """
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def strategies(cache_dir: str) -> dict[str, Callable[[str, dict], str]]:
+    """
+    Build the render function of every strategy
+
+    Args:
+        cache_dir (str): The bytecode cache directory
+
+    Returns:
+        dict: The render functions by strategy name
+    """
+    shared = create_environment(bytecode_cache_dir=cache_dir)
+    precompile_templates(shared)
+    return {
+        "new environment": lambda name, context: Environment(
+            loader=FileSystemLoader(TEMPLATES_DIR), autoescape=True
+        )
+        .get_template(name)
+        .render(context),
+        "new env + bytecode": lambda name, context: create_environment(
+            bytecode_cache_dir=cache_dir
+        )
+        .get_template(name)
+        .render(context),
+        "shared": lambda name, context: shared.get_template(name).render(context),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        renders = strategies(cache_dir)
+        print(f"{'template':<26}" + "".join(f"{name:>20}" for name in renders))
+        for template, context in CONTEXTS.items():
+            row = [
+                measure(lambda render=render: render(template, context), args.iterations)
+                for render in renders.values()
+            ]
+            print(f"{template:<26}" + "".join(f"{us:>17,.1f} us" for us in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,59 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import HTTPException
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi.errors import RateLimitExceeded
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.exceptions.deadline_exceeded_exception import DeadlineExceededException
+from app.exceptions.invalid_image_exception import InvalidImageException
+from app.exceptions.password_hasher_busy_exception import PasswordHasherBusyException
+from app.exceptions.rate_limit_exceeded_exception import RateLimitExceededException
 from app.exceptions.token_decode_exception import TokenDecodeException
+from app.exceptions.upload_busy_exception import UploadBusyException
+from app.exceptions.upload_too_large_exception import UploadTooLargeException
 from app.conf.config import settings
 from app.middlewares.logger import add_process_time_header
 from app.api.utils import router as utils_router
 from app.api.contacts import router as contacts_router
 from app.api.auth import router as auth_router
 from app.api.users import router as users_router
+from app.api.avatars import router as avatars_router
+from app.security.password_hasher import password_hasher
+from app.services.mail import smtp_pool
+from app.services.templates import precompile_templates, template_environment
+from app.services.upcoming_birthday import rebuild_upcoming_birthdays_daily
+from app.services.user import seed_taken_identities
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Calibrate the password hasher, precompile the templates, seed the
+    username and email availability filter, start and stop the application
+    background jobs and close the SMTP connections
+
+    Args:
+        app (FastAPI): The application
+    """
+    if not password_hasher.rounds and settings.PASSWORD_HASH_TARGET_MS:
+        await asyncio.to_thread(password_hasher.calibrate)
+    await asyncio.to_thread(precompile_templates, template_environment)
+    upcoming_birthdays_task = asyncio.create_task(rebuild_upcoming_birthdays_daily())
+    seed_task = asyncio.create_task(seed_taken_identities())
+    yield
+    seed_task.cancel()
+    await smtp_pool.close()
+    upcoming_birthdays_task.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(utils_router, prefix="/api")
 app.include_router(contacts_router, prefix="/api")
 app.include_router(auth_router, prefix="/api")
 app.include_router(users_router, prefix="/api")
+app.include_router(avatars_router, prefix="/api")
 
 app.middleware("http")(add_process_time_header)
 app.add_middleware(
@@ -62,21 +99,141 @@ def handle_token_decode_exception(request: Request, exc: TokenDecodeException):
     )
 
 
-@app.exception_handler(RateLimitExceeded)
-async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
+@app.exception_handler(RateLimitExceededException)
+def handle_rate_limit_exceeded_exception(
+    request: Request, exc: RateLimitExceededException
+):
     """
     Handle rate limit exceeded exception
 
     Args:
         request (Request): The request that caused the rate limit to be exceeded
-        exc (RateLimitExceeded): The exception that was raised
+        exc (RateLimitExceededException): The exception that was raised
+
+    Returns:
+        JSONResponse: The response to the request
+    """
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"error": str(exc.message)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(DeadlineExceededException)
+def handle_deadline_exceeded_exception(
+    request: Request, exc: DeadlineExceededException
+):
+    """
+    Handle deadline exceeded exception
+
+    Args:
+        request (Request): The request that ran past its deadline
+        exc (DeadlineExceededException): The exception that was raised
+
+    Returns:
+        JSONResponse: The response to the request
+    """
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": str(exc.message)},
+    )
+
+
+@app.exception_handler(PoolTimeoutError)
+def handle_pool_timeout_error(request: Request, exc: PoolTimeoutError):
+    """
+    Handle database connection pool timeout
+
+    Args:
+        request (Request): The request that could not get a connection
+        exc (PoolTimeoutError): The exception that was raised
+
+    Returns:
+        JSONResponse: The response to the request
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database is busy, try again later"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(PasswordHasherBusyException)
+def handle_password_hasher_busy_exception(
+    request: Request, exc: PasswordHasherBusyException
+):
+    """
+    Handle password hasher busy exception
+
+    Args:
+        request (Request): The request that could not be hashed
+        exc (PasswordHasherBusyException): The exception that was raised
+
+    Returns:
+        JSONResponse: The response to the request
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc.message)},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(InvalidImageException)
+def handle_invalid_image_exception(request: Request, exc: InvalidImageException):
+    """
+    Handle invalid image exception
+
+    Args:
+        request (Request): The request with the invalid image
+        exc (InvalidImageException): The exception that was raised
+
+    Returns:
+        JSONResponse: The response to the request
+    """
+    return JSONResponse(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        content={"detail": str(exc.message)},
+    )
+
+
+@app.exception_handler(UploadTooLargeException)
+def handle_upload_too_large_exception(
+    request: Request, exc: UploadTooLargeException
+):
+    """
+    Handle upload too large exception
+
+    Args:
+        request (Request): The request with the too large upload
+        exc (UploadTooLargeException): The exception that was raised
+
+    Returns:
+        JSONResponse: The response to the request
+    """
+    return JSONResponse(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        content={"detail": str(exc.message)},
+    )
+
+
+@app.exception_handler(UploadBusyException)
+def handle_upload_busy_exception(request: Request, exc: UploadBusyException):
+    """
+    Handle upload busy exception
+
+    Args:
+        request (Request): The request whose upload was rejected
+        exc (UploadBusyException): The exception that was raised
 
     Returns:
         JSONResponse: The response to the request
     """
     return JSONResponse(
-        status_code=429,
-        content={"error": "Rate limit exceeded"},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc.message)},
+        headers={"Retry-After": "1"},
     )
 
 
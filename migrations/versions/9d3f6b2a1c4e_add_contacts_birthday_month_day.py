@@ -0,0 +1,42 @@
+"""Add contacts birthday_month_day
+
+Revision ID: 9d3f6b2a1c4e
+Revises: 4c57b130615c
+Create Date: 2026-10-19 10:12:31.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f6b2a1c4e'
+down_revision: Union[str, None] = '4c57b130615c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contacts', sa.Column('birthday_month_day', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE contacts "
+        "SET birthday_month_day = "
+        "CAST(EXTRACT(MONTH FROM birthday) AS INTEGER) * 100 "
+        "+ CAST(EXTRACT(DAY FROM birthday) AS INTEGER) "
+        "WHERE birthday IS NOT NULL"
+    )
+    op.create_index(
+        'ix_contacts_user_id_birthday_month_day',
+        'contacts',
+        ['user_id', 'birthday_month_day', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_user_id_birthday_month_day', table_name='contacts')
+    op.drop_column('contacts', 'birthday_month_day')
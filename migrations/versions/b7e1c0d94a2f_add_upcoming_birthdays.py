@@ -0,0 +1,41 @@
+"""Add upcoming_birthdays projection
+
+Revision ID: b7e1c0d94a2f
+Revises: 9d3f6b2a1c4e
+Create Date: 2026-10-19 11:03:47.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e1c0d94a2f'
+down_revision: Union[str, None] = '9d3f6b2a1c4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('upcoming_birthdays',
+    sa.Column('contact_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('sort_key', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('contact_id')
+    )
+    op.create_index(
+        'ix_upcoming_birthdays_user_id_sort_key',
+        'upcoming_birthdays',
+        ['user_id', 'sort_key', 'contact_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_upcoming_birthdays_user_id_sort_key', table_name='upcoming_birthdays')
+    op.drop_table('upcoming_birthdays')
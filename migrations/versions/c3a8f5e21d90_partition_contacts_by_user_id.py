@@ -0,0 +1,176 @@
+"""Partition contacts by user_id
+
+Online migration of ``contacts`` to a table hash-partitioned by ``user_id``.
+It only runs on PostgreSQL and when ``CONTACTS_PARTITIONS`` is set, which
+must match the setting the application runs with.
+
+1. Create ``contacts_partitioned`` with its partitions and indexes.
+2. Mirror every write on ``contacts`` into it with a trigger.
+3. Copy existing rows in batches of ``BATCH_SIZE`` ids, each batch in its
+   own transaction, locking only the rows being copied.
+4. Swap the tables in one short transaction and keep the old table as
+   ``contacts_unpartitioned``, without its foreign key to ``users``, until
+   it is dropped manually.
+
+The downgrade copies the rows back into ``contacts_unpartitioned``, and
+creates it again if it was dropped.
+
+Revision ID: c3a8f5e21d90
+Revises: b7e1c0d94a2f
+Create Date: 2026-10-19 12:26:05.331870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.conf.config import settings
+from app.entity.contact import contacts_partitions_ddl
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8f5e21d90'
+down_revision: Union[str, None] = 'b7e1c0d94a2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+
+COLUMNS = [
+    'first_name',
+    'last_name',
+    'email',
+    'phone',
+    'birthday',
+    'birthday_of_the_year',
+    'birthday_month_day',
+    'additional_info',
+    'created_at',
+    'updated_at',
+]
+
+MIRROR_FUNCTION = """
+CREATE OR REPLACE FUNCTION contacts_mirror_to_partitioned() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM contacts_partitioned WHERE id = OLD.id AND user_id = OLD.user_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO contacts_partitioned SELECT NEW.*
+        ON CONFLICT (id, user_id) DO UPDATE SET {updates};
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+""".format(updates=', '.join(f'{column} = EXCLUDED.{column}' for column in COLUMNS))
+
+
+def _is_enabled() -> bool:
+    return op.get_bind().dialect.name == 'postgresql' and settings.CONTACTS_PARTITIONS > 0
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _is_enabled():
+        return
+
+    op.execute(
+        "CREATE TABLE contacts_partitioned (LIKE contacts INCLUDING DEFAULTS) "
+        "PARTITION BY HASH (user_id)"
+    )
+    op.execute(
+        "ALTER TABLE contacts_partitioned "
+        "ADD CONSTRAINT contacts_partitioned_pkey PRIMARY KEY (id, user_id)"
+    )
+    op.create_foreign_key(
+        'contacts_partitioned_user_id_fkey',
+        'contacts_partitioned',
+        'users',
+        ['user_id'],
+        ['id'],
+    )
+    for statement in contacts_partitions_ddl(
+        settings.CONTACTS_PARTITIONS, table='contacts_partitioned'
+    ):
+        op.execute(statement)
+    op.create_index(
+        'ix_contacts_partitioned_user_id_birthday_month_day',
+        'contacts_partitioned',
+        ['user_id', 'birthday_month_day', 'id'],
+        unique=False,
+    )
+    op.execute(MIRROR_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER contacts_mirror_to_partitioned "
+        "AFTER INSERT OR UPDATE OR DELETE ON contacts "
+        "FOR EACH ROW EXECUTE FUNCTION contacts_mirror_to_partitioned()"
+    )
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        min_id, max_id = bind.execute(
+            sa.text("SELECT min(id), max(id) FROM contacts")
+        ).one()
+        if min_id is not None:
+            for low in range(min_id - 1, max_id, BATCH_SIZE):
+                bind.execute(
+                    sa.text(
+                        "INSERT INTO contacts_partitioned "
+                        "SELECT * FROM contacts WHERE id > :low AND id <= :high "
+                        "FOR KEY SHARE "
+                        "ON CONFLICT (id, user_id) DO NOTHING"
+                    ),
+                    {'low': low, 'high': low + BATCH_SIZE},
+                )
+
+    op.execute("LOCK TABLE contacts IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER contacts_mirror_to_partitioned ON contacts")
+    op.execute("DROP FUNCTION contacts_mirror_to_partitioned()")
+    op.execute("ALTER TABLE contacts RENAME TO contacts_unpartitioned")
+    op.execute("ALTER TABLE contacts_unpartitioned RENAME CONSTRAINT contacts_pkey TO contacts_unpartitioned_pkey")
+    op.execute("ALTER TABLE contacts_unpartitioned DROP CONSTRAINT contacts_user_id_fkey")
+    op.execute("ALTER INDEX ix_contacts_user_id_birthday_month_day RENAME TO ix_contacts_unpartitioned_user_id_birthday_month_day")
+    op.execute("ALTER TABLE contacts_partitioned RENAME TO contacts")
+    op.execute("ALTER TABLE contacts RENAME CONSTRAINT contacts_partitioned_pkey TO contacts_pkey")
+    op.execute("ALTER TABLE contacts RENAME CONSTRAINT contacts_partitioned_user_id_fkey TO contacts_user_id_fkey")
+    op.execute("ALTER INDEX ix_contacts_partitioned_user_id_birthday_month_day RENAME TO ix_contacts_user_id_birthday_month_day")
+    for remainder in range(settings.CONTACTS_PARTITIONS):
+        op.execute(f"ALTER TABLE contacts_partitioned_p{remainder} RENAME TO contacts_p{remainder}")
+    op.execute("ALTER SEQUENCE contacts_id_seq OWNED BY contacts.id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _is_enabled():
+        return
+
+    op.execute("LOCK TABLE contacts IN ACCESS EXCLUSIVE MODE")
+    bind = op.get_bind()
+    if bind.execute(sa.text("SELECT to_regclass('contacts_unpartitioned')")).scalar() is None:
+        op.execute("CREATE TABLE contacts_unpartitioned (LIKE contacts INCLUDING DEFAULTS)")
+        op.execute(
+            "ALTER TABLE contacts_unpartitioned "
+            "ADD CONSTRAINT contacts_unpartitioned_pkey PRIMARY KEY (id)"
+        )
+        op.create_index(
+            'ix_contacts_unpartitioned_user_id_birthday_month_day',
+            'contacts_unpartitioned',
+            ['user_id', 'birthday_month_day', 'id'],
+            unique=False,
+        )
+    op.execute("TRUNCATE contacts_unpartitioned")
+    op.execute("INSERT INTO contacts_unpartitioned SELECT * FROM contacts")
+    op.execute("ALTER SEQUENCE contacts_id_seq OWNED BY contacts_unpartitioned.id")
+    op.execute("DROP TABLE contacts")
+    op.execute("ALTER TABLE contacts_unpartitioned RENAME TO contacts")
+    op.execute("ALTER TABLE contacts RENAME CONSTRAINT contacts_unpartitioned_pkey TO contacts_pkey")
+    op.execute("ALTER INDEX ix_contacts_unpartitioned_user_id_birthday_month_day RENAME TO ix_contacts_user_id_birthday_month_day")
+    op.execute("ALTER TABLE contacts DROP CONSTRAINT IF EXISTS contacts_user_id_fkey")
+    op.create_foreign_key(
+        'contacts_user_id_fkey',
+        'contacts',
+        'users',
+        ['user_id'],
+        ['id'],
+    )
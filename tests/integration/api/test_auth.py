@@ -1,12 +1,21 @@
-from unittest.mock import Mock, patch
+from functools import partial
+from io import BytesIO
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from PIL import Image
 from sqlalchemy import select
 
 from app.security.token_encoder import token_encoder
 from app.services.auth import auth_service
-from app.security.password_hasher import password_hasher
+from app.security.rate_limiter import rate_limiter
+from app.security.password_hasher import PasswordHasher, password_hasher
+from app.conf.config import settings
 from app.entity.bootstrap import User
+from app.database.redis import redis_client
+from app.services.avatar_storage import LocalAvatarStorage
+from app.services.upload_stream import StreamedUpload
+from app.services.user import seed_taken_identities, taken_identities
 from tests.integration.conftest import TestingSessionLocal, test_admin_user, test_user
 
 
@@ -47,7 +56,7 @@ from tests.integration.conftest import TestingSessionLocal, test_admin_user, tes
 )
 def test_signup(client, monkeypatch, user_data, response_data):
     mock_send_email = Mock()
-    monkeypatch.setattr("app.services.mail.mail_service.send_email", mock_send_email)
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
     response = client.post("api/auth/register", json=user_data)
     data = response.json()
 
@@ -95,7 +104,9 @@ def test_signup(client, monkeypatch, user_data, response_data):
 )
 def test_signup_existing(client, monkeypatch, user_data, response_data):
     mock_send_email = Mock()
-    monkeypatch.setattr("app.services.mail.mail_service.send_email", mock_send_email)
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
+    mock_hash = AsyncMock()
+    monkeypatch.setattr("app.services.user.password_hasher.hash", mock_hash)
     response = client.post("api/auth/register", json=user_data)
     data = response.json()
 
@@ -104,6 +115,7 @@ def test_signup_existing(client, monkeypatch, user_data, response_data):
         assert data[key] == value
 
     assert "password" not in data
+    mock_hash.assert_not_awaited()
 
 
 @pytest.mark.parametrize(
@@ -188,7 +200,7 @@ def test_signup_existing(client, monkeypatch, user_data, response_data):
 )
 def test_signup_validator(client, monkeypatch, user_data, response_code, violations: list):
     mock_send_email = Mock()
-    monkeypatch.setattr("app.services.mail.mail_service.send_email", mock_send_email)
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
     response = client.post("api/auth/register", json=user_data)
     data = response.json()
 
@@ -221,13 +233,19 @@ def test_me_unauthorized(client, monkeypatch):
     assert data["detail"] == "Not authenticated"
 
 
+def make_avatar(color: str = "red") -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (400, 300), color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
 @patch("app.services.upload_file.UploadFileService.upload_file")
 def test_update_avatar_user(mock_upload_file, client, get_admin_token):
     fake_url = "<http://example.com/avatar.jpg>"
     mock_upload_file.return_value = fake_url
     headers = {"Authorization": f"Bearer {get_admin_token}"}
 
-    file_data = {"file": ("avatar.jpg", b"fake image content", "image/jpeg")}
+    file_data = {"file": ("avatar.jpg", make_avatar(), "image/jpeg")}
     response = client.patch("/api/users/avatar", headers=headers, files=file_data)
 
     assert response.status_code == 200, response.text
@@ -239,6 +257,149 @@ def test_update_avatar_user(mock_upload_file, client, get_admin_token):
     assert data["role"] == "ADMIN"
 
     mock_upload_file.assert_called_once()
+    image = mock_upload_file.call_args[0][0]
+    assert image.content_type == "image/webp"
+
+
+@patch("app.services.upload_file.UploadFileService.upload_file")
+def test_update_avatar_same_image_not_uploaded(
+    mock_upload_file, client, get_admin_token
+):
+    mock_upload_file.side_effect = (
+        lambda image, timeout: f"http://example.com/{image.digest}"
+    )
+    headers = {"Authorization": f"Bearer {get_admin_token}"}
+    file_data = {"file": ("avatar.jpg", make_avatar(), "image/jpeg")}
+
+    first = client.patch("/api/users/avatar", headers=headers, files=file_data)
+    second = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert first.status_code == 200, first.text
+    assert second.status_code == 200, second.text
+    assert second.json()["avatar"] == first.json()["avatar"]
+    mock_upload_file.assert_called_once()
+
+
+@patch("app.services.upload_file.UploadFileService.upload_file")
+def test_update_avatar_not_an_image(mock_upload_file, client, get_admin_token):
+    headers = {"Authorization": f"Bearer {get_admin_token}"}
+
+    file_data = {"file": ("avatar.jpg", b"fake image content", "image/jpeg")}
+    response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert response.status_code == 415, response.text
+    assert response.json()["detail"] == "File is not a supported image"
+    mock_upload_file.assert_not_called()
+
+
+def test_update_avatar_too_large(client, get_admin_token, monkeypatch):
+    monkeypatch.setattr(
+        "app.api.users.StreamedUpload", partial(StreamedUpload, max_bytes=1000)
+    )
+    headers = {"Authorization": f"Bearer {get_admin_token}"}
+
+    file_data = {"file": ("avatar.jpg", b"a" * 100_000, "image/jpeg")}
+    response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert response.status_code == 413, response.text
+    assert response.json()["detail"] == "File is too large"
+
+
+def test_update_avatar_missing_file(client, get_admin_token):
+    headers = {"Authorization": f"Bearer {get_admin_token}"}
+
+    response = client.patch(
+        "/api/users/avatar", headers=headers, files={"other": ("a.txt", b"a")}
+    )
+
+    assert response.status_code == 422, response.text
+    assert response.json()["detail"] == "Missing file field"
+
+
+@patch("app.services.upload_file.UploadFileService.upload_file")
+def test_update_avatar_recent_upload_not_processed(
+    mock_upload_file, client, get_admin_token, monkeypatch
+):
+    mock_upload_file.side_effect = (
+        lambda image, timeout: f"http://example.com/{image.digest}"
+    )
+    headers = {"Authorization": f"Bearer {get_admin_token}"}
+    client.patch(
+        "/api/users/avatar",
+        headers=headers,
+        files={"file": ("avatar.jpg", make_avatar(), "image/jpeg")},
+    )
+    first = client.patch(
+        "/api/users/avatar",
+        headers=headers,
+        files={"file": ("avatar.jpg", make_avatar("blue"), "image/jpeg")},
+    )
+    mock_process = AsyncMock()
+    monkeypatch.setattr("app.services.user.avatar_processor.process", mock_process)
+
+    second = client.patch(
+        "/api/users/avatar",
+        headers=headers,
+        files={"file": ("avatar.jpg", make_avatar(), "image/jpeg")},
+    )
+
+    assert first.status_code == 200, first.text
+    assert second.status_code == 200, second.text
+    assert second.json()["avatar"] != first.json()["avatar"]
+    mock_process.assert_not_awaited()
+    assert mock_upload_file.call_count == 2
+
+
+@patch("app.services.upload_file.UploadFileService.upload_file")
+def test_update_avatar_recent_upload_processed_after_settings_change(
+    mock_upload_file, client, get_admin_token, monkeypatch
+):
+    mock_upload_file.side_effect = (
+        lambda image, timeout: f"http://example.com/{image.digest}"
+    )
+    headers = {"Authorization": f"Bearer {get_admin_token}"}
+    file_data = {"file": ("avatar.jpg", make_avatar("green"), "image/jpeg")}
+
+    first = client.patch("/api/users/avatar", headers=headers, files=file_data)
+    monkeypatch.setattr("app.services.user.avatar_processor.size", 100)
+    second = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert first.status_code == 200, first.text
+    assert second.status_code == 200, second.text
+    assert second.json()["avatar"] != first.json()["avatar"]
+    assert mock_upload_file.call_count == 2
+
+
+def test_update_avatar_local_storage(client, get_admin_token, tmp_path, monkeypatch):
+    storage = LocalAvatarStorage(tmp_path, "http://testserver/api/avatars")
+    monkeypatch.setattr("app.services.user.upload_file_service.storage", storage)
+    monkeypatch.setattr("app.api.avatars.avatar_storage", storage)
+    headers = {"Authorization": f"Bearer {get_admin_token}"}
+
+    file_data = {"file": ("avatar.jpg", make_avatar(), "image/jpeg")}
+    response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert response.status_code == 200, response.text
+    avatar_url = response.json()["avatar"]
+    assert avatar_url.startswith("http://testserver/api/avatars/")
+
+    response = client.get(avatar_url)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "image/webp"
+    assert "immutable" in response.headers["cache-control"]
+    assert "max-age=31536000" in response.headers["cache-control"]
+    assert Image.open(BytesIO(response.content)).size == (250, 250)
+
+
+def test_get_avatar_not_found(client, tmp_path, monkeypatch):
+    storage = LocalAvatarStorage(tmp_path, "http://testserver/api/avatars")
+    monkeypatch.setattr("app.api.avatars.avatar_storage", storage)
+
+    response = client.get(f"/api/avatars/{'0' * 64}.webp")
+    assert response.status_code == 404, response.text
+
+    response = client.get("/api/avatars/..%2F.env")
+    assert response.status_code == 404, response.text
 
 
 def test_login(client):
@@ -256,6 +417,32 @@ def test_login(client):
     assert data["token_type"] == "bearer"
 
 
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_password(client, monkeypatch):
+    argon2_hasher = PasswordHasher(scheme="argon2", rounds=1)
+    monkeypatch.setattr(password_hasher, "pwd_context", argon2_hasher.pwd_context)
+    monkeypatch.setattr("app.services.user.sessionmanager.session", TestingSessionLocal)
+    rate_limiter.reset()
+
+    response = client.post(
+        "api/auth/login",
+        data={
+            "username": test_user.get("username"),
+            "password": test_user.get("password"),
+        },
+    )
+
+    assert response.status_code == 200, response.text
+    async with TestingSessionLocal() as session:
+        user = (
+            await session.execute(
+                select(User).where(User.username == test_user.get("username"))
+            )
+        ).scalar_one()
+    assert user.password.startswith("$argon2")
+    assert password_hasher.verify_password(test_user.get("password"), user.password)
+
+
 @pytest.mark.parametrize(
     "username, password, response_data",
     [
@@ -289,17 +476,7 @@ def test_wrong_credentials_login(client, username, password, response_data):
     assert data["detail"] == response_data["detail"]
 
 
-@pytest.mark.asyncio
-async def test_refresh_token(client, get_refresh_token):
-    async with TestingSessionLocal() as session:
-        current_user = await session.execute(
-            select(User).where(User.email == test_user.get("email"))
-        )
-        current_user = current_user.scalar_one_or_none()
-        if current_user:
-            current_user.refresh_token = get_refresh_token
-            await session.commit()
-
+def test_refresh_token(client, get_refresh_token):
     response = client.post(
         "api/auth/refresh_token",
         json={"refresh_token": get_refresh_token},
@@ -308,7 +485,110 @@ async def test_refresh_token(client, get_refresh_token):
     data = response.json()
     assert "access_token" in data
     assert data["token_type"] == "bearer"
-    assert data["refresh_token"] == get_refresh_token
+    assert data["refresh_token"] != get_refresh_token
+
+    response = client.post(
+        "api/auth/refresh_token",
+        json={"refresh_token": data["refresh_token"]},
+    )
+    assert response.status_code == 200, response.text
+
+
+def test_refresh_token_reuse_revokes_family(client, get_refresh_token):
+    response = client.post(
+        "api/auth/refresh_token",
+        json={"refresh_token": get_refresh_token},
+    )
+    rotated_refresh_token = response.json()["refresh_token"]
+
+    response = client.post(
+        "api/auth/refresh_token",
+        json={"refresh_token": get_refresh_token},
+    )
+    assert response.status_code == 400, response.text
+    assert response.json() == {"detail": "Invalid refresh token"}
+
+    response = client.post(
+        "api/auth/refresh_token",
+        json={"refresh_token": rotated_refresh_token},
+    )
+    assert response.status_code == 400, response.text
+
+
+@pytest.mark.asyncio
+async def test_login_does_not_write_refresh_token(client):
+    rate_limiter.reset()
+    response = client.post(
+        "api/auth/login",
+        data={
+            "username": test_user.get("username"),
+            "password": test_user.get("password"),
+        },
+    )
+    assert response.status_code == 200, response.text
+
+    async with TestingSessionLocal() as session:
+        user = (
+            await session.execute(
+                select(User).where(User.username == test_user.get("username"))
+            )
+        ).scalar_one()
+    assert user.refresh_token is None
+
+    response = client.post(
+        "api/auth/refresh_token",
+        json={"refresh_token": response.json()["refresh_token"]},
+    )
+    assert response.status_code == 200, response.text
+
+
+def test_logout(client, get_claims_token, get_refresh_token):
+    headers = {"Authorization": f"Bearer {get_claims_token}"}
+    response = client.get("/api/contacts", headers=headers)
+    assert response.status_code == 200, response.text
+
+    response = client.post(
+        "api/auth/logout",
+        headers=headers,
+        json={"refresh_token": get_refresh_token},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == {"message": "Logged out successfully"}
+
+    response = client.get("/api/contacts", headers=headers)
+    assert response.status_code == 400, response.text
+    assert response.json() == {"detail": "Token is invalid"}
+
+    response = client.post(
+        "api/auth/refresh_token",
+        json={"refresh_token": get_refresh_token},
+    )
+    assert response.status_code == 400, response.text
+
+
+@pytest.mark.asyncio
+async def test_logout_with_refresh_token_of_another_user(client, get_claims_token):
+    other_refresh_token = await auth_service.create_refresh_token(
+        User(id=2, username=test_admin_user["username"])
+    )
+    headers = {"Authorization": f"Bearer {get_claims_token}"}
+
+    response = client.post(
+        "api/auth/logout",
+        headers=headers,
+        json={"refresh_token": other_refresh_token},
+    )
+    assert response.status_code == 400, response.text
+
+    response = client.get("/api/contacts", headers=headers)
+    assert response.status_code == 200, response.text
+    assert await token_encoder.decode_token(other_refresh_token)
+
+
+def test_logout_unauthorized(client):
+    response = client.post("api/auth/logout")
+
+    assert response.status_code == 401, response.text
 
 
 def test_refresh_token_invalid(client):
@@ -429,7 +709,7 @@ async def test_resend_verification_email(client, monkeypatch):
             await session.commit()
 
     mock_send_email = Mock()
-    monkeypatch.setattr("app.services.mail.mail_service.send_email", mock_send_email)
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
 
     response = client.post(
         "api/auth/resend_verification_email",
@@ -461,7 +741,7 @@ async def test_resend_verification_email_on_confirmed_user(client, monkeypatch):
             await session.commit()
 
     mock_send_email = Mock()
-    monkeypatch.setattr("app.services.mail.mail_service.send_email", mock_send_email)
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
 
     response = client.post(
         "api/auth/resend_verification_email",
@@ -477,7 +757,7 @@ async def test_resend_verification_email_on_confirmed_user(client, monkeypatch):
 
 def test_resend_verification_email_on_unregistered_user(client, monkeypatch):
     mock_send_email = Mock()
-    monkeypatch.setattr("app.services.mail.mail_service.send_email", mock_send_email)
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
 
     response = client.post(
         "api/auth/resend_verification_email",
@@ -493,7 +773,7 @@ def test_resend_verification_email_on_unregistered_user(client, monkeypatch):
 
 def test_request_password_reset(client, monkeypatch):
     mock_send_email = Mock()
-    monkeypatch.setattr("app.services.mail.mail_service.send_email", mock_send_email)
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
 
     response = client.post(
         "/api/auth/request_password_reset",
@@ -515,7 +795,7 @@ def test_request_password_reset(client, monkeypatch):
 
 def test_request_password_reset_on_unregistered_user(client, monkeypatch):
     mock_send_email = Mock()
-    monkeypatch.setattr("app.services.mail.mail_service.send_email", mock_send_email)
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
 
     response = client.post(
         "api/auth/request_password_reset",
@@ -529,6 +809,96 @@ def test_request_password_reset_on_unregistered_user(client, monkeypatch):
     assert data["message"] == "Password reset requested successfully"
 
 
+@pytest.mark.asyncio
+async def test_resend_verification_email_coalesced(client, monkeypatch):
+    async with TestingSessionLocal() as session:
+        current_user = (
+            await session.execute(
+                select(User).where(User.email == test_user.get("email"))
+            )
+        ).scalar_one()
+        current_user.email_verified = False
+        await session.commit()
+
+    mock_send_email = Mock()
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
+
+    for _ in range(3):
+        response = client.post(
+            "api/auth/resend_verification_email",
+            json={"email": test_user.get("email")},
+        )
+        assert response.status_code == 200, response.text
+        assert response.json()["message"] == "Verification email sent"
+
+    mock_send_email.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_request_password_reset_coalesced(client, monkeypatch):
+    mock_send_email = Mock()
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
+
+    for _ in range(2):
+        response = client.post(
+            "/api/auth/request_password_reset",
+            json={"email": test_user.get("email")},
+        )
+        assert response.status_code == 200, response.text
+
+    mock_send_email.assert_called_once()
+    async with TestingSessionLocal() as session:
+        user = (
+            await session.execute(
+                select(User).where(User.email == test_user.get("email"))
+            )
+        ).scalar_one()
+    assert user.password_reset_token == mock_send_email.call_args[0][0].data["token"]
+
+
+@pytest.mark.asyncio
+async def test_resend_verification_email_not_coalesced_after_failure(
+    client, monkeypatch
+):
+    async with TestingSessionLocal() as session:
+        current_user = (
+            await session.execute(
+                select(User).where(User.email == test_user.get("email"))
+            )
+        ).scalar_one()
+        current_user.email_verified = False
+        await session.commit()
+
+    mock_send_email = Mock(side_effect=[None, "1-0"])
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
+
+    for _ in range(2):
+        response = client.post(
+            "api/auth/resend_verification_email",
+            json={"email": test_user.get("email")},
+        )
+        assert response.status_code == 200, response.text
+
+    assert mock_send_email.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_request_password_reset_not_coalesced_after_failure(
+    client, monkeypatch
+):
+    mock_send_email = Mock(side_effect=[None, "1-0"])
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
+
+    for _ in range(2):
+        response = client.post(
+            "/api/auth/request_password_reset",
+            json={"email": test_user.get("email")},
+        )
+        assert response.status_code == 200, response.text
+
+    assert mock_send_email.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_password_reset(client):
     password_reset_token = await auth_service.create_password_reset_token(
@@ -564,6 +934,37 @@ async def test_password_reset(client):
             assert user.password_reset_token is None
 
 
+@pytest.mark.asyncio
+async def test_password_reset_revokes_refresh_tokens(client, get_refresh_token):
+    password_reset_token = await auth_service.create_password_reset_token(
+        User(email=test_user.get("email"))
+    )
+    async with TestingSessionLocal() as session:
+        current_user = (
+            await session.execute(
+                select(User).where(User.email == test_user.get("email"))
+            )
+        ).scalar_one()
+        current_user.password_reset_token = password_reset_token
+        await session.commit()
+    rate_limiter.reset()
+
+    response = client.post(
+        "api/auth/password_reset",
+        json={
+            "password": "new_user_password",
+            "password_reset_token": password_reset_token,
+        },
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.post(
+        "api/auth/refresh_token",
+        json={"refresh_token": get_refresh_token},
+    )
+    assert response.status_code == 400, response.text
+
+
 def test_password_reset_on_invalid_token(client):
     response = client.post(
         "api/auth/password_reset",
@@ -613,3 +1014,126 @@ def test_password_reset_form_on_invalid_token(client):
     assert response.status_code == 400, response.text
     data = response.json()
     assert data["detail"] == "Token is invalid"
+
+
+@pytest.fixture
+def unseeded_taken_identities():
+    redis_client.delete(taken_identities.key, taken_identities.ready_key)
+    yield
+    redis_client.delete(taken_identities.key, taken_identities.ready_key)
+
+
+def test_availability_before_seeding(client, unseeded_taken_identities):
+    rate_limiter.reset()
+    response = client.get(
+        "api/auth/availability",
+        params={"username": test_user["username"], "email": "free@example.com"},
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"username_available": False, "email_available": True}
+
+
+@pytest.mark.asyncio
+async def test_availability_from_filter(
+    client, monkeypatch, unseeded_taken_identities
+):
+    monkeypatch.setattr("app.services.user.sessionmanager.session", TestingSessionLocal)
+    await seed_taken_identities()
+    rate_limiter.reset()
+
+    with patch(
+        "app.repository.user.UserRepository.get_by_username", new_callable=AsyncMock
+    ) as mock_get_by_username:
+        response = client.get("api/auth/availability", params={"username": "free"})
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"username_available": True, "email_available": None}
+    mock_get_by_username.assert_not_awaited()
+
+    response = client.get(
+        "api/auth/availability", params={"email": test_admin_user["email"]}
+    )
+    assert response.json() == {"username_available": None, "email_available": False}
+
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", Mock())
+    response = client.post(
+        "api/auth/register",
+        json={
+            "username": "free",
+            "email": "free@example.com",
+            "password": "stringst",
+        },
+    )
+    assert response.status_code == 201, response.text
+
+    response = client.get("api/auth/availability", params={"username": "free"})
+    assert response.json() == {"username_available": False, "email_available": None}
+
+
+@pytest.mark.asyncio
+async def test_availability_after_filter_add_failed(
+    client, monkeypatch, unseeded_taken_identities
+):
+    monkeypatch.setattr("app.services.user.sessionmanager.session", TestingSessionLocal)
+    await seed_taken_identities()
+    rate_limiter.reset()
+    monkeypatch.setattr(
+        "app.services.user.taken_identities.add",
+        Mock(side_effect=ConnectionError("Redis is down")),
+    )
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", Mock())
+
+    response = client.post(
+        "api/auth/register",
+        json={
+            "username": "unmarked",
+            "email": "unmarked@example.com",
+            "password": "stringst",
+        },
+    )
+    assert response.status_code == 201, response.text
+    assert not taken_identities.is_seeded()
+
+    response = client.get("api/auth/availability", params={"username": "unmarked"})
+    assert response.json() == {"username_available": False, "email_available": None}
+
+
+def test_rate_limit(client, monkeypatch):
+    monkeypatch.setitem(settings.RATE_LIMITS, "availability", "2/minute")
+
+    for _ in range(2):
+        response = client.get("api/auth/availability", params={"username": "free"})
+        assert response.status_code == 200, response.text
+
+    response = client.get("api/auth/availability", params={"username": "free"})
+    assert response.status_code == 429, response.text
+    assert response.json() == {"error": "Rate limit exceeded"}
+    assert 1 <= int(response.headers["Retry-After"]) <= 60
+
+
+def test_rate_limit_by_user(client, monkeypatch, get_token, get_admin_token):
+    monkeypatch.setitem(settings.RATE_LIMITS, "get_me", "1/minute")
+
+    for token in (get_token, get_admin_token):
+        response = client.get(
+            "api/auth/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200, response.text
+
+    response = client.get(
+        "api/auth/me", headers={"Authorization": f"Bearer {get_token}"}
+    )
+    assert response.status_code == 429, response.text
+
+
+def test_rate_limit_lease_mode(client, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_MODE", "lease")
+    monkeypatch.setitem(settings.RATE_LIMITS, "availability", "20/minute")
+
+    for _ in range(20):
+        response = client.get("api/auth/availability", params={"username": "free"})
+        assert response.status_code == 200, response.text
+
+    response = client.get("api/auth/availability", params={"username": "free"})
+    assert response.status_code == 429, response.text
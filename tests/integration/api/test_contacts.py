@@ -1,5 +1,12 @@
+import asyncio
+from datetime import datetime, timedelta
+
 import pytest
-from tests.integration.conftest import test_contacts
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.constant_bag.redis import RedisKey
+from app.database.redis import invalidate
+from app.repository.user import UserRepository
+from tests.integration.conftest import TestingSessionLocal, test_contacts
 
 violation_cases = [
     pytest.param(
@@ -284,6 +291,54 @@ def test_get_closest_birthday(client, get_token):
     assert data[0]["birthday"] == test_contacts[3]["birthday"].isoformat()
 
 
+def test_get_closest_birthday_ordered_by_distance(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    for days, email in [(5, "five.days@example.com"), (1, "one.day@example.com")]:
+        birthday = datetime.now() + timedelta(days=days)
+        response = client.post(
+            "api/contacts",
+            headers=headers,
+            json={
+                "first_name": "Birthday",
+                "last_name": "Soon",
+                "email": email,
+                "birthday": datetime(1992, birthday.month, birthday.day).isoformat(),
+            },
+        )
+        assert response.status_code == 201, response.text
+
+    response = client.get("api/contacts/closest-birthday", headers=headers)
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert [contact["email"] for contact in data] == [
+        "one.day@example.com",
+        test_contacts[3]["email"],
+        "five.days@example.com",
+    ]
+
+
+def test_get_closest_birthday_after_update_and_delete(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    birthday = datetime.now() + timedelta(days=2)
+    response = client.put(
+        "api/contacts/1",
+        headers=headers,
+        json={"birthday": datetime(1992, birthday.month, birthday.day).isoformat()},
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.get("api/contacts/closest-birthday", headers=headers)
+    assert response.status_code == 200, response.text
+    assert [contact["id"] for contact in response.json()] == [1, 4]
+
+    response = client.delete("api/contacts/4", headers=headers)
+    assert response.status_code == 204, response.text
+
+    response = client.get("api/contacts/closest-birthday", headers=headers)
+    assert response.status_code == 200, response.text
+    assert [contact["id"] for contact in response.json()] == [1]
+
+
 def test_get_closest_birthday_unauthorized(client):
     response = client.get("api/contacts/closest-birthday")
     assert response.status_code == 401, response.text
@@ -425,3 +480,103 @@ def test_delete_contact_unauthorized(client):
     assert response.status_code == 401, response.text
     data = response.json()
     assert data["detail"] == "Not authenticated"
+
+
+def test_query_contacts_deadline_exceeded(client, get_token, monkeypatch):
+    async def slow_query(*args, **kwargs):
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr("app.conf.config.settings.REQUEST_DEADLINES", {"contacts": 0.05})
+    monkeypatch.setattr("app.services.contact.ContactService.query", slow_query)
+
+    response = client.get(
+        "/api/contacts", headers={"Authorization": f"Bearer {get_token}"}
+    )
+
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Request deadline exceeded"}
+
+
+def test_query_contacts_pool_timeout(client, get_token, monkeypatch):
+    async def busy_query(*args, **kwargs):
+        raise PoolTimeoutError("QueuePool limit reached")
+
+    monkeypatch.setattr("app.services.contact.ContactService.query", busy_query)
+
+    response = client.get(
+        "/api/contacts", headers={"Authorization": f"Bearer {get_token}"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_get_contacts_stats(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.get("/api/contacts/stats", headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == len(test_contacts)
+    assert data["without_birthday"] == 0
+    assert data["recently_added"] == len(test_contacts)
+    assert sum(data["by_birth_month"].values()) == len(test_contacts)
+    assert data["by_birth_month"]["1"] >= 1
+    assert data["by_birth_month"]["2"] >= 1
+    assert data["by_birth_month"]["3"] >= 1
+
+
+def test_get_contacts_stats_invalidated_on_create(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    client.get("/api/contacts/stats", headers=headers)
+
+    response = client.post(
+        "/api/contacts",
+        headers=headers,
+        json={
+            "first_name": "Stats",
+            "last_name": "Contact",
+            "email": "stats.contact@example.com",
+            "phone": "+1234567899",
+            "birthday": "1990-12-24T00:00:00",
+        },
+    )
+    assert response.status_code == 201
+
+    response = client.get("/api/contacts/stats", headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == len(test_contacts) + 1
+    assert data["by_birth_month"]["12"] >= 1
+
+
+def test_query_contacts_with_claims_token(client, get_claims_token, monkeypatch):
+    async def get_by_username(*args, **kwargs):
+        raise AssertionError("User should not be loaded")
+
+    monkeypatch.setattr(
+        "app.repository.user.UserRepository.get_by_username", get_by_username
+    )
+
+    response = client.get(
+        "/api/contacts", headers={"Authorization": f"Bearer {get_claims_token}"}
+    )
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == len(test_contacts)
+
+
+@pytest.mark.asyncio
+async def test_query_contacts_with_revoked_token(client, get_claims_token):
+    async with TestingSessionLocal() as session:
+        await UserRepository(session).increment_token_version(1)
+    await invalidate(RedisKey.AUTH_TOKEN_VERSION.format(user_id=1))
+
+    response = client.get(
+        "/api/contacts", headers={"Authorization": f"Bearer {get_claims_token}"}
+    )
+
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Could not validate credentials"}
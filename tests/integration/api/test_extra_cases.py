@@ -1,10 +1,15 @@
 from unittest.mock import Mock
 import pytest
+from app.constant_bag.redis import RedisKey
+from app.database.redis import redis_client
+from app.security.login_admission import login_admission
+from app.security.rate_limiter import rate_limiter
+from app.exceptions.password_hasher_busy_exception import PasswordHasherBusyException
 
 
 def test_signup_with_empty_email(client, monkeypatch):
     mock_send_email = Mock()
-    monkeypatch.setattr("app.services.mail.mail_service.send_email", mock_send_email)
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
 
     user_data = {
         "username": "user_empty_email",
@@ -27,7 +32,7 @@ def test_signup_with_empty_email(client, monkeypatch):
 
 def test_resend_verification_email_empty(client, monkeypatch):
     mock_send_email = Mock()
-    monkeypatch.setattr("app.services.mail.mail_service.send_email", mock_send_email)
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
 
     response = client.post(
         "api/auth/resend_verification_email",
@@ -57,7 +62,7 @@ def test_login_with_empty_fields(client):
 
 def test_request_password_reset_empty_email(client, monkeypatch):
     mock_send_email = Mock()
-    monkeypatch.setattr("app.services.mail.mail_service.send_email", mock_send_email)
+    monkeypatch.setattr("app.services.user.mail_queue.enqueue", mock_send_email)
 
     response = client.post(
         "/api/auth/request_password_reset",
@@ -91,3 +96,47 @@ def test_request_password_reset_for_unregistered_email(client):
     assert response.status_code == 404
 
     
+
+
+def test_metrics(client):
+    response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["password_hasher"]["queued"] == 0
+    assert data["password_hasher"]["rejected"] == 0
+    assert data["login_admission"]["in_flight"] == 0
+
+
+def test_login_rejected_when_password_hasher_busy(client, monkeypatch):
+    async def busy_verify(*args, **kwargs):
+        raise PasswordHasherBusyException("Too many pending password hashes")
+
+    monkeypatch.setattr(
+        "app.security.password_hasher.password_hasher.verify", busy_verify
+    )
+    rate_limiter.reset()
+
+    response = client.post(
+        "api/auth/login",
+        data={"username": "test", "password": "testtest"},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_throttled_when_only_reserved_slots_left(client, monkeypatch):
+    monkeypatch.setattr(
+        login_admission, "_in_flight", login_admission.max_in_flight - 1
+    )
+    redis_client.delete(RedisKey.AUTH_RECENT_LOGIN.format(username="test"))
+    rate_limiter.reset()
+
+    response = client.post(
+        "api/auth/login",
+        data={"username": "test", "password": "testtest"},
+    )
+
+    assert response.status_code == 429, response.text
+    assert response.headers["Retry-After"] == "1"
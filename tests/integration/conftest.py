@@ -8,12 +8,20 @@ from sqlalchemy import select
 from sqlalchemy.pool import StaticPool
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
+from app.constant_bag.redis import RedisKey
+from app.database.redis import redis_client
 from app.enum.user_role import UserRole
 from main import app
 from app.entity.bootstrap import Base, User, Contact
 from app.database.db import get_db
 from app.services.auth import auth_service
 from app.security.password_hasher import password_hasher
+from app.security.rate_limiter import rate_limiter
+from app.services.mail_coalescer import mail_coalescer
+from app.repository.upcoming_birthday import UpcomingBirthdayRepository
+from app.services.upcoming_birthday import UpcomingBirthdayService
+from app.services.contact import ContactService
+from app.services.user import UserService
 
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
@@ -124,8 +132,20 @@ def init_models_wrap():
             session.add(current_user)
             session.add(admin_user)
             await session.commit()
+            await UpcomingBirthdayService(UpcomingBirthdayRepository(session)).rebuild()
+            for user in (current_user, admin_user):
+                await ContactService.invalidate_stats(user.id)
+                await UserService.invalidate_user_cache(user)
 
     asyncio.run(init_models())
+    rate_limiter.reset()
+    mail_coalescer.reset()
+    for key in redis_client.scan_iter(
+        RedisKey.AVATAR_UPLOAD.format(
+            storage="*", format="*", size="*", quality="*", digest="*"
+        )
+    ):
+        redis_client.delete(key)
 
 
 @pytest.fixture(scope="function")
@@ -149,9 +169,21 @@ async def get_token():
     return token
 
 
+@pytest_asyncio.fixture()
+async def get_claims_token():
+    user = User(
+        id=1,
+        username=test_user["username"],
+        role=test_user["role"],
+        token_version=0,
+    )
+    token = await auth_service.create_access_token(user)
+    return token
+
+
 @pytest_asyncio.fixture()
 async def get_refresh_token():
-    user = User(username=test_user["username"])
+    user = User(id=1, username=test_user["username"])
     token = await auth_service.create_refresh_token(user)
     return token
 
@@ -0,0 +1,97 @@
+import os
+import re
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.entity.bootstrap import Contact
+from app.entity.contact import contacts_partitions_ddl
+from app.repository.contact import ContactRepository
+from app.schemas.contact import ContactQuery
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+PARTITIONS = 4
+
+pytestmark = pytest.mark.skipif(
+    not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"
+)
+
+CONTACTS_DDL = """
+CREATE TABLE contacts (
+    id SERIAL NOT NULL,
+    user_id INTEGER NOT NULL,
+    first_name VARCHAR NOT NULL,
+    last_name VARCHAR NOT NULL,
+    email VARCHAR NOT NULL,
+    phone VARCHAR NOT NULL,
+    birthday DATE,
+    birthday_of_the_year INTEGER,
+    birthday_month_day INTEGER,
+    additional_info VARCHAR,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id, user_id)
+) PARTITION BY HASH (user_id)
+"""
+
+CONTACTS_INDEX_DDL = """
+CREATE INDEX ix_contacts_user_id_birthday_month_day
+ON contacts (user_id, birthday_month_day, id)
+"""
+
+
+async def capture_statement(call):
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = None
+    mock_result.scalars.return_value.all.return_value = []
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    await call(ContactRepository(mock_session))
+
+    return mock_session.execute.call_args[0][0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "call",
+    [
+        pytest.param(lambda repository: repository.get_by_id(1, 7), id="get_by_id"),
+        pytest.param(
+            lambda repository: repository.query(ContactQuery(search="John"), 7),
+            id="query",
+        ),
+        pytest.param(
+            lambda repository: repository.query(
+                ContactQuery(birthday_in_next_days=7), 7
+            ),
+            id="query birthday in next days",
+        ),
+    ],
+)
+async def test_contact_queries_scan_one_partition(call):
+    stmt = await capture_statement(call)
+    engine = create_async_engine(POSTGRES_URL)
+
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            await connection.execute(text("CREATE SCHEMA partition_check"))
+            await connection.execute(text("SET LOCAL search_path TO partition_check"))
+            await connection.execute(text(CONTACTS_DDL))
+            for statement in contacts_partitions_ddl(PARTITIONS):
+                await connection.execute(text(statement))
+            await connection.execute(text(CONTACTS_INDEX_DDL))
+
+            sql = stmt.compile(
+                dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+            )
+            result = await connection.execute(text(f"EXPLAIN (COSTS OFF) {sql}"))
+            plan = "\n".join(row[0] for row in result)
+        finally:
+            await transaction.rollback()
+
+    await engine.dispose()
+
+    assert Contact.__tablename__ in plan
+    assert len(set(re.findall(r"contacts_p\d+", plan))) == 1, plan
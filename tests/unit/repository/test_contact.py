@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from typing import Any
 import pytest
 from unittest.mock import AsyncMock, MagicMock
@@ -10,13 +10,15 @@ from app.repository.contact import ContactRepository
 
 
 def get_birthday_in_next_days_query(birthday_in_next_days: int) -> tuple[int, int]:
-    today = datetime.now().timetuple().tm_yday
-    if today + birthday_in_next_days > 365:
-        to_day = today + birthday_in_next_days - 365
-    else:
-        to_day = today + birthday_in_next_days
+    today = datetime.now().date()
+    to_day = today + timedelta(days=birthday_in_next_days)
+
+    return (today.month * 100 + today.day, to_day.month * 100 + to_day.day)
+
 
-    return (today, to_day)
+days_to_next_year = (date(date.today().year, 12, 31) - date.today()).days
+# Largest window not wrapping across the year end, every window wraps on Dec 31
+days_within_year = max(1, min(9, days_to_next_year))
 
 
 query_cases = [
@@ -163,43 +165,70 @@ query_cases = [
         id="birthday of the year to query",
     ),
     pytest.param(
-        ContactQuery(birthday_in_next_days=9),
+        ContactQuery(birthday_in_next_days=days_within_year),
         [
             "LIMIT :param_1",
             "OFFSET :param_2",
-            "contacts.birthday_of_the_year <=",
-            "contacts.birthday_of_the_year >=",
+            "contacts.birthday_month_day >=",
+            "contacts.birthday_month_day <=",
+            "ORDER BY contacts.birthday_month_day, contacts.id",
         ],
         {
             "param_1": 10,
             "param_2": 0,
-            "birthday_of_the_year_1": get_birthday_in_next_days_query(9)[0],
-            "birthday_of_the_year_2": get_birthday_in_next_days_query(9)[1],
+            "birthday_month_day_1": get_birthday_in_next_days_query(
+                days_within_year
+            )[0],
+            "birthday_month_day_2": get_birthday_in_next_days_query(
+                days_within_year
+            )[1],
         },
         id="birthday in next days query",
+        marks=pytest.mark.skipif(
+            days_to_next_year == 0, reason="every window wraps on Dec 31"
+        ),
     ),
     pytest.param(
-        ContactQuery(
-            birthday_in_next_days=(365 - datetime.now().timetuple().tm_yday) + 8
-        ),
+        ContactQuery(birthday_in_next_days=days_to_next_year + 8),
         [
             "LIMIT :param_1",
             "OFFSET :param_2",
-            "contacts.birthday_of_the_year <=",
-            "contacts.birthday_of_the_year >=",
+            "contacts.birthday_month_day >= :birthday_month_day_1 OR "
+            "contacts.birthday_month_day <= :birthday_month_day_2",
+            "ORDER BY contacts.birthday_month_day < :birthday_month_day_3, "
+            "contacts.birthday_month_day, contacts.id",
         ],
         {
             "param_1": 10,
             "param_2": 0,
-            "birthday_of_the_year_1": get_birthday_in_next_days_query(
-                (365 - datetime.now().timetuple().tm_yday) + 8
+            "birthday_month_day_1": get_birthday_in_next_days_query(
+                days_to_next_year + 8
             )[0],
-            "birthday_of_the_year_2": get_birthday_in_next_days_query(
-                (365 - datetime.now().timetuple().tm_yday) + 8
+            "birthday_month_day_2": get_birthday_in_next_days_query(
+                days_to_next_year + 8
             )[1],
+            "birthday_month_day_3": get_birthday_in_next_days_query(
+                days_to_next_year + 8
+            )[0],
         },
         id="birthday in next days query next year",
     ),
+    pytest.param(
+        ContactQuery(birthday_in_next_days=365),
+        [
+            "LIMIT :param_1",
+            "OFFSET :param_2",
+            "contacts.birthday_month_day IS NOT NULL",
+            "ORDER BY contacts.birthday_month_day < :birthday_month_day_1, "
+            "contacts.birthday_month_day, contacts.id",
+        ],
+        {
+            "param_1": 10,
+            "param_2": 0,
+            "birthday_month_day_1": get_birthday_in_next_days_query(365)[0],
+        },
+        id="birthday in next days query whole year",
+    ),
     pytest.param(
         ContactQuery(birthday_of_the_year_to=8, birthday_of_the_year_from=8),
         [
@@ -693,3 +722,66 @@ async def test_create(contact_repository, mock_session, user_id):
     assert contact.birthday == datetime(1990, 1, 1)
     assert contact.additional_info == "Additional info"
     assert contact.user_id == user_id
+
+
+@pytest.mark.parametrize(
+    "birthday, month_day",
+    [
+        pytest.param(datetime(1990, 2, 28), 228, id="February 28"),
+        pytest.param(datetime(1992, 2, 29), 229, id="February 29"),
+        pytest.param(datetime(1990, 3, 1), 301, id="March 1 in non-leap year"),
+        pytest.param(datetime(1992, 3, 1), 301, id="March 1 in leap year"),
+        pytest.param(datetime(1992, 12, 31), 1231, id="December 31"),
+    ],
+)
+def test_birthday_month_day(birthday, month_day):
+    contact = Contact(birthday=birthday)
+
+    assert contact.birthday_month_day == month_day
+
+    contact.birthday = None
+
+    assert contact.birthday_month_day is None
+
+
+
+@pytest.mark.parametrize(
+    "today, days, from_key, to_key, wraps",
+    [
+        (date(2026, 10, 19), 9, 1019, 1028, False),
+        (date(2026, 12, 31), 1, 1231, 101, True),
+        (date(2026, 12, 27), 8, 1227, 104, True),
+    ],
+)
+def test_birthday_in_next_days_window(today, days, from_key, to_key, wraps):
+    condition, key, wrapped = ContactRepository.birthday_in_next_days_window(
+        days, today
+    )
+    params = condition.compile().params
+
+    assert key == from_key
+    assert wrapped == wraps
+    assert sorted(params.values()) == sorted([from_key, to_key])
+    assert (" OR " in str(condition.compile())) == wraps
+
+
+@pytest.mark.asyncio
+async def test_get_stats(contact_repository, mock_session):
+    user_id = 1
+    rows = [(1, 2, 1), (None, 1, 0)]
+    mock_result = MagicMock()
+    mock_result.all.return_value = rows
+    mock_session.execute = AsyncMock(return_value=mock_result)
+    recent_since = datetime(2024, 1, 1)
+
+    result = await contact_repository.get_stats(user_id, recent_since)
+
+    assert result == rows
+    stmt = mock_session.execute.call_args[0][0]
+    compiled = stmt.compile()
+    sql = str(compiled)
+    assert "count(contacts.id)" in sql
+    assert "GROUP BY" in sql
+    assert "contacts.user_id = :user_id_1" in sql
+    assert compiled.params["user_id_1"] == user_id
+    assert recent_since in compiled.params.values()
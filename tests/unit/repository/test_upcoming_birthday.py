@@ -0,0 +1,129 @@
+from datetime import date
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.entity.bootstrap import Contact
+from app.repository.upcoming_birthday import UpcomingBirthdayRepository
+
+
+@pytest.fixture
+def mock_session():
+    mock_session = AsyncMock(spec=AsyncSession)
+    return mock_session
+
+
+@pytest.fixture
+def upcoming_birthday_repository(mock_session):
+    return UpcomingBirthdayRepository(mock_session)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "today, days, constraints, query_params",
+    [
+        pytest.param(
+            date(2026, 2, 25),
+            7,
+            [
+                "contacts.birthday_month_day >= :birthday_month_day_3 AND "
+                "contacts.birthday_month_day <= :birthday_month_day_4",
+            ],
+            {
+                "birthday_month_day_1": 225,
+                "birthday_month_day_3": 225,
+                "birthday_month_day_4": 304,
+            },
+            id="Window inside one year",
+        ),
+        pytest.param(
+            date(2026, 12, 29),
+            7,
+            [
+                "contacts.birthday_month_day >= :birthday_month_day_3 OR "
+                "contacts.birthday_month_day <= :birthday_month_day_4",
+            ],
+            {
+                "birthday_month_day_1": 1229,
+                "birthday_month_day_3": 1229,
+                "birthday_month_day_4": 105,
+            },
+            id="Window across the year end",
+        ),
+    ],
+)
+async def test_rebuild(
+    upcoming_birthday_repository, mock_session, today, days, constraints, query_params
+):
+    await upcoming_birthday_repository.rebuild(days, today)
+
+    assert mock_session.execute.await_count == 2
+    delete_sql = str(mock_session.execute.call_args_list[0][0][0].compile())
+    compiled = mock_session.execute.call_args_list[1][0][0].compile()
+    sql_str = str(compiled)
+    params = compiled.params
+
+    mock_session.commit.assert_awaited_once()
+
+    assert "DELETE FROM upcoming_birthdays" in delete_sql
+    assert "WHERE" not in delete_sql
+    assert "INSERT INTO upcoming_birthdays (contact_id, user_id, sort_key)" in sql_str
+    assert "SELECT contacts.id, contacts.user_id, CASE WHEN" in sql_str
+    for constraint in constraints:
+        assert constraint in sql_str
+    for key, value in query_params.items():
+        assert params[key] == value
+
+
+@pytest.mark.asyncio
+async def test_refresh_contact(upcoming_birthday_repository, mock_session):
+    await upcoming_birthday_repository.refresh_contact(1, 2, 7, date(2026, 10, 19))
+
+    assert mock_session.execute.await_count == 2
+    delete_compiled = mock_session.execute.call_args_list[0][0][0].compile()
+    insert_compiled = mock_session.execute.call_args_list[1][0][0].compile()
+
+    mock_session.commit.assert_awaited_once()
+
+    assert "upcoming_birthdays.contact_id =" in str(delete_compiled)
+    assert delete_compiled.params["contact_id_1"] == 1
+    assert "contacts.id = :id_1" in str(insert_compiled)
+    assert "contacts.user_id = :user_id_1" in str(insert_compiled)
+    assert insert_compiled.params["id_1"] == 1
+    assert insert_compiled.params["user_id_1"] == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_contact(upcoming_birthday_repository, mock_session):
+    await upcoming_birthday_repository.delete_contact(1, 2)
+
+    compiled = mock_session.execute.call_args[0][0].compile()
+    sql_str = str(compiled)
+
+    mock_session.execute.assert_awaited_once()
+    mock_session.commit.assert_awaited_once()
+
+    assert "DELETE FROM upcoming_birthdays" in sql_str
+    assert compiled.params == {"contact_id_1": 1, "user_id_1": 2}
+
+
+@pytest.mark.asyncio
+async def test_get_closest(upcoming_birthday_repository, mock_session):
+    contact = Contact(id=1, user_id=1, first_name="John")
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = [contact]
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    result = await upcoming_birthday_repository.get_closest(1, 5, 10)
+
+    compiled = mock_session.execute.call_args[0][0].compile()
+    sql_str = str(compiled)
+
+    mock_session.execute.assert_called_once()
+
+    assert result == [contact]
+    assert "JOIN upcoming_birthdays ON upcoming_birthdays.contact_id = contacts.id" in sql_str
+    assert (
+        "ORDER BY upcoming_birthdays.sort_key, upcoming_birthdays.contact_id" in sql_str
+    )
+    assert compiled.params["param_1"] == 5
+    assert compiled.params["param_2"] == 10
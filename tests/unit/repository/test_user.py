@@ -1,10 +1,12 @@
 from datetime import datetime
 import pytest
 from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.user import UserModel
 from app.enum.user_role import UserRole
 from app.entity.bootstrap import User
+from app.exceptions.user_exists_exception import UserExistsException
 from app.repository.user import UserRepository
 
 
@@ -326,3 +328,92 @@ async def test_create_invalid_email_format(user_repository, mock_session):
         )
 
     assert "value is not a valid email address" in str(exc_info.value)
+
+
+@pytest.mark.asyncio
+async def test_get_token_version(user_repository, mock_session):
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = 3
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    version = await user_repository.get_token_version(1)
+
+    assert version == 3
+    stmt = mock_session.execute.call_args[0][0]
+    sql = str(stmt.compile())
+    assert "SELECT users.token_version" in sql
+    assert "users.id = :id_1" in sql
+
+
+@pytest.mark.asyncio
+async def test_increment_token_version(user_repository, mock_session):
+    await user_repository.increment_token_version(1)
+
+    stmt = mock_session.execute.call_args[0][0]
+    sql = str(stmt.compile())
+    assert "UPDATE users SET token_version=(users.token_version +" in sql
+    assert "users.id = :id_1" in sql
+    mock_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "taken_email, taken_field",
+    [
+        ("test@test.com", "email"),
+        ("other@test.com", "username"),
+        (None, None),
+    ],
+)
+async def test_get_taken_field(
+    user_repository, mock_session, taken_email, taken_field
+):
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = taken_email
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    result = await user_repository.get_taken_field("test@test.com", "User")
+
+    assert result == taken_field
+    mock_session.execute.assert_awaited_once()
+    stmt = mock_session.execute.call_args[0][0]
+    assert "users.email = :email_1 OR users.username = :username_1" in str(stmt)
+
+
+@pytest.mark.asyncio
+async def test_create_integrity_error(user_repository, mock_session):
+    model = UserModel(
+        username="User",
+        email="test@test.com",
+        password="testtest",
+        role=UserRole.USER,
+    )
+    mock_session.commit = AsyncMock(
+        side_effect=IntegrityError("INSERT", {}, Exception("UNIQUE"))
+    )
+
+    with pytest.raises(UserExistsException):
+        await user_repository.create(model)
+
+    mock_session.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_iter_identities(user_repository, mock_session):
+    first_batch = MagicMock()
+    first_batch.all.return_value = [
+        MagicMock(id=1, username="first", email="first@test.com"),
+        MagicMock(id=2, username="second", email="second@test.com"),
+    ]
+    last_batch = MagicMock()
+    last_batch.all.return_value = []
+    mock_session.execute = AsyncMock(side_effect=[first_batch, last_batch])
+
+    batches = [rows async for rows in user_repository.iter_identities(batch_size=2)]
+
+    assert len(batches) == 1
+    assert [row.username for row in batches[0]] == ["first", "second"]
+    assert mock_session.execute.await_count == 2
+    stmt = mock_session.execute.call_args_list[1][0][0]
+    assert "WHERE users.id > :id_1 ORDER BY users.id" in str(stmt)
+    assert stmt.compile().params["id_1"] == 2
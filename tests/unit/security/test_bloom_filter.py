@@ -0,0 +1,27 @@
+import uuid
+from app.security.bloom_filter import BloomFilter
+
+
+def test_no_false_negatives():
+    bloom_filter = BloomFilter(1000)
+    items = [uuid.uuid4().hex for _ in range(1000)]
+
+    for item in items:
+        bloom_filter.add(item)
+
+    assert all(item in bloom_filter for item in items)
+    assert bloom_filter.count == 1000
+
+
+def test_false_positive_rate():
+    bloom_filter = BloomFilter(1000, error_rate=0.01)
+    for _ in range(1000):
+        bloom_filter.add(uuid.uuid4().hex)
+
+    false_positives = sum(uuid.uuid4().hex in bloom_filter for _ in range(10000))
+
+    assert false_positives < 300
+
+
+def test_empty_filter():
+    assert "jti" not in BloomFilter(10)
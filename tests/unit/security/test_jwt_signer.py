@@ -0,0 +1,120 @@
+import json
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jose import jwt
+import pytest
+from app.exceptions.token_decode_exception import TokenDecodeException
+from app.security.jwt_signer import (
+    EdDSASigner,
+    ES256Signer,
+    HS256Signer,
+    JwtKeyRing,
+    base64url_encode,
+    load_signer,
+)
+
+
+def es256_signer(kid=None):
+    return ES256Signer(private_key=ec.generate_private_key(ec.SECP256R1()), kid=kid)
+
+
+def eddsa_signer(kid=None):
+    return EdDSASigner(private_key=ed25519.Ed25519PrivateKey.generate(), kid=kid)
+
+
+signers = [
+    pytest.param(lambda kid=None: HS256Signer("secret", kid), id="HS256"),
+    pytest.param(es256_signer, id="ES256"),
+    pytest.param(eddsa_signer, id="EdDSA"),
+]
+
+
+@pytest.mark.parametrize("make_signer", signers)
+def test_encode_decode(make_signer):
+    key_ring = JwtKeyRing(make_signer("current"))
+
+    token = key_ring.encode({"sub": "user", "exp": 1})
+
+    assert key_ring.decode(token) == {"sub": "user", "exp": 1}
+
+
+@pytest.mark.parametrize("make_signer", signers)
+def test_decode_tampered_token(make_signer):
+    key_ring = JwtKeyRing(make_signer())
+    header, payload, signature = key_ring.encode({"sub": "user"}).split(".")
+    other_payload = JwtKeyRing(make_signer()).encode({"sub": "admin"}).split(".")[1]
+
+    with pytest.raises(TokenDecodeException):
+        key_ring.decode(f"{header}.{other_payload}.{signature}")
+
+
+@pytest.mark.parametrize("make_signer", signers)
+def test_decode_unknown_key(make_signer):
+    token = JwtKeyRing(make_signer("old")).encode({"sub": "user"})
+
+    with pytest.raises(TokenDecodeException):
+        JwtKeyRing(make_signer("new")).decode(token)
+
+
+def test_decode_rotated_key():
+    old_signer = eddsa_signer("old")
+    token = JwtKeyRing(old_signer).encode({"sub": "user"})
+
+    key_ring = JwtKeyRing(es256_signer("new"), verifiers=[old_signer])
+
+    assert key_ring.decode(token) == {"sub": "user"}
+    assert key_ring.decode(key_ring.encode({"sub": "other"})) == {"sub": "other"}
+
+
+def test_decode_rejects_algorithm_confusion():
+    key_ring = JwtKeyRing(es256_signer())
+    token = JwtKeyRing(HS256Signer("secret")).encode({"sub": "user"})
+
+    with pytest.raises(TokenDecodeException):
+        key_ring.decode(token)
+
+
+@pytest.mark.parametrize("token", ["", "a.b", "a.b.c", "e30.e30.", "W10.W10.c2ln"])
+def test_decode_malformed_token(token):
+    with pytest.raises(TokenDecodeException):
+        JwtKeyRing(HS256Signer("secret")).decode(token)
+
+
+@pytest.mark.parametrize("kid", [[1], {"a": 1}, 1])
+def test_decode_rejects_non_string_kid(kid):
+    header = base64url_encode(json.dumps({"alg": "HS256", "kid": kid}).encode())
+
+    with pytest.raises(TokenDecodeException):
+        JwtKeyRing(HS256Signer("secret")).decode(f"{header.decode()}.e30.abc")
+
+
+def test_hs256_compatible_with_jose():
+    key_ring = JwtKeyRing(HS256Signer("secret"))
+
+    assert key_ring.decode(jwt.encode({"sub": "user"}, "secret", algorithm="HS256")) == {
+        "sub": "user"
+    }
+    assert jwt.decode(
+        key_ring.encode({"sub": "user"}), "secret", algorithms=["HS256"]
+    ) == {"sub": "user"}
+
+
+def test_verify_only_signer(tmp_path):
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    public_key_file = tmp_path / "public.pem"
+    public_key_file.write_bytes(
+        private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+    )
+    token = JwtKeyRing(EdDSASigner(private_key=private_key, kid="edge")).encode(
+        {"sub": "user"}
+    )
+
+    verifier = load_signer("EdDSA", kid="edge", public_key_file=str(public_key_file))
+    key_ring = JwtKeyRing(verifier)
+
+    assert not verifier.can_sign
+    assert key_ring.decode(token) == {"sub": "user"}
+    with pytest.raises(ValueError):
+        key_ring.encode({"sub": "user"})
@@ -0,0 +1,74 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from app.exceptions.password_hasher_busy_exception import PasswordHasherBusyException
+from app.exceptions.rate_limit_exceeded_exception import RateLimitExceededException
+from app.security.login_admission import LoginAdmissionController
+
+
+@pytest.fixture
+def redis():
+    redis = MagicMock()
+    redis.exists.side_effect = lambda key: key == "auth:recent_login:recent"
+    return redis
+
+
+@pytest.fixture
+def hasher():
+    hasher = MagicMock()
+    hasher.release = asyncio.Event()
+
+    async def verify(password, hashed_password):
+        await hasher.release.wait()
+        return password == hashed_password
+
+    hasher.verify = AsyncMock(side_effect=verify)
+    return hasher
+
+
+@pytest.fixture
+def controller(hasher, redis):
+    return LoginAdmissionController(
+        hasher, redis, max_in_flight=3, reserved=1, recent_seconds=60
+    )
+
+
+@pytest.mark.asyncio
+async def test_reserved_slots_for_recent_users(controller, hasher, redis):
+    pending = [
+        asyncio.create_task(controller.verify("unknown", "password", "password"))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+
+    with pytest.raises(RateLimitExceededException):
+        await controller.verify("unknown", "password", "password")
+
+    recent = asyncio.create_task(controller.verify("recent", "password", "password"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHasherBusyException):
+        await controller.verify("recent", "password", "password")
+
+    hasher.release.set()
+    assert await asyncio.gather(*pending, recent) == [True, True, True]
+    assert controller.metrics() == {
+        "max_in_flight": 3,
+        "reserved": 1,
+        "in_flight": 0,
+        "admitted": 3,
+        "prioritized": 1,
+        "throttled": 1,
+        "rejected": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_records_successful_logins(controller, hasher, redis):
+    hasher.release.set()
+
+    assert await controller.verify("user", "password", "password")
+    assert not await controller.verify("other", "password", "wrong")
+
+    redis.set.assert_called_once_with("auth:recent_login:user", 1, ex=60)
+    redis.exists.assert_not_called()
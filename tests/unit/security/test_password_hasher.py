@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import pytest
+from app.exceptions.password_hasher_busy_exception import PasswordHasherBusyException
+from app.security.password_hasher import PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    return PasswordHasher(scheme="bcrypt", rounds=10, workers=1, queue_limit=1)
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify(hasher):
+    hashed_password = await hasher.hash("password")
+
+    assert await hasher.verify("password", hashed_password)
+    assert not await hasher.verify("wrong_password", hashed_password)
+    assert hasher.metrics()["completed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_hash_runs_off_event_loop(hasher):
+    loop_thread = threading.get_ident()
+    threads = []
+
+    def hash_password(password):
+        threads.append(threading.get_ident())
+        return password
+
+    hasher.hash_password = hash_password
+    await hasher.hash("password")
+
+    assert threads and threads[0] != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_hash_rejected_when_queue_is_full(hasher):
+    release = threading.Event()
+
+    def hash_password(password):
+        release.wait(5)
+        return password
+
+    hasher.hash_password = hash_password
+    pending = [asyncio.create_task(hasher.hash("password")) for _ in range(2)]
+    await asyncio.sleep(0.05)
+
+    assert hasher.metrics()["running"] == 1
+    assert hasher.metrics()["queued"] == 1
+    with pytest.raises(PasswordHasherBusyException):
+        await hasher.hash("password")
+    assert hasher.metrics()["rejected"] == 1
+
+    release.set()
+    assert await asyncio.gather(*pending) == ["password", "password"]
+    assert hasher.metrics()["queued"] == 0
+
+
+def test_needs_update_on_scheme_change(hasher):
+    bcrypt_hash = hasher.hash_password("password")
+    argon2_hasher = PasswordHasher(scheme="argon2", rounds=1)
+
+    assert argon2_hasher.verify_password("password", bcrypt_hash)
+    assert argon2_hasher.needs_update(bcrypt_hash)
+    assert not argon2_hasher.needs_update(argon2_hasher.hash_password("password"))
+
+
+def test_needs_update_on_lower_cost(hasher):
+    lower_hash = PasswordHasher(scheme="bcrypt", rounds=4).pwd_context.hash("password")
+
+    assert hasher.verify_password("password", lower_hash)
+    assert hasher.needs_update(lower_hash)
+    assert not hasher.needs_update(hasher.hash_password("password"))
+
+
+def test_no_update_on_higher_cost(hasher):
+    higher_hash = PasswordHasher(scheme="bcrypt", rounds=11).pwd_context.hash(
+        "password"
+    )
+
+    assert hasher.verify_password("password", higher_hash)
+    assert not hasher.needs_update(higher_hash)
+
+
+@pytest.mark.parametrize(
+    "scheme, hash_ms, target_ms, rounds",
+    [
+        pytest.param("bcrypt", 50, 10, 10, id="bcrypt slower than target"),
+        pytest.param("bcrypt", 50, 250, 12, id="bcrypt doubles per round"),
+        pytest.param("bcrypt", 1, 10000, 15, id="bcrypt capped"),
+        pytest.param("argon2", 20, 100, 5, id="argon2 linear per round"),
+        pytest.param("argon2", 200, 100, 1, id="argon2 slower than target"),
+    ],
+)
+def test_calibrate(monkeypatch, scheme, hash_ms, target_ms, rounds):
+    hasher = PasswordHasher(scheme=scheme)
+    min_rounds = {"bcrypt": 10, "argon2": 1}[scheme]
+    monkeypatch.setattr(
+        hasher,
+        "_time_hash",
+        lambda r: hash_ms * (2 ** (r - min_rounds) if scheme == "bcrypt" else r),
+    )
+
+    assert hasher.calibrate(target_ms) == rounds
+    assert hasher.rounds == rounds
@@ -0,0 +1,112 @@
+from unittest.mock import MagicMock
+import pytest
+from app.conf.config import settings
+from app.security.rate_limiter import RateLimiter, parse_rate
+
+
+@pytest.mark.parametrize(
+    "rate, parsed",
+    [
+        ("5/minute", (5, 60)),
+        ("10/second", (10, 1)),
+        ("100/day", (100, 86400)),
+    ],
+)
+def test_parse_rate(rate, parsed):
+    assert parse_rate(rate) == parsed
+
+
+def test_parse_rate_invalid():
+    with pytest.raises(ValueError):
+        parse_rate("5/fortnight")
+
+
+def test_hit_one_script_call():
+    redis = MagicMock()
+    script = redis.register_script.return_value
+    script.return_value = [1, 0]
+    rate_limiter = RateLimiter(redis)
+
+    assert rate_limiter.hit("rate_limit:login:ip:127.0.0.1", 5, 60) == 0
+
+    script.assert_called_once_with(
+        keys=["rate_limit:login:ip:127.0.0.1"], args=[5, 60, 1]
+    )
+
+
+def test_hit_redis_unavailable():
+    redis = MagicMock()
+    redis.register_script.return_value.side_effect = ConnectionError("Redis is down")
+    rate_limiter = RateLimiter(redis)
+
+    assert rate_limiter.hit("rate_limit:login:ip:127.0.0.1", 5, 60) == 0
+
+
+@pytest.fixture
+def lease_mode(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_MODE", "lease")
+    monkeypatch.setattr(settings, "RATE_LIMIT_LEASE_SHARE", 0.1)
+    monkeypatch.setattr(settings, "RATE_LIMIT_LEASE_MIN", 2)
+    monkeypatch.setattr(settings, "RATE_LIMIT_LEASE_SECONDS", 5)
+
+
+def test_lease_serves_hits_in_memory(lease_mode):
+    redis = MagicMock()
+    script = redis.register_script.return_value
+    script.return_value = [10, 0]
+    rate_limiter = RateLimiter(redis)
+
+    for _ in range(10):
+        assert rate_limiter.hit("rate_limit:get_me:user:test", 100, 60) == 0
+
+    script.assert_called_once_with(
+        keys=["rate_limit:get_me:user:test"], args=[100, 60, 10]
+    )
+
+    script.return_value = [0, 42]
+    assert rate_limiter.hit("rate_limit:get_me:user:test", 100, 60) == 42
+    assert script.call_count == 2
+
+
+@pytest.mark.parametrize("limit, batch", [(3, 2), (1, 1), (19, 2), (100, 10)])
+def test_lease_batch_floor(lease_mode, limit, batch):
+    redis = MagicMock()
+    script = redis.register_script.return_value
+    script.return_value = [batch, 0]
+    rate_limiter = RateLimiter(redis)
+
+    for _ in range(batch):
+        assert rate_limiter.hit("rate_limit:get_me:user:test", limit, 60) == 0
+
+    script.assert_called_once_with(
+        keys=["rate_limit:get_me:user:test"], args=[limit, 60, batch]
+    )
+
+
+def test_lease_expires(lease_mode, monkeypatch):
+    redis = MagicMock()
+    script = redis.register_script.return_value
+    script.return_value = [10, 0]
+    rate_limiter = RateLimiter(redis)
+    now = 1000.0
+    monkeypatch.setattr("app.security.rate_limiter.time.monotonic", lambda: now)
+
+    assert rate_limiter.hit("rate_limit:get_me:user:test", 100, 60) == 0
+    now += 6
+    assert rate_limiter.hit("rate_limit:get_me:user:test", 100, 60) == 0
+
+    assert script.call_count == 2
+
+
+def test_lease_cache_size(lease_mode):
+    redis = MagicMock()
+    redis.register_script.return_value.return_value = [10, 0]
+    rate_limiter = RateLimiter(redis, lease_cache_size=2)
+
+    for client in ("first", "second", "third"):
+        rate_limiter.hit(f"rate_limit:get_me:user:{client}", 100, 60)
+
+    assert list(rate_limiter._leases) == [
+        "rate_limit:get_me:user:second",
+        "rate_limit:get_me:user:third",
+    ]
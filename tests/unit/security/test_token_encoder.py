@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+from app.exceptions.token_decode_exception import TokenDecodeException
+from app.security.jwt_signer import HS256Signer, JwtKeyRing
+from app.security.token_encoder import UTC, TokenEncoder
+
+
+@pytest.fixture
+def token_encoder():
+    return TokenEncoder(
+        JwtKeyRing(HS256Signer("secret")), default_expires_delta=60, cache_size=2
+    )
+
+
+@pytest.mark.asyncio
+async def test_decode_token_verifies_once(token_encoder):
+    token = await token_encoder.create_token({"sub": "user"})
+
+    with patch.object(
+        token_encoder.key_ring, "decode", wraps=token_encoder.key_ring.decode
+    ) as decode:
+        first = await token_encoder.decode_token(token)
+        second = await token_encoder.decode_token(token)
+
+    assert first == second
+    assert first["sub"] == "user"
+    decode.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_decode_token_returns_copy(token_encoder):
+    token = await token_encoder.create_token({"sub": "user"})
+
+    payload = await token_encoder.decode_token(token)
+    payload["sub"] = "other"
+
+    assert (await token_encoder.decode_token(token))["sub"] == "user"
+
+
+@pytest.mark.asyncio
+async def test_decode_token_cache_is_bounded(token_encoder):
+    tokens = [await token_encoder.create_token({"sub": f"user{i}"}) for i in range(3)]
+
+    for token in tokens:
+        await token_encoder.decode_token(token)
+
+    assert len(token_encoder._cache) == 2
+    assert token_encoder._digest(tokens[0]) not in token_encoder._cache
+
+
+@pytest.mark.asyncio
+async def test_decode_token_expired_in_cache(token_encoder):
+    token = await token_encoder.create_token({"sub": "user"})
+    await token_encoder.decode_token(token)
+
+    later = datetime.now(UTC) + timedelta(seconds=120)
+    with patch("app.security.token_encoder.datetime") as mock_datetime:
+        mock_datetime.now.return_value = later
+        with pytest.raises(TokenDecodeException):
+            await token_encoder.decode_token(token)
+
+    assert token_encoder._digest(token) not in token_encoder._cache
+
+
+@pytest.mark.asyncio
+async def test_decode_token_evicted(token_encoder):
+    token = await token_encoder.create_token({"sub": "user"})
+    await token_encoder.decode_token(token)
+
+    token_encoder.evict(token)
+
+    assert token_encoder._digest(token) not in token_encoder._cache
+
+
+@pytest.mark.asyncio
+async def test_decode_invalid_token_not_cached(token_encoder):
+    with pytest.raises(TokenDecodeException):
+        await token_encoder.decode_token("invalid")
+
+    assert len(token_encoder._cache) == 0
@@ -0,0 +1,59 @@
+import time
+from unittest.mock import MagicMock
+import pytest
+from app.security.token_revocation_list import TokenRevocationList
+
+
+@pytest.fixture
+def redis():
+    redis = MagicMock()
+    redis.zrangebyscore.return_value = [b"revoked_elsewhere"]
+    redis.exists.return_value = 1
+    return redis
+
+
+@pytest.fixture
+def revocation_list(redis):
+    return TokenRevocationList(
+        redis, sync_interval=60, capacity=100, error_rate=0.001, max_lifetime=3600
+    )
+
+
+def test_unrevoked_token_checked_in_memory(revocation_list, redis):
+    assert not revocation_list.is_revoked("not_revoked")
+    assert not revocation_list.is_revoked("not_revoked")
+
+    redis.exists.assert_not_called()
+    redis.zrangebyscore.assert_called_once()
+
+
+def test_token_revoked_elsewhere(revocation_list, redis):
+    assert revocation_list.is_revoked("revoked_elsewhere")
+
+    redis.exists.assert_called_once_with("auth:revoked:revoked_elsewhere")
+
+
+def test_revoke(revocation_list, redis):
+    assert not revocation_list.is_revoked("jti")
+
+    revocation_list.revoke("jti", time.time() + 60)
+
+    pipeline = redis.pipeline.return_value
+    pipeline.set.assert_called_once()
+    assert pipeline.set.call_args.kwargs["ex"] in (60, 61)
+    pipeline.zadd.assert_called_once()
+    assert revocation_list.is_revoked("jti")
+
+
+def test_revoke_expired_token(revocation_list, redis):
+    revocation_list.revoke("jti", time.time() - 1)
+
+    redis.pipeline.assert_not_called()
+
+
+def test_redis_unavailable(revocation_list, redis):
+    redis.zrangebyscore.side_effect = ConnectionError("Redis is down")
+
+    assert not revocation_list.is_revoked("jti")
+    assert not revocation_list.is_revoked("jti")
+    redis.zrangebyscore.assert_called_once()
@@ -0,0 +1,97 @@
+from io import BytesIO
+import pytest
+from PIL import Image
+from app.exceptions.invalid_image_exception import InvalidImageException
+from app.services.avatar_processor import AvatarProcessor
+
+
+def make_image_bytes(
+    size=(800, 400), image_format="JPEG", mode="RGB", color="red", **kwargs
+) -> bytes:
+    buffer = BytesIO()
+    Image.new(mode, size, color).save(buffer, format=image_format, **kwargs)
+    return buffer.getvalue()
+
+
+def test_process_image_crops_to_square():
+    processor = AvatarProcessor(size=250, output_format="WEBP")
+
+    image = processor.process_image(make_image_bytes())
+
+    assert image.content_type == "image/webp"
+    assert image.extension == "webp"
+    with Image.open(BytesIO(image.content)) as avatar:
+        assert avatar.format == "WEBP"
+        assert avatar.size == (250, 250)
+
+
+def test_process_image_strips_metadata():
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    exif[0x0112] = 6
+    processor = AvatarProcessor(size=100, output_format="JPEG")
+
+    image = processor.process_image(make_image_bytes(exif=exif.tobytes()))
+
+    with Image.open(BytesIO(image.content)) as avatar:
+        assert avatar.format == "JPEG"
+        assert not avatar.getexif()
+        assert "exif" not in avatar.info
+
+
+def test_process_image_same_digest_for_same_image():
+    processor = AvatarProcessor(size=100)
+    data = make_image_bytes(image_format="PNG")
+
+    assert processor.process_image(data).digest == processor.process_image(data).digest
+    assert (
+        processor.process_image(data).digest
+        != processor.process_image(make_image_bytes(size=(300, 300))).digest
+    )
+
+
+def test_process_image_keeps_transparency_in_webp():
+    processor = AvatarProcessor(size=100, output_format="WEBP")
+
+    image = processor.process_image(
+        make_image_bytes(image_format="PNG", mode="RGBA", color=(255, 0, 0, 128))
+    )
+
+    with Image.open(BytesIO(image.content)) as avatar:
+        assert avatar.mode == "RGBA"
+
+
+def test_process_image_not_an_image():
+    processor = AvatarProcessor()
+
+    with pytest.raises(InvalidImageException):
+        processor.process_image(b"fake image content")
+
+
+def test_process_image_format_not_allowed():
+    processor = AvatarProcessor()
+
+    with pytest.raises(InvalidImageException):
+        processor.process_image(make_image_bytes(image_format="BMP"))
+
+
+def test_process_image_too_large():
+    processor = AvatarProcessor(max_pixels=100 * 100)
+
+    with pytest.raises(InvalidImageException):
+        processor.process_image(make_image_bytes(size=(200, 200)))
+
+
+def test_unsupported_output_format():
+    with pytest.raises(ValueError):
+        AvatarProcessor(output_format="BMP")
+
+
+@pytest.mark.asyncio
+async def test_process_on_thread_pool():
+    processor = AvatarProcessor(size=50)
+
+    image = await processor.process(make_image_bytes())
+
+    with Image.open(BytesIO(image.content)) as avatar:
+        assert avatar.size == (50, 50)
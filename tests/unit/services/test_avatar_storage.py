@@ -0,0 +1,98 @@
+import hashlib
+from unittest.mock import patch
+import pytest
+from app.services.avatar_processor import ProcessedImage
+from app.services.avatar_storage import (
+    CloudinaryAvatarStorage,
+    LocalAvatarStorage,
+    load_avatar_storage,
+)
+
+
+def make_image(content: bytes = b"avatar") -> ProcessedImage:
+    return ProcessedImage(
+        content, "image/webp", "webp", hashlib.sha256(content).hexdigest()
+    )
+
+
+def test_local_save_stores_file_under_digest(tmp_path):
+    storage = LocalAvatarStorage(tmp_path / "avatars", "http://localhost/api/avatars/")
+    image = make_image()
+
+    url = storage.save(image)
+
+    assert url == f"http://localhost/api/avatars/{image.digest}.webp"
+    assert (tmp_path / "avatars" / f"{image.digest}.webp").read_bytes() == b"avatar"
+    assert [path.name for path in (tmp_path / "avatars").iterdir()] == [
+        f"{image.digest}.webp"
+    ]
+
+
+def test_local_save_skips_stored_file(tmp_path):
+    storage = LocalAvatarStorage(tmp_path, "http://localhost/api/avatars")
+    image = make_image()
+    storage.save(image)
+    path = tmp_path / f"{image.digest}.webp"
+    path.write_bytes(b"stored")
+
+    assert storage.save(image) == f"http://localhost/api/avatars/{image.digest}.webp"
+    assert path.read_bytes() == b"stored"
+
+
+def test_local_path(tmp_path):
+    storage = LocalAvatarStorage(tmp_path, "http://localhost/api/avatars")
+    image = make_image()
+    storage.save(image)
+
+    assert storage.path(f"{image.digest}.webp") == tmp_path / f"{image.digest}.webp"
+    assert storage.path(f"{make_image(b'other').digest}.webp") is None
+
+
+@pytest.mark.parametrize(
+    "file_name", ["../secret.webp", f"{'a' * 64}.txt", f"{'A' * 64}.webp", ".webp"]
+)
+def test_local_path_rejects_other_names(tmp_path, file_name):
+    storage = LocalAvatarStorage(tmp_path, "http://localhost/api/avatars")
+
+    assert storage.path(file_name) is None
+
+
+@patch("app.services.avatar_storage.cloudinary.uploader.upload")
+def test_cloudinary_save_uploads_under_digest(mock_upload):
+    mock_upload.return_value = {"version": 1}
+    storage = CloudinaryAvatarStorage("cloud", "key", "secret")
+    image = make_image()
+
+    url = storage.save(image, timeout=5)
+
+    assert f"RestApp/avatars/{image.digest}" in url
+    mock_upload.assert_called_once_with(
+        (f"{image.digest}.webp", b"avatar"),
+        public_id=f"RestApp/avatars/{image.digest}",
+        overwrite=False,
+        timeout=5,
+    )
+
+
+def test_load_avatar_storage(tmp_path):
+    assert isinstance(
+        load_avatar_storage("local", directory=str(tmp_path), base_url="http://x"),
+        LocalAvatarStorage,
+    )
+    assert isinstance(
+        load_avatar_storage("cloudinary", "cloud", "key", "secret"),
+        CloudinaryAvatarStorage,
+    )
+
+
+@pytest.mark.parametrize(
+    "backend, options",
+    [
+        ("cloudinary", {}),
+        ("local", {"directory": "media/avatars"}),
+        ("s3", {}),
+    ],
+)
+def test_load_avatar_storage_invalid(backend, options):
+    with pytest.raises(ValueError):
+        load_avatar_storage(backend, **options)
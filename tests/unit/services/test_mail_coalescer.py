@@ -0,0 +1,50 @@
+from unittest.mock import MagicMock
+from app.services.mail_coalescer import MailCoalescer
+
+
+def test_claim_opens_window():
+    redis = MagicMock()
+    redis.set.return_value = True
+    coalescer = MailCoalescer(redis, window_seconds=60)
+
+    assert coalescer.claim("verify_email.html", "user@example.com")
+
+    redis.set.assert_called_once_with(
+        "mail:coalesce:verify_email.html:user@example.com", 1, nx=True, ex=60
+    )
+
+
+def test_claim_within_open_window():
+    redis = MagicMock()
+    redis.set.return_value = None
+    coalescer = MailCoalescer(redis, window_seconds=60)
+
+    assert not coalescer.claim("verify_email.html", "user@example.com")
+
+
+def test_claim_disabled():
+    redis = MagicMock()
+    coalescer = MailCoalescer(redis, window_seconds=0)
+
+    assert coalescer.claim("verify_email.html", "user@example.com")
+
+    redis.set.assert_not_called()
+
+
+def test_claim_redis_unavailable():
+    redis = MagicMock()
+    redis.set.side_effect = ConnectionError("Redis is down")
+    coalescer = MailCoalescer(redis, window_seconds=60)
+
+    assert coalescer.claim("reset_password.html", "user@example.com")
+
+
+def test_release_closes_window():
+    redis = MagicMock()
+    coalescer = MailCoalescer(redis, window_seconds=60)
+
+    coalescer.release("reset_password.html", "user@example.com")
+
+    redis.delete.assert_called_once_with(
+        "mail:coalesce:reset_password.html:user@example.com"
+    )
@@ -0,0 +1,195 @@
+import asyncio
+from email.message import EmailMessage
+import pytest
+import pytest_asyncio
+from aiosmtplib import SMTPConnectError
+from app.schemas.mail import MailModel
+from app.services.mail import MailService
+from app.services.smtp_pool import SmtpConnectionPool
+
+
+class StandInSmtpServer:
+    """
+    Local SMTP server accepting every message
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.messages: list[bytes] = []
+        self.noops = 0
+        self.logins = 0
+        self._writers: list[asyncio.StreamWriter] = []
+        self._server: asyncio.Server | None = None
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self):
+        self.drop_connections()
+        self._server.close()
+        await self._server.wait_closed()
+
+    def drop_connections(self):
+        for writer in self._writers:
+            writer.close()
+        self._writers.clear()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._writers.append(writer)
+        writer.write(b"220 localhost ESMTP\r\n")
+        try:
+            while line := await reader.readline():
+                command = line.strip().upper()
+                if command.startswith((b"EHLO", b"HELO")):
+                    writer.write(b"250-localhost\r\n250 AUTH PLAIN\r\n")
+                elif command.startswith(b"AUTH"):
+                    self.logins += 1
+                    writer.write(b"235 Authentication successful\r\n")
+                elif command == b"DATA":
+                    writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    data = await reader.readuntil(b"\r\n.\r\n")
+                    self.messages.append(data)
+                    writer.write(b"250 OK\r\n")
+                elif command == b"NOOP":
+                    self.noops += 1
+                    writer.write(b"250 OK\r\n")
+                elif command == b"QUIT":
+                    writer.write(b"221 Bye\r\n")
+                    await writer.drain()
+                    break
+                else:
+                    writer.write(b"250 OK\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+@pytest_asyncio.fixture
+async def smtp_server():
+    server = StandInSmtpServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+def make_pool(server: StandInSmtpServer, **kwargs) -> SmtpConnectionPool:
+    return SmtpConnectionPool(
+        hostname="127.0.0.1",
+        port=server.port,
+        validate_certs=False,
+        timeout=5,
+        **kwargs,
+    )
+
+
+def make_message(to: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "app@example.com"
+    message["To"] = to
+    message["Subject"] = "Confirm your email"
+    message.set_content("Hello")
+    return message
+
+
+@pytest.mark.asyncio
+async def test_reuses_connection(smtp_server):
+    pool = make_pool(smtp_server, username="user", password="password")
+
+    for i in range(3):
+        await pool.send(make_message(f"user{i}@example.com"))
+    await pool.close()
+
+    assert len(smtp_server.messages) == 3
+    assert smtp_server.connections == 1
+    assert smtp_server.logins == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sends_bounded_by_size(smtp_server):
+    pool = make_pool(smtp_server, size=2)
+
+    await asyncio.gather(
+        *(pool.send(make_message(f"user{i}@example.com")) for i in range(10))
+    )
+    await pool.close()
+
+    assert len(smtp_server.messages) == 10
+    assert smtp_server.connections <= 2
+
+
+@pytest.mark.asyncio
+async def test_reconnects_after_drop(smtp_server):
+    pool = make_pool(smtp_server)
+
+    await pool.send(make_message("first@example.com"))
+    smtp_server.drop_connections()
+    await asyncio.sleep(0.05)
+    await pool.send(make_message("second@example.com"))
+    await pool.close()
+
+    assert len(smtp_server.messages) == 2
+    assert smtp_server.connections == 2
+
+
+@pytest.mark.asyncio
+async def test_health_check_of_idle_connection(smtp_server):
+    pool = make_pool(smtp_server, health_check_seconds=0)
+
+    await pool.send(make_message("first@example.com"))
+    await pool.send(make_message("second@example.com"))
+    await pool.close()
+
+    assert smtp_server.noops == 1
+    assert smtp_server.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_closes_connection_after_max_messages(smtp_server):
+    pool = make_pool(smtp_server, max_messages=2)
+
+    for i in range(3):
+        await pool.send(make_message(f"user{i}@example.com"))
+    await pool.close()
+
+    assert len(smtp_server.messages) == 3
+    assert smtp_server.connections == 2
+
+
+@pytest.mark.asyncio
+async def test_send_fails_when_server_is_down(smtp_server):
+    pool = make_pool(smtp_server)
+    await smtp_server.stop()
+
+    with pytest.raises(SMTPConnectError):
+        await pool.send(make_message("user@example.com"))
+
+    assert pool._slots._value == pool.size
+
+
+@pytest.mark.asyncio
+async def test_mail_service_sends_rendered_template(smtp_server):
+    pool = make_pool(smtp_server)
+    service = MailService(pool)
+
+    sent = await service.send_email(
+        MailModel(
+            to=["user@example.com"],
+            subject="Confirm your email",
+            data={"host": "http://localhost", "username": "user", "token": "token"},
+            template="verify_email.html",
+        )
+    )
+    await pool.close()
+
+    assert sent
+    assert len(smtp_server.messages) == 1
+    assert b"Subject: Confirm your email" in smtp_server.messages[0]
+    assert b"To: user@example.com" in smtp_server.messages[0]
+    assert b"Content-Type: text/html" in smtp_server.messages[0]
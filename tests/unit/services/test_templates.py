@@ -0,0 +1,47 @@
+import os
+from app.services.templates import create_environment, precompile_templates
+
+
+def test_precompile_templates_compiles_pages_and_emails(tmp_path):
+    environment = create_environment(bytecode_cache_dir=str(tmp_path))
+
+    count = precompile_templates(environment)
+
+    assert count == 3
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_render_escapes_context():
+    environment = create_environment()
+
+    body = environment.get_template("email/verify_email.html").render(
+        host="http://localhost/", username="<b>user</b>", token="token"
+    )
+
+    assert "&lt;b&gt;user&lt;/b&gt;" in body
+    assert "<b>user</b>" not in body
+
+
+def test_compiled_template_reused_without_reload(tmp_path):
+    directory = tmp_path / "templates"
+    directory.mkdir()
+    (directory / "page.html").write_text("first {{ value }}")
+    environment = create_environment(
+        directory=directory, bytecode_cache_dir=str(tmp_path)
+    )
+    assert environment.get_template("page.html").render(value=1) == "first 1"
+
+    (directory / "page.html").write_text("second {{ value }}")
+
+    assert environment.get_template("page.html").render(value=2) == "first 2"
+
+
+def test_bytecode_cache_shared_between_environments(tmp_path):
+    first = create_environment(bytecode_cache_dir=str(tmp_path))
+    first.get_template("reset_password.html")
+    second = create_environment(bytecode_cache_dir=str(tmp_path))
+
+    template = second.get_template("reset_password.html")
+
+    assert template.render(username="user", token="token").count("token") >= 1
+    assert len(os.listdir(tmp_path)) == 1
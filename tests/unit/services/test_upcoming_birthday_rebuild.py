@@ -0,0 +1,69 @@
+import contextlib
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from sqlalchemy.exc import OperationalError
+from app.constant_bag.redis import RedisKey
+from app.database.redis import redis_client
+from app.services import upcoming_birthday
+from app.services.upcoming_birthday import UpcomingBirthdayService, start_rebuild
+
+KEYS = (
+    RedisKey.UPCOMING_BIRTHDAYS_BUILT_ON,
+    RedisKey.UPCOMING_BIRTHDAYS_REBUILD_LOCK,
+)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = AsyncMock()
+
+    @contextlib.asynccontextmanager
+    async def make_session():
+        yield session
+
+    monkeypatch.setattr(
+        upcoming_birthday, "sessionmanager", MagicMock(session=make_session)
+    )
+    built_on = redis_client.get(RedisKey.UPCOMING_BIRTHDAYS_BUILT_ON)
+    redis_client.delete(*KEYS)
+    yield session
+    redis_client.delete(*KEYS)
+    if built_on:
+        redis_client.set(RedisKey.UPCOMING_BIRTHDAYS_BUILT_ON, built_on)
+
+
+@pytest.mark.asyncio
+async def test_stale_projection_rebuilt_in_background(session, monkeypatch):
+    rebuild = AsyncMock()
+    monkeypatch.setattr(
+        upcoming_birthday.UpcomingBirthdayRepository, "rebuild", rebuild
+    )
+    service = UpcomingBirthdayService(MagicMock())
+
+    assert not await service.ensure_fresh()
+    await next(iter(upcoming_birthday._rebuilds))
+
+    rebuild.assert_awaited_once_with(service.days, datetime.now().date())
+    assert await service.ensure_fresh()
+    assert not redis_client.exists(RedisKey.UPCOMING_BIRTHDAYS_REBUILD_LOCK)
+
+
+@pytest.mark.asyncio
+async def test_failed_rebuild_releases_lock(session, monkeypatch):
+    rebuild = AsyncMock(side_effect=OperationalError("REBUILD", {}, Exception()))
+    monkeypatch.setattr(
+        upcoming_birthday.UpcomingBirthdayRepository, "rebuild", rebuild
+    )
+
+    await start_rebuild(date(2026, 10, 19))
+
+    assert not redis_client.exists(RedisKey.UPCOMING_BIRTHDAYS_BUILT_ON)
+    assert not redis_client.exists(RedisKey.UPCOMING_BIRTHDAYS_REBUILD_LOCK)
+
+
+@pytest.mark.asyncio
+async def test_single_rebuild_at_once(session):
+    redis_client.set(RedisKey.UPCOMING_BIRTHDAYS_REBUILD_LOCK, 1)
+
+    assert start_rebuild(date(2026, 10, 19)) is None
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+import pytest
+from app.exceptions.deadline_exceeded_exception import DeadlineExceededException
+from app.exceptions.upload_busy_exception import UploadBusyException
+from app.services.avatar_processor import ProcessedImage
+from app.services.upload_file import UploadFileService
+
+
+def make_service(**kwargs) -> UploadFileService:
+    return UploadFileService(MagicMock(), **kwargs)
+
+
+def make_image(digest: str) -> ProcessedImage:
+    return ProcessedImage(b"image", "image/webp", "webp", digest)
+
+
+@pytest.mark.asyncio
+async def test_upload_off_event_loop_thread():
+    service = make_service()
+    threads = []
+
+    def upload_file(image, timeout):
+        threads.append(threading.current_thread())
+        return f"http://example.com/{image.digest}.webp"
+
+    with patch.object(UploadFileService, "upload_file", side_effect=upload_file):
+        url = await service.upload(make_image("digest"))
+
+    assert url == "http://example.com/digest.webp"
+    assert threads[0] is not threading.current_thread()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_uploads_capped():
+    service = make_service(workers=2, queue_limit=0)
+    release = threading.Event()
+
+    def upload_file(image, timeout):
+        release.wait(5)
+        return image.digest
+
+    with patch.object(UploadFileService, "upload_file", side_effect=upload_file):
+        pending = [
+            asyncio.create_task(service.upload(make_image(f"digest{i}")))
+            for i in range(2)
+        ]
+        await asyncio.sleep(0)
+
+        with pytest.raises(UploadBusyException):
+            await service.upload(make_image("digest2"))
+
+        release.set()
+        assert await asyncio.gather(*pending) == ["digest0", "digest1"]
+
+
+@pytest.mark.asyncio
+async def test_upload_timeout():
+    service = make_service(timeout_seconds=0.05)
+    release = threading.Event()
+
+    def upload_file(image, timeout):
+        release.wait(5)
+        return image.digest
+
+    with patch.object(UploadFileService, "upload_file", side_effect=upload_file):
+        with pytest.raises(DeadlineExceededException):
+            await service.upload(make_image("digest"))
+
+        assert service._in_flight == 1
+        release.set()
+        service._executor.shutdown(wait=True)
+
+    assert service._in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_upload_saves_to_storage():
+    storage = MagicMock()
+    storage.save.return_value = "http://example.com/digest.webp"
+    service = UploadFileService(storage)
+    image = make_image("digest")
+
+    assert await service.upload(image) == "http://example.com/digest.webp"
+
+    storage.save.assert_called_once_with(image, service.timeout_seconds)
@@ -0,0 +1,110 @@
+import hashlib
+import pytest
+from fastapi import HTTPException, Request
+from app.exceptions.upload_too_large_exception import UploadTooLargeException
+from app.services.upload_stream import StreamedUpload
+
+BOUNDARY = "boundary"
+
+
+def make_body(content: bytes, field: str = "file") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="note"\r\n\r\n'
+        "hello\r\n"
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="avatar.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def make_request(
+    body: bytes,
+    chunk_size: int = 1000,
+    content_length: bool = True,
+    content_type: str = f"multipart/form-data; boundary={BOUNDARY}",
+) -> tuple[Request, list[int]]:
+    chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)]
+    sent = []
+    headers = [(b"content-type", content_type.encode())]
+    if content_length:
+        headers.append((b"content-length", str(len(body)).encode()))
+
+    async def receive():
+        chunk = chunks.pop(0) if chunks else b""
+        sent.append(len(chunk))
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    scope = {"type": "http", "method": "PATCH", "headers": headers}
+    return Request(scope, receive), sent
+
+
+@pytest.mark.asyncio
+async def test_receive_file_and_digest():
+    content = bytes(range(256)) * 20
+    request, _ = make_request(make_body(content))
+
+    upload = await StreamedUpload("file").receive(request)
+
+    assert upload.file.read() == content
+    assert upload.size == len(content)
+    assert upload.digest == hashlib.sha256(content).hexdigest()
+    assert upload.filename == "avatar.jpg"
+    assert upload.content_type == "image/jpeg"
+    upload.close()
+
+
+@pytest.mark.asyncio
+async def test_receive_spools_to_disk_above_threshold():
+    content = b"a" * 5000
+    request, _ = make_request(make_body(content))
+
+    small = await StreamedUpload("file", spool_max_memory=10000).receive(request)
+    request, _ = make_request(make_body(content))
+    large = await StreamedUpload("file", spool_max_memory=1000).receive(request)
+
+    assert not small.on_disk
+    assert large.on_disk
+    assert large.file.read() == content
+    small.close()
+    large.close()
+
+
+@pytest.mark.asyncio
+async def test_receive_rejects_content_length_before_reading():
+    request, sent = make_request(make_body(b"a" * 100_000))
+
+    with pytest.raises(UploadTooLargeException):
+        await StreamedUpload("file", max_bytes=1000).receive(request)
+
+    assert sent == []
+
+
+@pytest.mark.asyncio
+async def test_receive_stops_streaming_above_max_bytes():
+    request, sent = make_request(make_body(b"a" * 100_000), content_length=False)
+
+    with pytest.raises(UploadTooLargeException):
+        await StreamedUpload("file", max_bytes=10_000).receive(request)
+
+    assert sum(sent) < 20_000
+
+
+@pytest.mark.asyncio
+async def test_receive_missing_field():
+    request, _ = make_request(make_body(b"content", field="other"))
+
+    with pytest.raises(HTTPException) as e:
+        await StreamedUpload("file").receive(request)
+
+    assert e.value.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_receive_not_multipart():
+    request, _ = make_request(b"{}", content_type="application/json")
+
+    with pytest.raises(HTTPException) as e:
+        await StreamedUpload("file").receive(request)
+
+    assert e.value.status_code == 422
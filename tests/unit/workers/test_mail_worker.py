@@ -0,0 +1,214 @@
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+import pytest_asyncio
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError
+from app.conf.config import settings
+from app.constant_bag.redis import RedisKey
+from app.database.redis import redis_client
+from app.schemas.mail import MailModel
+from app.services.mail_queue import MAIL_QUEUE_GROUP, MailQueue
+from app.workers.mail_worker import MailWorker
+
+MAIL_KEYS = (
+    RedisKey.MAIL_QUEUE,
+    RedisKey.MAIL_RETRY,
+    RedisKey.MAIL_DEAD_LETTER,
+    RedisKey.MAIL_WORKER_METRICS,
+)
+
+mail = MailModel(
+    to=["user@example.com"],
+    subject="Confirm your email",
+    data={"host": "http://localhost", "username": "user", "token": "token"},
+    template="verify_email.html",
+)
+
+
+@pytest_asyncio.fixture
+async def redis():
+    redis_client.delete(*MAIL_KEYS)
+    redis = Redis(
+        host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True
+    )
+    yield redis
+    await redis.aclose()
+    redis_client.delete(*MAIL_KEYS)
+
+
+def make_worker(redis, send_email, **kwargs) -> MailWorker:
+    mail_service = AsyncMock()
+    mail_service.send_email.side_effect = send_email
+    return MailWorker(
+        redis,
+        mail_service,
+        consumer="test",
+        concurrency=2,
+        max_attempts=2,
+        backoff_seconds=0,
+        block_seconds=0.01,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_sends_queued_mail(redis):
+    queue = MailQueue(redis_client)
+    worker = make_worker(redis, lambda mail: True)
+    await worker.ensure_group()
+    queue.enqueue(mail)
+
+    entries = await worker.poll()
+    assert len(entries) == 1
+    assert await worker.process(*entries[0])
+
+    worker.mail_service.send_email.assert_awaited_once_with(mail)
+    metrics = queue.metrics()
+    assert metrics["queued"] == 0
+    assert metrics["pending"] == 0
+    assert metrics["sent"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_then_dead_letters(redis):
+    queue = MailQueue(redis_client)
+    worker = make_worker(redis, lambda mail: False)
+    await worker.ensure_group()
+    queue.enqueue(mail)
+
+    entries = await worker.poll()
+    assert not await worker.process(*entries[0])
+    assert queue.metrics()["scheduled"] == 1
+
+    entries = await worker.poll()
+    assert len(entries) == 1
+    assert entries[0][1]["attempts"] == "1"
+    assert not await worker.process(*entries[0])
+
+    metrics = queue.metrics()
+    assert metrics["queued"] == 0
+    assert metrics["scheduled"] == 0
+    assert metrics["dead_letter"] == 1
+    assert metrics["failed"] == 2
+    assert metrics["retried"] == 1
+    assert metrics["dead_lettered"] == 1
+    dead_letter = await redis.xrange(RedisKey.MAIL_DEAD_LETTER)
+    assert MailModel.model_validate_json(dead_letter[0][1]["mail"]) == mail
+
+
+@pytest.mark.asyncio
+async def test_retry_waits_for_backoff(redis):
+    queue = MailQueue(redis_client)
+    worker = make_worker(redis, lambda mail: False)
+    worker.backoff_seconds = 60
+    await worker.ensure_group()
+    queue.enqueue(mail)
+
+    await worker.process(*(await worker.poll())[0])
+
+    assert await worker.poll() == []
+    retry, due = (await redis.zrange(RedisKey.MAIL_RETRY, 0, -1, withscores=True))[0]
+    assert json.loads(retry)["attempts"] == 1
+    assert due > time.time() + 50
+
+
+@pytest.mark.asyncio
+async def test_claims_mail_of_stopped_worker(redis):
+    queue = MailQueue(redis_client)
+    stopped = make_worker(redis, lambda mail: True)
+    await stopped.ensure_group()
+    queue.enqueue(mail)
+    assert len(await stopped.poll()) == 1
+
+    worker = make_worker(redis, lambda mail: True, claim_idle_seconds=0)
+    worker.consumer = "other"
+    entries = await worker.poll()
+
+    assert len(entries) == 1
+    assert await worker.process(*entries[0])
+    assert queue.metrics()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_until_stopped(redis):
+    queue = MailQueue(redis_client)
+    worker = make_worker(redis, lambda mail: True)
+    for _ in range(5):
+        queue.enqueue(mail)
+
+    stop = asyncio.Event()
+    run = asyncio.create_task(worker.run(stop))
+    for _ in range(100):
+        if queue.metrics()["sent"] == 5:
+            break
+        await asyncio.sleep(0.01)
+    stop.set()
+    await run
+
+    assert queue.metrics()["sent"] == 5
+    assert await redis.xpending(RedisKey.MAIL_QUEUE, MAIL_QUEUE_GROUP) == {
+        "pending": 0,
+        "min": None,
+        "max": None,
+        "consumers": [],
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_survives_redis_errors(redis, monkeypatch):
+    monkeypatch.setattr("app.workers.mail_worker.REDIS_ERROR_BACKOFF_SECONDS", 0)
+    queue = MailQueue(redis_client)
+    worker = make_worker(redis, lambda mail: True)
+    queue.enqueue(mail)
+    poll = worker.poll
+    failures = [ConnectionError(), ConnectionError()]
+
+    async def flaky_poll():
+        if failures:
+            raise failures.pop()
+        return await poll()
+
+    worker.poll = flaky_poll
+
+    stop = asyncio.Event()
+    run = asyncio.create_task(worker.run(stop))
+    for _ in range(100):
+        if queue.metrics()["sent"] == 1:
+            break
+        await asyncio.sleep(0.01)
+    stop.set()
+    await run
+
+    assert queue.metrics()["sent"] == 1
+
+
+def test_queue_tolerates_redis_errors():
+    redis = MagicMock()
+    redis.xadd.side_effect = ConnectionError()
+    redis.pipeline.return_value.execute.side_effect = ConnectionError()
+    redis.xpending.side_effect = ConnectionError()
+    queue = MailQueue(redis)
+
+    assert queue.enqueue(mail) is None
+    assert set(queue.metrics().values()) == {0}
+
+
+def test_backoff():
+    worker = MailWorker(
+        MagicMock(),
+        AsyncMock(),
+        consumer="test",
+        backoff_seconds=10,
+        backoff_max_seconds=60,
+    )
+
+    assert [worker.backoff(attempts) for attempts in range(1, 6)] == [
+        10,
+        20,
+        40,
+        60,
+        60,
+    ]